@@ -1,10 +1,100 @@
+# player of chance nodes
+CHANCE = "Chance"
+
+
 class ExtensiveFormNode:
-    def __init__(self, player=None, actions=None, children=None, payoffs=None, info_set=None):
-        self.player = player
+    """
+    A node of a game tree: terminal when it has payoffs, otherwise a decision of
+    `player` at info set `info_set`. A chance node has probs, {action: probability},
+    and is played by CHANCE.
+    """
+
+    def __init__(self, player=None, actions=None, children=None, payoffs=None, info_set=None, probs=None):
+        self.player = CHANCE if probs is not None and player is None else player
         self.actions = actions or []
         self.children = children or {}
         self.payoffs = payoffs
         self.info_set = info_set
+        self.probs = probs
     
     def is_terminal(self):
-        return self.payoffs is not None
\ No newline at end of file
+        return self.payoffs is not None
+
+    def is_chance(self):
+        return self.probs is not None
+
+class NodeInterner:
+    """
+    Hash-consing factory for ExtensiveFormNode: structurally identical subtrees
+    are created once and shared, so a game is stored as a DAG.
+
+    Build bottom-up with terminal() and decision(), passing children that came
+    from the same interner, or compress an existing tree with intern(). Two
+    decision nodes are the same when they have the same player, info set,
+    actions, chance probabilities and (shared) children; two terminal nodes
+    when they have the same payoffs. A decision node without an info set is
+    an info set of its own, so it is never merged: sharing it would let the
+    mover forget how it was reached. Shared nodes must not be mutated afterwards.
+    """
+
+    def __init__(self):
+        self._nodes = {}
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def terminal(self, payoffs):
+        key = ("terminal", tuple(payoffs))
+        if key not in self._nodes:
+            self._nodes[key] = ExtensiveFormNode(payoffs=tuple(payoffs))
+        return self._nodes[key]
+
+    def decision(self, player, actions, children, info_set=None, probs=None):
+        actions = list(actions)
+        if info_set is None:
+            return ExtensiveFormNode(
+                player=player,
+                actions=actions,
+                children={a: children[a] for a in actions},
+                probs=None if probs is None else {a: probs[a] for a in actions},
+            )
+        # children are interned, so their ids identify their whole subtree
+        key = (player, info_set, tuple(actions), tuple(id(children[a]) for a in actions),
+               None if probs is None else tuple(probs[a] for a in actions))
+        if key not in self._nodes:
+            self._nodes[key] = ExtensiveFormNode(
+                player=player,
+                actions=actions,
+                children={a: children[a] for a in actions},
+                info_set=info_set,
+                probs=None if probs is None else {a: probs[a] for a in actions},
+            )
+        return self._nodes[key]
+
+    def intern(self, root):
+        """Shared copy of the tree below root; the original nodes are left untouched."""
+        shared = {}
+        stack = [root]
+        while stack:
+            node = stack[-1]
+            if id(node) in shared:
+                stack.pop()
+                continue
+            if node.is_terminal():
+                shared[id(node)] = self.terminal(node.payoffs)
+                stack.pop()
+                continue
+            pending = [child for child in node.children.values() if id(child) not in shared]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            actions = node.actions or list(node.children)
+            shared[id(node)] = self.decision(
+                node.player,
+                actions,
+                {a: shared[id(node.children[a])] for a in actions},
+                node.info_set,
+                node.probs,
+            )
+        return shared[id(root)]
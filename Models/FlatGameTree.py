@@ -0,0 +1,399 @@
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+from Models.ExtensiveForm import CHANCE, ExtensiveFormNode
+from utilities import profiling
+
+
+def default_players(movers, n_columns):
+    """
+    Players of a game that does not declare them: payoffs are positional, so
+    column k belongs to "Player k+1", whether or not that player ever moves,
+    and CHANCE comes last when it moves. Players with other names cannot be
+    matched to columns; they are kept in the order they first move, and the
+    analyses must then be given the players in payoff column order.
+    """
+    players = [f"Player {k + 1}" for k in range(n_columns)]
+    if any(p != CHANCE and p not in players for p in movers):
+        return list(movers)
+    return players + ([CHANCE] if CHANCE in movers else [])
+
+
+class FlatGameTree:
+    """
+    Array-backed storage of an extensive form game.
+
+    Nodes are numbered 0..n-1 from the root, level by level, so that every child
+    comes after all of its parents (plain breadth-first order for a tree).
+    Levels are contiguous: nodes level_ptr[l]..level_ptr[l + 1] - 1 form level l.
+
+        parent[v]           first parent of v, -1 at the root
+        first_child[v]      children of v are child[first_child[v]:first_child[v + 1]]
+        child[e]            node reached by edge e, in the order of node.actions
+        child_action[e]     action of edge e as an index into `actions`
+        node_player[v]      index into `players`, -1 at terminal nodes
+        node_info[v]        index into info_ids / info_player, -1 at terminal nodes
+        payoff_row[v]       row of `payoffs` for terminal nodes, -1 otherwise
+        payoffs             (n_terminal, N) payoff matrix
+        chance_prob[e]      probability of edge e at chance nodes, NaN elsewhere;
+                            None when the game has no chance nodes
+
+    Info sets are numbered in the order collect_info_sets finds them, so both
+    representations give the same strategies in the same order. A node shared
+    by several parents is stored once.
+    """
+
+    def __init__(self, players, parent, first_child, child, child_action, actions,
+                 node_player, node_info, info_ids, info_player, payoffs, payoff_row, level_ptr,
+                 chance_prob=None):
+        self.players = list(players)
+        self.parent = parent
+        self.first_child = first_child
+        self.child = child
+        self.child_action = child_action
+        self.actions = list(actions)
+        self.node_player = node_player
+        self.node_info = node_info
+        self.info_ids = list(info_ids)
+        self.info_player = info_player
+        self.payoffs = payoffs
+        self.payoff_row = payoff_row
+        self.level_ptr = level_ptr
+        self.chance_prob = chance_prob
+
+    @classmethod
+    def from_tree(cls, root, players=None):
+        """
+        Flatten an ExtensiveFormNode tree.
+        Players default to default_players: one per payoff column, in column order.
+        """
+        return cls._flatten(root, players)[0]
+
+    @classmethod
+    def _flatten(cls, root, players):
+        """The flat tree and the {id(node): node index} map of the original nodes."""
+        # number the nodes breadth first, checking the structure on the way
+        order = [root]
+        index = {id(root): 0}
+        level_ptr = [0, 1]
+        level = [root]
+        shared = False
+        while level:
+            following = []
+            for node in level:
+                if not node.is_terminal() and node.player is None:
+                    raise ValueError("Decision node without a player")
+                for action in node.actions or list(node.children):
+                    child = node.children.get(action)
+                    if child is None:
+                        raise ValueError(f"Action {action!r} of {node.player} has no child node")
+                    if id(child) in index:
+                        shared = True
+                        continue
+                    index[id(child)] = len(order)
+                    order.append(child)
+                    following.append(child)
+            if following:
+                level_ptr.append(len(order))
+            level = following
+
+        if shared:
+            # a node with several parents may only join once all of them are placed
+            in_degree = dict.fromkeys(index, 0)
+            for node in order:
+                for action in node.actions or list(node.children):
+                    in_degree[id(node.children[action])] += 1
+            order = []
+            level_ptr = [0]
+            level = [root]
+            while level:
+                order.extend(level)
+                level_ptr.append(len(order))
+                following = []
+                for node in level:
+                    for action in node.actions or list(node.children):
+                        child = node.children[action]
+                        in_degree[id(child)] -= 1
+                        if in_degree[id(child)] == 0:
+                            following.append(child)
+                level = following
+            index = {id(node): v for v, node in enumerate(order)}
+
+        if players is None:
+            movers = []
+            for node in order:
+                if not node.is_terminal() and node.player not in movers:
+                    movers.append(node.player)
+            n_columns = next((len(node.payoffs) for node in order if node.is_terminal()), 0)
+            players = default_players(movers, n_columns)
+        player_pos = {p: i for i, p in enumerate(players)}
+
+        n = len(order)
+        parent = [-1] * n
+        node_player = [-1] * n
+        payoff_row = [-1] * n
+        first_child = [0]
+        child = []
+        child_action = []
+        chance_prob = []
+        action_ids = {}
+        rows = []
+
+        for v, node in enumerate(order):
+            if node.is_terminal():
+                payoff_row[v] = len(rows)
+                rows.append(node.payoffs)
+            else:
+                if node.player not in player_pos:
+                    raise ValueError(f"Decision node of {node.player!r}, which is not one of {players}")
+                node_player[v] = player_pos[node.player]
+                if node.probs is not None:
+                    total = sum(node.probs.get(a, np.nan) for a in node.actions or list(node.children))
+                    if not abs(total - 1) <= 1e-9:
+                        raise ValueError(f"Chance probabilities {node.probs} do not sum to 1 over the actions")
+                for action in node.actions or list(node.children):
+                    c = index[id(node.children[action])]
+                    if parent[c] < 0:
+                        parent[c] = v
+                    child.append(c)
+                    if action not in action_ids:
+                        action_ids[action] = len(action_ids)
+                    child_action.append(action_ids[action])
+                    chance_prob.append(node.probs[action] if node.probs is not None else np.nan)
+            first_child.append(len(child))
+
+        # info sets in collect_info_sets order (depth first, children in dict order)
+        node_info = [-1] * n
+        info_index = {}
+        info_ids = []
+        info_player = []
+        info_actions = []
+        stack = [root]
+        seen = set()
+        while stack:
+            node = stack.pop()
+            if id(node) in seen or node.is_terminal():
+                continue
+            seen.add(id(node))
+            p = player_pos[node.player]
+            info_id = node.info_set if node.info_set is not None else f"auto_{node.player}_{id(node)}"
+            key = (p, info_id)
+            if key not in info_index:
+                info_index[key] = len(info_ids)
+                info_ids.append(info_id)
+                info_player.append(p)
+                info_actions.append(node.actions)
+            elif info_actions[info_index[key]] != node.actions:
+                raise ValueError(f"Inconsistent actions in info set {info_id} for {node.player}")
+            node_info[index[id(node)]] = info_index[key]
+            stack.extend(node.children.values())
+
+        tree = cls(
+            players,
+            np.asarray(parent, dtype=np.int32),
+            np.asarray(first_child, dtype=np.int32),
+            np.asarray(child, dtype=np.int32),
+            np.asarray(child_action, dtype=np.int32),
+            list(action_ids),
+            np.asarray(node_player, dtype=np.int32),
+            np.asarray(node_info, dtype=np.int32),
+            info_ids,
+            np.asarray(info_player, dtype=np.int32),
+            np.asarray(rows) if rows else np.zeros((0, len(players))),
+            np.asarray(payoff_row, dtype=np.int32),
+            np.asarray(level_ptr, dtype=np.int32),
+            np.asarray(chance_prob, dtype=float) if np.isfinite(chance_prob).any() else None,
+        )
+        return tree, index
+
+    def to_tree(self):
+        """Rebuild ExtensiveFormNode objects; shared nodes stay shared. Returns the root."""
+        nodes = [None] * len(self)
+        payoffs = self.payoffs.tolist()
+        first_child = self.first_child.tolist()
+        child = self.child.tolist()
+        child_action = self.child_action.tolist()
+        payoff_row = self.payoff_row.tolist()
+        chance_prob = self.chance_prob.tolist() if self.chance_prob is not None else None
+        for v in range(len(self) - 1, -1, -1):
+            row = payoff_row[v]
+            if row >= 0:
+                nodes[v] = ExtensiveFormNode(payoffs=tuple(payoffs[row]))
+                continue
+            edges = range(first_child[v], first_child[v + 1])
+            actions = [self.actions[child_action[e]] for e in edges]
+            nodes[v] = ExtensiveFormNode(
+                player=self.players[self.node_player[v]],
+                actions=actions,
+                children={a: nodes[child[e]] for a, e in zip(actions, edges)},
+                info_set=self.info_ids[self.node_info[v]],
+            )
+            if chance_prob is not None and edges and chance_prob[edges[0]] == chance_prob[edges[0]]:
+                nodes[v].probs = {a: chance_prob[e] for a, e in zip(actions, edges)}
+        return nodes[0]
+
+    def __len__(self):
+        return len(self.parent)
+
+    @property
+    def num_players(self):
+        return len(self.players)
+
+    def payoff_players(self):
+        """Players of the payoff columns, in column order: every player but CHANCE."""
+        return [p for p in self.players if p != CHANCE]
+
+    @property
+    def terminal(self):
+        """Boolean mask of the terminal nodes."""
+        return self.payoff_row >= 0
+
+    @property
+    def nbytes(self):
+        """Memory held by the arrays."""
+        arrays = (self.parent, self.first_child, self.child, self.child_action, self.node_player,
+                  self.node_info, self.info_player, self.payoffs, self.payoff_row, self.level_ptr)
+        return sum(a.nbytes for a in arrays) + (self.chance_prob.nbytes if self.chance_prob is not None else 0)
+
+    def children(self, v):
+        return self.child[self.first_child[v]:self.first_child[v + 1]]
+
+    def child_table(self):
+        """Dense (n, max actions) table of children, -1 where a node has fewer actions."""
+        degree = np.diff(self.first_child)
+        table = np.full((len(self), max(int(degree.max(initial=0)), 1)), -1, dtype=np.int64)
+        rows = np.repeat(np.arange(len(self)), degree)
+        cols = np.arange(len(self.child)) - np.repeat(self.first_child[:-1], degree)
+        table[rows, cols] = self.child
+        return table
+
+    def info_sets(self):
+        """Same {player: {info_set_id: actions}} dict as collect_info_sets."""
+        decision = np.nonzero(self.node_info >= 0)[0]
+        ids, first = np.unique(self.node_info[decision], return_index=True)
+        info_sets = {}
+        for g, v in zip(ids.tolist(), decision[first].tolist()):
+            edges = self.child_action[self.first_child[v]:self.first_child[v + 1]]
+            player = self.players[self.info_player[g]]
+            info_sets.setdefault(player, {})[self.info_ids[g]] = [self.actions[a] for a in edges.tolist()]
+        return info_sets
+
+    def movers(self):
+        """Players in the order they first move (breadth first)."""
+        movers = self.node_player[self.node_player >= 0]
+        _, first = np.unique(movers, return_index=True)
+        return [self.players[p] for p in movers[np.sort(first)].tolist()]
+
+    def __repr__(self):
+        return (f"FlatGameTree({len(self)} nodes, {len(self.payoffs)} terminal, "
+                f"players={self.players})")
+
+
+class GameIndex:
+    """
+    Dense integer view of an ExtensiveFormNode tree (or of a FlatGameTree),
+    built once per tree by game_index() and shared by every analysis of it.
+
+        tree                FlatGameTree of the game (node ids, info set ids, actions)
+        node_ids            {id(node): node id}
+        info_actions[g]     actions of info set g
+        action_position[g]  {action: position in info_actions[g]}
+        player_info[p]      global ids of player p's info sets, in collect_info_sets order
+        info_local[g]       position of info set g in its player's player_info list
+        radices[p]          number of actions at each of player p's info sets
+
+    Unnamed info sets are called "auto_{player}_{id(node)}". Building the index
+    checks that every info set has the same actions at all its nodes and that
+    every action leads to a node. The tree must not change once it is indexed.
+    """
+
+    def __init__(self, root):
+        if isinstance(root, FlatGameTree):
+            self.tree, self.node_ids = root, {}
+        else:
+            self.tree, self.node_ids = FlatGameTree._flatten(root, None)
+        tree = self.tree
+        self.players = tree.players
+        self.info_ids = tree.info_ids
+
+        decision = np.nonzero(tree.node_info >= 0)[0]
+        ids, first = np.unique(tree.node_info[decision], return_index=True)
+        self.info_actions = [None] * len(self.info_ids)
+        for g, v in zip(ids.tolist(), decision[first].tolist()):
+            edges = tree.child_action[tree.first_child[v]:tree.first_child[v + 1]].tolist()
+            self.info_actions[g] = [tree.actions[a] for a in edges]
+        self.action_position = [{a: d for d, a in enumerate(acts)} for acts in self.info_actions]
+
+        self.player_info = {p: [] for p in self.players}
+        self.info_local = np.zeros(len(self.info_ids), dtype=np.int64)
+        for g, p in enumerate(tree.info_player.tolist()):
+            group = self.player_info[self.players[p]]
+            self.info_local[g] = len(group)
+            group.append(g)
+        self.radices = {p: tuple(len(self.info_actions[g]) for g in group) for p, group in self.player_info.items()}
+
+    def node_id(self, node):
+        return self.node_ids[id(node)]
+
+    def info_of(self, node):
+        """Info set id of a decision node."""
+        return int(self.tree.node_info[self.node_ids[id(node)]])
+
+    def info_name(self, node):
+        return self.info_ids[self.info_of(node)]
+
+    def info_sets(self):
+        """Same {player: {info_set_id: actions}} dict as collect_info_sets."""
+        return {p: {self.info_ids[g]: list(self.info_actions[g]) for g in group}
+                for p, group in self.player_info.items()}
+
+    def encode(self, player, strategy):
+        """
+        Action positions of a pure strategy {info_set: action}, in player_info order.
+        Info sets the strategy leaves out (or sets to None) get -1.
+        """
+        digits = []
+        for g in self.player_info[player]:
+            action = strategy.get(self.info_ids[g])
+            digits.append(-1 if action is None else self.action_position[g][action])
+        return digits
+
+    def evaluate(self, digits):
+        """
+        Payoffs of a pure profile given as {player: action positions} (see encode()).
+        The walk only reads the integer arrays of the flat tree.
+        """
+        tree = self.tree
+        moves = [digits.get(p) for p in self.players]
+        v = 0
+        while tree.payoff_row[v] < 0:
+            g = tree.node_info[v]
+            d = moves[tree.node_player[v]][self.info_local[g]]
+            if d < 0:
+                raise ValueError(f"The profile has no action at info set {self.info_ids[g]}")
+            v = tree.child[tree.first_child[v] + d]
+        return tree.payoffs[tree.payoff_row[v]]
+
+    def __repr__(self):
+        return f"GameIndex({len(self.tree)} nodes, {len(self.info_ids)} info sets, players={self.players})"
+
+
+_INDEX_CACHE = WeakKeyDictionary()
+
+
+def game_index(root):
+    """
+    The GameIndex of the tree below root, built on first use and cached for
+    as long as root is alive.
+    """
+    index = _INDEX_CACHE.get(root)
+    if index is None:
+        profiling.count("game index misses")
+        with profiling.timer("game_index"):
+            index = GameIndex(root)
+        profiling.count("nodes indexed", len(index.tree))
+        _INDEX_CACHE[root] = index
+    else:
+        profiling.count("game index hits")
+    return index
@@ -1,44 +1,22 @@
+from collections.abc import Sequence
 from itertools import product
 import numpy as np
 
+from Models.ExtensiveForm import CHANCE
+from Models.FlatGameTree import game_index
+from utilities import profiling
+
 def collect_info_sets(root):
     '''
-    Traverse the tree as an extensive form and collect the info sets of all players
+    Collect the info sets of all players from the tree's GameIndex
+    (built on the first call for a tree, then reused)
     return :
         info_sets[player] = { info_set_id: actions}
     '''
-    info_sets = {}
-    stack = [root]
-
-    while stack:
-        node = stack.pop()
-        if node is None or node.is_terminal():
-            continue
-
-        player = node.player
-        if player is None:
-            continue
+    with profiling.timer("collect_info_sets"):
+        return game_index(root).info_sets()
 
-        if player not in info_sets:
-            info_sets[player] = {}
 
-        info_id = node.info_set
-        if info_id is None:
-            info_id = f"auto_{player}_{id(node)}"
-            node.info_set = info_id
-
-        if info_id in info_sets[player]:
-            if info_sets[player][info_id] != node.actions:
-                raise ValueError(f"Inconsistent actions in info set {info_id} for {player}")
-        else:
-            info_sets[player][info_id] = list(node.actions)
-
-        #push children to complete iteration over stack
-        for child in node.children.values():
-            stack.append(child)
-
-    return info_sets
-    
 def enumerate_player_strategies(info_set_for_player):
     info_ids = list(info_set_for_player.keys())
     action_lists = [info_set_for_player[iid] for iid in info_ids]
@@ -47,96 +25,675 @@ def enumerate_player_strategies(info_set_for_player):
         strategies.append({iid: act for iid, act in zip(info_ids, str)})
     return strategies, info_ids
 
+class StrategySpace(Sequence):
+    """
+    Pure strategies of one player encoded as mixed-radix integers.
+
+    Strategy k picks action digits(k)[j] at info set info_ids[j]; the first info
+    set is the most significant digit, so the order is the same as
+    enumerate_player_strategies. A strategy only becomes an {info_set: action}
+    dict when it is indexed, so large strategy sets are never materialized.
+    """
+
+    def __init__(self, info_ids, actions):
+        self.info_ids = list(info_ids)
+        self.actions = [list(a) for a in actions]
+        self.radices = tuple(len(a) for a in self.actions)
+        self._size = 1
+        for r in self.radices:
+            self._size *= r
+
+    @classmethod
+    def from_info_sets(cls, info_set_for_player):
+        return cls(info_set_for_player.keys(), info_set_for_player.values())
+
+    def __len__(self):
+        return self._size
+
+    def digits(self, index):
+        """Action positions of strategy index (or an array of them), shape (..., n_info_sets)."""
+        index = np.asarray(index)
+        if not self.radices:
+            return np.zeros(index.shape + (0,), dtype=np.int64)
+        return np.stack(np.unravel_index(index, self.radices), axis=-1)
+
+    def encode(self, digits):
+        """Inverse of digits()."""
+        digits = np.asarray(digits)
+        if not self.radices:
+            return np.zeros(digits.shape[:-1], dtype=np.int64)
+        return np.ravel_multi_index(tuple(np.moveaxis(digits, -1, 0)), self.radices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[k] for k in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("strategy index out of range")
+        digits = self.digits(index)
+        return {iid: acts[d] for iid, acts, d in zip(self.info_ids, self.actions, digits.tolist())}
+
+    def index(self, strategy):
+        return int(self.encode([acts.index(strategy[iid]) for iid, acts in zip(self.info_ids, self.actions)]))
+
+    def __repr__(self):
+        return f"StrategySpace({self._size} strategies over {len(self.info_ids)} info sets)"
+
+
+class ReducedStrategySpace(Sequence):
+    """
+    Reduced pure strategies of one player: strategies that only differ at info
+    sets the player's own earlier moves cut off are payoff-equivalent and are
+    kept once.
+
+    plans[k, j] is the action position at info set info_ids[j], or -1 when the
+    reduced strategy never reaches it (shown as "*" in labels). `full` is the
+    StrategySpace of all the player's strategies: completions(k) lists the full
+    strategies merged into reduced strategy k and reduce() maps full strategies
+    back to their reduced one.
+    """
+
+    def __init__(self, full, plans):
+        self.full = full
+        self.info_ids = full.info_ids
+        self.actions = full.actions
+        self.radices = full.radices
+        self.plans = np.asarray(plans, dtype=np.int64).reshape(-1, len(self.info_ids))
+
+    @classmethod
+    def from_tree(cls, root, player, full):
+        return cls(full, _reduced_plans(root, player, full.info_ids))
+
+    def __len__(self):
+        return len(self.plans)
+
+    def digits(self, index):
+        """Action positions of reduced strategy index, -1 at unreached info sets."""
+        return self.plans[index]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[k] for k in range(*index.indices(len(self)))]
+        digits = self.plans[index].tolist()
+        return {iid: (acts[d] if d >= 0 else None) for iid, acts, d in zip(self.info_ids, self.actions, digits)}
+
+    def index(self, strategy):
+        digits = [-1 if strategy[iid] is None else acts.index(strategy[iid])
+                  for iid, acts in zip(self.info_ids, self.actions)]
+        match = np.nonzero((self.plans == digits).all(axis=1))[0]
+        if not len(match):
+            raise ValueError(f"{strategy} is not a reduced strategy")
+        return int(match[0])
+
+    def completions(self, index):
+        """Indices in `full` of the strategies merged into reduced strategy index."""
+        plan = self.plans[index]
+        free = np.nonzero(plan < 0)[0]
+        if not len(free):
+            return self.full.encode(plan[None, :])
+        radices = tuple(self.radices[j] for j in free)
+        choices = np.unravel_index(np.arange(int(np.prod(radices))), radices)
+        digits = np.repeat(plan[None, :], len(choices[0]), axis=0)
+        digits[:, free] = np.stack(choices, axis=-1)
+        return self.full.encode(digits)
+
+    def reduce(self, full_index):
+        """Reduced strategy index of full strategy full_index (or an array of them)."""
+        digits = self.full.digits(full_index)[..., None, :]
+        match = ((self.plans < 0) | (self.plans == digits)).all(axis=-1)
+        return match.argmax(axis=-1)
+
+    def __repr__(self):
+        return f"ReducedStrategySpace({len(self)} of {len(self.full)} strategies over {len(self.info_ids)} info sets)"
+
+
+def _merge_plans(a, b):
+    """All compatible unions of a plan from a with a plan from b, without duplicates."""
+    if len(a) == 1 and (a < 0).all():
+        return b
+    if len(b) == 1 and (b < 0).all():
+        return a
+    x = a[:, None, :]
+    y = b[None, :, :]
+    fits = ((x < 0) | (y < 0) | (x == y)).all(axis=-1)
+    i, k = np.nonzero(fits)
+    merged = np.where(a[i] >= 0, a[i], b[k])
+    return np.unique(merged, axis=0)
+
+
+def _reduced_plans(root, player, info_ids):
+    """
+    Reduced strategies of `player` as rows of action positions (-1 = unreached).
+
+    Built bottom-up, so equivalent strategies are never generated: at the
+    player's own nodes each action extends the plans of its subtree, elsewhere
+    the plans of all subtrees are merged since every branch can be reached.
+    Shared subtrees are visited once.
+    """
+    column = {iid: j for j, iid in enumerate(info_ids)}
+    empty = np.full((1, len(info_ids)), -1, dtype=np.int64)
+    tree = game_index(root).tree
+    if _root_payoffs(tree) is not None:
+        return empty
+
+    plans = {}
+    for key, mover, info_set, _, children in _decision_post_order(tree):
+        below = [empty if payoffs is not None else plans[c] for c, payoffs in children]
+        if mover == player:
+            j = column[info_set]
+            rows = []
+            for d, sub in enumerate(below):
+                # without perfect recall the info set can come back below: keep the same choice
+                sub = sub[(sub[:, j] < 0) | (sub[:, j] == d)].copy()
+                sub[:, j] = d
+                rows.append(sub)
+            plans[key] = np.concatenate(rows)
+        else:
+            merged = empty
+            for sub in below:
+                merged = _merge_plans(merged, sub)
+            plans[key] = merged
+
+    result = plans[0]
+    return result[np.lexsort(result.T[::-1])]
+
+
 def evaluate_profile(root, profile):
-    node = root
-    while not node.is_terminal():
-        p = node.player
-        info_id = node.info_set if node.info_set is not None else f"node {id(node)}"
-        action = profile[p][info_id]
-        node = node.children[action]
-    return node.payoffs
-
-def extensive_to_normal_form(root, players):
+    """Payoffs of a pure profile {player: {info_set: action}}, walked on the tree's GameIndex."""
+    index = game_index(root)
+    profiling.count("profiles evaluated")
+    digits = {p: index.encode(p, profile[p]) for p in index.players if p in profile}
+    return tuple(index.evaluate(digits).tolist())
+
+def expected_payoffs(root, behavior):
+    """
+    Expected payoff vector when every player follows a behavior strategy
+        behavior[player][info_set] = {action: probability}
+    `root` is an ExtensiveFormNode (possibly a DAG with shared subtrees) or a
+    FlatGameTree. Every node is evaluated once however many paths reach it.
+    """
+    tree = game_index(root).tree
+    payoffs = _root_payoffs(tree)
+    if payoffs is not None:
+        return tuple(payoffs.tolist())
+
+    values = {}
+    for key, player, info_set, actions, children in _decision_post_order(tree):
+        probs = behavior[player][info_set]
+        total = 0.0
+        for action, (c, payoffs) in zip(actions, children):
+            p = probs.get(action, 0.0)
+            if p:
+                total = total + p * np.asarray(values[c] if payoffs is None else payoffs, dtype=float)
+        values[key] = total
+    return tuple(float(v) for v in values[0])
+
+
+def strategy_label(strategy):
+    """
+    Display name of a pure strategy {info_set: action}.
+    A player with a single info set is labelled by the action itself,
+    otherwise the actions are joined in info set order, e.g. "Left/Up".
+    Info sets a reduced strategy never reaches show as "*", e.g. "Left/*".
+    """
+    actions = list(strategy.values())
+    if len(actions) == 1:
+        return actions[0]
+    # None marks an info set a reduced strategy never reaches
+    return "/".join("*" if a is None else str(a) for a in actions)
+
+
+class NormalFormGame:
+    """
+    Normal form of a game stored as a dense payoff tensor.
+
+    payoffs has shape (n_1, ..., n_N, N): payoffs[s_1, ..., s_N] is the payoff
+    vector of the profile in which player k plays its s_k-th pure strategy.
+    player_strategies[k] lists player k's pure strategies as {info_set: action}
+    dicts and labels[k] holds their display names, in the same order.
+
+    The legacy view used by the older utilities is only built when asked for:
+        game["strategies"]     -> [(strat_p1, strat_p2, ...), ...]
+        game["payoff_matrix"]  -> [(payoff_p1, payoff_p2, ...), ...]
+    """
+
+    def __init__(self, players, payoffs, player_strategies, info_ids=None):
+        self.players = list(players)
+        self.payoffs = np.asarray(payoffs)
+        self.player_strategies = [
+            strats if isinstance(strats, (StrategySpace, ReducedStrategySpace)) else list(strats)
+        for strats in player_strategies
+        ]
+        self.info_ids = info_ids if info_ids is not None else [
+            list(strats[0].keys()) if len(strats) else [] for strats in self.player_strategies
+        ]
+        self._labels = None
+
+        expected = tuple(len(strats) for strats in self.player_strategies) + (len(self.players),)
+        if self.payoffs.shape != expected:
+            raise ValueError(f"Payoff tensor has shape {self.payoffs.shape}, expected {expected}")
+
+        self._label_index = None
+        self._legacy = None
+
+    @property
+    def labels(self):
+        """Display names of every player's strategies, built on first use."""
+        if self._labels is None:
+            self._labels = [[strategy_label(s) for s in strats] for strats in self.player_strategies]
+        return self._labels
+
+    @property
+    def shape(self):
+        """Number of pure strategies of each player."""
+        return self.payoffs.shape[:-1]
+
+    @property
+    def num_players(self):
+        return len(self.players)
+
+    def payoff_array(self, player):
+        """Payoff tensor (n_1, ..., n_N) of one player, given by name or position."""
+        if not isinstance(player, int):
+            player = self.players.index(player)
+        return self.payoffs[..., player]
+
+    def strategy_index(self, player, label):
+        """Position of the strategy called `label` in the player's strategy list."""
+        if not isinstance(player, int):
+            player = self.players.index(player)
+        if self._label_index is None:
+            self._label_index = [{label: i for i, label in enumerate(labels)} for labels in self.labels]
+        return self._label_index[player][label]
+
+    def legacy_view(self):
+        """The {"strategies", "payoff_matrix"} dict returned by older versions."""
+        if self._legacy is None:
+            flat = self.payoffs.reshape(-1, self.num_players).tolist()
+            self._legacy = {
+                "strategies": list(product(*self.player_strategies)),
+                "payoff_matrix": [tuple(p) for p in flat],
+            }
+        return self._legacy
+
+    def __getitem__(self, key):
+        return self.legacy_view()[key]
+
+    def __repr__(self):
+        size = "x".join(str(n) for n in self.shape)
+        return f"NormalFormGame({size}, players={self.players})"
+
+    @classmethod
+    def from_legacy(cls, strategies, payoff_matrix, players=None):
+        """
+        Build the tensor form from the legacy lists in a single scan.
+        The lists are kept as the game's legacy view.
+        """
+        n_players = len(strategies[0]) if strategies else len(players or [])
+        if players is None:
+            players = [f"Player {k + 1}" for k in range(n_players)]
+
+        # position of every distinct strategy of each player, in order of appearance
+        positions = [{} for _ in range(n_players)]
+        player_strategies = [[] for _ in range(n_players)]
+        indices = []
+        for profile in strategies:
+            index = []
+            for k, strat in enumerate(profile):
+                key = tuple(strat.items())
+                if key not in positions[k]:
+                    positions[k][key] = len(player_strategies[k])
+                    player_strategies[k].append(strat)
+                index.append(positions[k][key])
+            indices.append(tuple(index))
+
+        values = np.asarray(payoff_matrix)
+        shape = tuple(len(s) for s in player_strategies) + (n_players,)
+        payoffs = np.zeros(shape, dtype=values.dtype)
+        if indices:
+            payoffs[tuple(np.array(indices).T)] = values
+
+        game = cls(players, payoffs, player_strategies)
+        game._legacy = {"strategies": strategies, "payoff_matrix": payoff_matrix}
+        return game
+
+
+def as_normal_form_game(strategies, payoff_matrix=None, players=None):
+    """Accept either a NormalFormGame or the legacy (strategies, payoff_matrix) lists."""
+    if isinstance(strategies, NormalFormGame):
+        return strategies
+    return NormalFormGame.from_legacy(strategies, payoff_matrix, players)
+
+
+def collect_players(root):
+    """Players of the tree's payoff columns, in column order (see default_players)."""
+    return game_index(root).tree.payoff_players()
+
+
+def _compile_tree(root, players, spaces):
+    """
+    Flatten the tree into index arrays for vectorized profile walks:
+        node_player[v]   position of the mover in `players`, -1 at terminal nodes
+        node_info[v]     position of the node's info set in the mover's StrategySpace
+        child[v, d]      node reached by the d-th action of the info set, -1 if none
+        payoffs[v]       payoff vector at terminal nodes
+    Node 0 is the root. Shared subtrees are compiled once. The tree's GameIndex
+    already has this layout, so its ids only need to be remapped.
+    """
+    tree = game_index(root).tree
+    player_pos = {p: i for i, p in enumerate(players)}
+    info_pos = [{iid: j for j, iid in enumerate(space.info_ids)} for space in spaces]
+
+    for p in tree.movers():
+        if p not in player_pos:
+            raise ValueError(f"Decision node of {p!r}, which is not one of {players}")
+    mover = np.array([player_pos.get(p, -1) for p in tree.players] + [-1], dtype=np.int64)
+    info_of = np.array([info_pos[player_pos[tree.players[p]]][iid] if tree.players[p] in player_pos else 0
+                        for iid, p in zip(tree.info_ids, tree.info_player.tolist())] + [0], dtype=np.int64)
+
+    payoffs = np.zeros((len(tree), len(players)), dtype=tree.payoffs.dtype)
+    terminal = tree.terminal
+    payoffs[terminal] = tree.payoffs[tree.payoff_row[terminal]]
+    # index -1 of mover / info_of is the padding entry used by terminal nodes
+    return mover[tree.node_player], info_of[tree.node_info], tree.child_table(), payoffs
+
+
+def _player_spaces(root, players):
+    """Players (inferred if None) and their StrategySpaces."""
+    if game_index(root).tree.chance_prob is not None:
+        raise ValueError(f"The game has {CHANCE} moves, its normal form is not built "
+                         "(solve it with cfr or the sequence form instead)")
+    if players is None:
+        players = collect_players(root)
     info_sets = collect_info_sets(root)
+    # a player without decision nodes has a single empty strategy
+    with profiling.timer("strategy spaces"):
+        spaces = [StrategySpace.from_info_sets(info_sets.get(p, {})) for p in players]
+    return list(players), spaces
 
-    strategies = {}
-    for player in players:
-        strategies[player], _ = enumerate_player_strategies(info_sets[player])
-
-    player_strategies = [strategies[p] for p in players]
-    strategy_profiles = list(product(*player_strategies))
-
-    #Evaluate payoffs
-    payoff_matrix = []
-    for profile_tuple in strategy_profiles:
-        profile = {player: strat for player, strat in zip(players, profile_tuple)}
-        payoff_matrix.append(evaluate_profile(root, profile))
-
-    return { 
-        # The function returns a dictionary like the following: 
-        # {'strategies': [({'P1_main': 'Cooperate'}, {'P2_main': 'Cooperate'}), 
-        # ({'P1_main': 'Cooperate'}, {'P2_main': 'Defect'}),
-        #  ({'P1_main': 'Defect'}, {'P2_main': 'Cooperate'}), 
-        #  ({'P1_main': 'Defect'}, {'P2_main': 'Defect'})], 
-        #  'payoff_matrix': [(3, 3), (0, 5), (5, 0), (1, 1)]}
-        # the 'strategies' list contains tuples of dictionaries representing each player’s actions at their respective info sets (P1_main and P2_main),
-        #  and 'payoff_matrix' contains the corresponding payoff tuples.
-        
-    "strategies": strategy_profiles,   
-    "payoff_matrix": payoff_matrix  # matrix of payoffs for all strategy profiles
-}
 
+def iter_profile_payoffs(root, players=None, chunk_size=1 << 16):
+    """
+    Stream the payoffs of all strategy profiles without keeping them in memory.
 
-def compute_expected_payoff(payoff_matrix, mixed_p1, mixed_p2):
+    Profiles are numbered in row-major order of the (n_1, ..., n_N) tensor and every
+    player's strategy is a mixed-radix integer (see StrategySpace). Yields
+    (start, payoffs) pairs where payoffs is a (chunk, N) array for the profiles
+    start, start + 1, ...; each chunk walks the tree for all its profiles at once.
     """
-    Function to calculate the payoff given probabilities of P1 & P2
+    players, spaces = _player_spaces(root, players)
+    return _walk_profiles(spaces, _compile_tree(root, players, spaces), chunk_size)
+
+
+def _walk_profiles(spaces, compiled, chunk_size):
+    node_player, node_info, child, payoffs = compiled
+    shape = tuple(len(space) for space in spaces)
+    total = int(np.prod(shape, dtype=np.int64))
+
+    for start in range(0, total, chunk_size):
+        profile = np.arange(start, min(start + chunk_size, total))
+        strategy = np.unravel_index(profile, shape)
+        digits = [space.digits(idx) for space, idx in zip(spaces, strategy)]
+
+        node = np.zeros(len(profile), dtype=np.int64)
+        active = np.nonzero(node_player[node] >= 0)[0]
+        profiling.count("profiles evaluated", len(profile))
+        while len(active):
+            profiling.count("nodes visited", len(active))
+            current = node[active]
+            mover = node_player[current]
+            action = np.empty(len(active), dtype=np.int64)
+            for p in range(len(spaces)):
+                sel = mover == p
+                if sel.any():
+                    action[sel] = digits[p][active[sel], node_info[current[sel]]]
+            node[active] = child[current, action]
+            active = active[node_player[node[active]] >= 0]
+
+        yield start, payoffs[node]
+
+
+def _expand(axes, value, target):
+    """Reshape a compact subtree value over `axes` so it lines up with the `target` axes."""
+    if axes == target:
+        return value
+    shape = []
+    k = 0
+    for axis in target:
+        if k < len(axes) and axes[k] == axis:
+            shape.append(value.shape[k])
+            k += 1
+        else:
+            shape.append(1)
+    return value.reshape(shape + [value.shape[-1]])
 
-    :param payoff_matrix: list of payoff tuples [(p1_payoff, p2_payoff), ...]
-    :param mixed_p1:  list of probabilities over Player 1’s strategies
-    :param mixed_p2: list of probabilities over Player 2’s strategies
 
-    Returns: (expected_p1, expected_p2)
+def _root_payoffs(tree):
+    """Payoff vector of the root if the whole game is a single terminal node, else None."""
+    return tree.payoffs[tree.payoff_row[0]] if tree.payoff_row[0] >= 0 else None
+
+
+def _decision_post_order(tree):
+    """
+    Decision nodes of a FlatGameTree, children first.
+
+    Yields (node, player, info_set, actions, children) where children lists
+    (child node, payoffs) in action order; payoffs is None for a decision child.
+    Nodes shared by several parents are yielded once.
+    """
+    first_child = tree.first_child.tolist()
+    child = tree.child.tolist()
+    child_action = tree.child_action.tolist()
+    row = tree.payoff_row.tolist()
+    node_player = tree.node_player.tolist()
+    node_info = tree.node_info.tolist()
+    # children are numbered after their parents
+    for v in range(len(tree) - 1, -1, -1):
+        if row[v] >= 0:
+            continue
+        edges = range(first_child[v], first_child[v + 1])
+        actions = [tree.actions[child_action[e]] for e in edges]
+        children = [(child[e], tree.payoffs[row[child[e]]] if row[child[e]] >= 0 else None) for e in edges]
+        yield v, tree.players[node_player[v]], tree.info_ids[node_info[v]], actions, children
+
+
+def _payoff_tensor_by_info_sets(root, players, spaces):
+    """
+    Payoffs of all profiles in one post-order pass over the tree.
+
+    Every info set is an axis (players in order, info sets in StrategySpace
+    order). A subtree's value is kept compact as (axes, array): only the info
+    sets met inside the subtree get a dimension. A decision node broadcasts each
+    child's value onto the slice of its own axis that picks that child's action,
+    so the work per node is proportional to the part of the output it fills.
+    Shared subtrees are valued once.
+
+    Returns (array over all info set axes + payoff axis, radices).
+    """
+    n_players = len(players)
+    player_pos = {p: i for i, p in enumerate(players)}
+    axis_of = {}
+    radices = []
+    for p, space in enumerate(spaces):
+        for j, iid in enumerate(space.info_ids):
+            axis_of[(p, iid)] = len(radices)
+            radices.append(space.radices[j])
+
+    tree = game_index(root).tree
+    profiling.count("nodes visited", len(tree))
+    payoffs = _root_payoffs(tree)
+    if payoffs is not None:
+        return np.asarray(payoffs).reshape((1,) * len(radices) + (n_players,)), tuple(radices)
+
+    # how many parents still need each node, so values can be freed early
+    waiting = np.bincount(tree.child, minlength=len(tree)).tolist()
+    values = {}
+    for key, mover, info_set, _, children in _decision_post_order(tree):
+        if mover not in player_pos:
+            raise ValueError(f"Decision node of {mover!r}, which is not one of {players}")
+        axis = axis_of[(player_pos[mover], info_set)]
+
+        # leaves only: the node's value is just their payoff vectors along its axis
+        if all(payoffs is not None for _, payoffs in children):
+            values[key] = ((axis,), np.asarray([payoffs for _, payoffs in children]))
+            continue
+
+        parts = []
+        for d, (c, payoffs) in enumerate(children):
+            if payoffs is not None:
+                parts.append(((), np.asarray(payoffs)))
+                continue
+            axes, value = values[c]
+            if axis in axes:
+                # the subtree meets this info set again: keep the matching choice only
+                k = axes.index(axis)
+                value = np.take(value, d, axis=k)
+                axes = axes[:k] + axes[k + 1:]
+            parts.append((axes, value))
+            waiting[c] -= 1
+            if waiting[c] == 0:
+                del values[c]
+
+        first = parts[0][0]
+        if all(axes == first for axes, _ in parts):
+            union = first
+            arrays = [value for _, value in parts]
+        else:
+            union = tuple(sorted(set().union(*(axes for axes, _ in parts))))
+            arrays = [_expand(axes, value, union) for axes, value in parts]
+            shape = np.broadcast_shapes(*(value.shape for value in arrays))
+            arrays = [np.broadcast_to(value, shape) for value in arrays]
+        position = sum(1 for x in union if x < axis)
+        values[key] = (union[:position] + (axis,) + union[position:], np.stack(arrays, axis=position))
+
+    axes, value = values[0]
+    full = tuple(range(len(radices)))
+    return _expand(axes, value, full), tuple(radices)
+
+
+def extensive_to_normal_form(root, players=None, out=None, method="tensor", chunk_size=1 << 16, reduced=False):
+    """
+    Convert an extensive form tree with any number of players into its normal form.
+    `root` is the root ExtensiveFormNode or a FlatGameTree.
+
+    Returns a NormalFormGame whose payoffs tensor has one axis per player
+    (in the order of `players`, by default the players of the payoff columns)
+    plus a trailing axis with the payoff vector.
+    result["strategies"] and result["payoff_matrix"] still give the old lists.
+
+    method="tensor" builds the tensor in a single descent of the tree, so the cost
+    is close to the size of the output. method="stream" fills it chunk by chunk
+    from iter_profile_payoffs and keeps the working memory bounded, which suits a
+    preallocated C-contiguous `out` array (e.g. an np.memmap) of shape
+    (n_1, ..., n_N, N); both methods can write into `out`.
+
+    reduced=True gives the reduced normal form: strategies that only differ at
+    info sets their own player's moves make unreachable are merged while they
+    are generated, and every player's strategies are a ReducedStrategySpace
+    (see completions()/reduce() for the mapping to the full strategies). Its
+    payoffs are always filled by the chunked walk, whose cost follows the
+    reduced size.
+    """
+    players, spaces = _player_spaces(root, players)
+    if reduced:
+        with profiling.timer("reduced strategy spaces"):
+            spaces = [ReducedStrategySpace.from_tree(root, p, space) for p, space in zip(players, spaces)]
+    shape = tuple(len(space) for space in spaces) + (len(players),)
+
+    if method not in ("tensor", "stream"):
+        raise ValueError(f"Unknown method {method!r}")
+    if method == "tensor" and not reduced:
+        with profiling.timer("payoff tensor"):
+            value, radices = _payoff_tensor_by_info_sets(root, players, spaces)
+        profiling.count("profiles evaluated", int(np.prod(shape[:-1], dtype=np.int64)))
+        if out is None:
+            out = np.empty(shape, dtype=value.dtype)
+        elif out.shape != shape or not out.flags.c_contiguous:
+            raise ValueError(f"out must be a C-contiguous array of shape {shape}")
+        # the info set axes of a player, most significant first, form its strategy axis
+        out.reshape(radices + (len(players),))[...] = value
+    else:
+        compiled = _compile_tree(root, players, spaces)
+        if out is None:
+            out = np.empty(shape, dtype=compiled[3].dtype)
+        elif out.shape != shape or not out.flags.c_contiguous:
+            raise ValueError(f"out must be a C-contiguous array of shape {shape}")
+        flat = out.reshape(-1, len(players))
+        with profiling.timer("profile walk"):
+            for start, payoffs in _walk_profiles(spaces, compiled, chunk_size):
+                flat[start:start + len(payoffs)] = payoffs
+
+    return NormalFormGame(players, out, spaces, [space.info_ids for space in spaces])
+
+
+def _payoff_tensor(payoff_matrix, n1, n2):
+    """(n1, n2, 2) payoff array from a NormalFormGame, an array or the legacy list."""
+    if isinstance(payoff_matrix, NormalFormGame):
+        return payoff_matrix.payoffs
+    payoffs = np.asarray(payoff_matrix)
+    if payoffs.ndim == 2:
+        # legacy list: one payoff tuple per profile, row-major over (P1, P2)
+        payoffs = payoffs.reshape(n1, n2, payoffs.shape[-1])
+    return payoffs
+
+
+def batch_expected_payoffs(payoff_matrix, mixed_p1, mixed_p2, cross=False):
     """
-    # Convert to numpy
-    mixed_p1 = np.array(mixed_p1)
-    mixed_p2 = np.array(mixed_p2)
+    Expected payoffs of many pairs of mixed strategies at once
 
-    # Expected payoff is a double sum:
-    # sum_i sum_j [ p1[i] * p2[j] * payoff(i,j) ]
+    :param payoff_matrix: NormalFormGame, (n1, n2, 2) payoff array or legacy list of payoff tuples
+    :param mixed_p1: (k, n1) array, one Player 1 mixture per row
+    :param mixed_p2: (k, n2) array, one Player 2 mixture per row
+    :param cross: if True, evaluate every row of mixed_p1 against every row of mixed_p2
+                  (mixed_p2 may then have any number of rows l)
 
-    expected_p1 = 0.0
-    expected_p2 = 0.0
+    Returns: (k, 2) array of (expected_p1, expected_p2), or (k, l, 2) when cross=True
+    """
+    mixed_p1 = np.atleast_2d(np.asarray(mixed_p1, dtype=float))
+    mixed_p2 = np.atleast_2d(np.asarray(mixed_p2, dtype=float))
+    payoffs = _payoff_tensor(payoff_matrix, mixed_p1.shape[1], mixed_p2.shape[1])
 
-    index = 0
-    for i in range(len(mixed_p1)):
-        for j in range(len(mixed_p2)):
-            p = mixed_p1[i] * mixed_p2[j]
-            p1_pay, p2_pay = payoff_matrix[index]
+    # sum_i sum_j [ p1[i] * p2[j] * payoff(i,j) ] for every requested pair
+    if cross:
+        return np.einsum("ai,ijp,bj->abp", mixed_p1, payoffs, mixed_p2, optimize=True)
+    if mixed_p1.shape[0] != mixed_p2.shape[0]:
+        raise ValueError("mixed_p1 and mixed_p2 must have the same number of rows unless cross=True")
+    return np.einsum("ki,ijp,kj->kp", mixed_p1, payoffs, mixed_p2, optimize=True)
 
-            expected_p1 += p * p1_pay
-            expected_p2 += p * p2_pay
 
-            index += 1
+def compute_expected_payoff(payoff_matrix, mixed_p1, mixed_p2):
+    """
+    Function to calculate the payoff given probabilities of P1 & P2
 
-    return expected_p1, expected_p2    
+    :param payoff_matrix: list of payoff tuples [(p1_payoff, p2_payoff), ...],
+                          a (n1, n2, 2) payoff array or a NormalFormGame
+    :param mixed_p1:  list of probabilities over Player 1’s strategies
+    :param mixed_p2: list of probabilities over Player 2’s strategies
+
+    Returns: (expected_p1, expected_p2)
+    """
+    expected = batch_expected_payoffs(payoff_matrix, [mixed_p1], [mixed_p2])[0]
+    return float(expected[0]), float(expected[1])
 
 def get_mixed_probs(root, result):
-    # get set of unique actions for each player
-    info_sets = collect_info_sets(root)
+    # one probability per pure strategy of the normal form, in its label order
+    if isinstance(result, NormalFormGame):
+        game = result
+    else:
+        game = NormalFormGame.from_legacy(result["strategies"], result["payoff_matrix"], game_index(root).players)
     # define dict to store probabilities for each player
     # {"Player 1: [prob1, prob2],..."}
     probs = {}
 
-    # loop through each player's info set
-    for player, actions in info_sets.items():
+    # loop through each player's strategies
+    for player, labels in zip(game.players, game.labels):
         print(f"Enter Probabilities for {player}")
         probs[player] = []
 
-        action_key = f"P{player[-1]}_main"
-
         a=0  # while loop iterator
-        while a < len(actions[action_key]):
-            prob = float(input(f"Prob of Strategy {a+1}: "))
+        while a < len(labels):
+            prob = float(input(f"Prob of Strategy {a+1} ({labels[a]}): "))
 
             if prob<0 or prob>1:
                 print("Error! Enter a probability between 1 and 0")
@@ -145,7 +702,7 @@ def get_mixed_probs(root, result):
             probs[player].append(prob)
 
             # validate sum = 1
-            if len(probs[player]) == len(actions[action_key]):
+            if len(probs[player]) == len(labels):
                 if sum(probs[player]) != 1:
                     print("Try again and Make sure your probabilities for each player sum up to 1")
                     a=0  # restart from the beginning
@@ -156,11 +713,11 @@ def get_mixed_probs(root, result):
     
     if len(probs)==2:
         # extract P1 and P2 probabilities
-        p1 = probs["Player 1"]
-        p2 = probs["Player 2"]
+        p1 = probs[game.players[0]]
+        p2 = probs[game.players[1]]
 
         exp1, exp2 = compute_expected_payoff(
-            result['payoff_matrix'],
+            game,
             p1, p2
         )
         print("Mixed strategy for P1:\n", p1)
@@ -0,0 +1,265 @@
+"""
+Unattended analysis of many game files.
+
+    python batch.py games/ more.nfg manifest.txt -o results.jsonl -a pure_nash,mixed_nash -j 8 -t 60
+
+Every game file (.nfg, .efg or a saved .game file; directories are searched,
+manifests list one path per line) is analysed in a pool of worker processes
+and one JSON line per game is appended to the output as soon as it is done.
+The output doubles as the checkpoint: running the same command again skips
+the games already in it, so an interrupted run picks up where it stopped.
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+from Models.ExtensiveForm import CHANCE, ExtensiveFormNode
+from Models.FlatGameTree import FlatGameTree
+from Models.NormalForm import extensive_to_normal_form
+from utilities.best_responses import compute_best_responses, pure_nash_mask
+from utilities.dominance import get_strict_dominance, get_weak_dominance, mixed_dominance, rationalizability
+from utilities.game_io import GAME_EXTENSIONS, load_game, read_header
+from utilities.mixed_nash import mixed_nash
+from utilities import profiling
+
+
+def analyse_normal_form(game):
+    return {"players": game.players, "shape": list(game.shape), "labels": game.labels}
+
+
+def analyse_dominance(game):
+    return {
+        "strict": get_strict_dominance(game, players=game.players),
+        "weak": get_weak_dominance(game, players=game.players),
+        "mixed": mixed_dominance(game),
+    }
+
+
+def analyse_best_responses(game):
+    return compute_best_responses(game, players=game.players)
+
+
+def analyse_pure_nash(game):
+    return [
+        {"profile": [game.labels[k][i] for k, i in enumerate(index)], "payoffs": game.payoffs[tuple(index)].tolist()}
+        for index in np.argwhere(pure_nash_mask(game.payoffs))
+    ]
+
+
+def analyse_mixed_nash(game):
+    if game.num_players != 2:
+        return {"skipped": "mixed equilibria are computed for two-player games only"}
+    # all equilibria while support enumeration stays cheap, one equilibrium beyond (as in the GUI)
+    return mixed_nash(game, method="support" if min(game.shape) <= 10 else "lemke-howson")
+
+
+def analyse_rationalizability(game):
+    result = rationalizability(game)
+    return {"surviving": result["surviving"], "trace": result["trace"], "rounds": result["rounds"]}
+
+
+ANALYSES = {
+    "normal_form": analyse_normal_form,
+    "dominance": analyse_dominance,
+    "best_responses": analyse_best_responses,
+    "pure_nash": analyse_pure_nash,
+    "mixed_nash": analyse_mixed_nash,
+    "rationalizability": analyse_rationalizability,
+}
+
+
+def _jsonable(value):
+    """Analysis results as plain JSON: tuple keys joined, sets sorted, numpy scalars unwrapped."""
+    if isinstance(value, dict):
+        return {(" / ".join(map(str, k)) if isinstance(k, tuple) else str(k)): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted(_jsonable(v) for v in value)
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class TaskTimeout(Exception):
+    pass
+
+
+def _alarm(signum, frame):
+    raise TaskTimeout()
+
+
+def run_task(path, analyses, timeout=None, profile=False):
+    """
+    Load one game file and run the analyses on its normal form; returns its JSON record.
+    Runs in a worker process. With a timeout (seconds, Unix only) the analyses
+    still running when it expires are reported as timed out, the ones already
+    done are kept. profile=True adds the task's profiling report as record["profile"].
+    """
+    record = {"game": path, "status": "ok", "results": {}}
+    start = time.perf_counter()
+    if profile:
+        profiling.start()
+    use_alarm = timeout is not None and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        title, players = read_header(path)
+        game = load_game(path)
+        if isinstance(game, (ExtensiveFormNode, FlatGameTree)):
+            # payoff columns follow the players the file declares
+            game = extensive_to_normal_form(game, players=[p for p in players if p != CHANCE])
+        record["title"] = title
+        for name in analyses:
+            record["results"][name] = _jsonable(ANALYSES[name](game))
+    except TaskTimeout:
+        record["status"] = "timeout"
+        record["error"] = f"Timed out after {timeout} s"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        if profile:
+            record["profile"] = profiling.stop().as_dict()
+    record["elapsed"] = round(time.perf_counter() - start, 6)
+    return record
+
+
+def find_games(sources):
+    """
+    Game files named by the command line, in order and without repeats: files,
+    directories (searched recursively) and manifests (.txt / .lst, one path per
+    line, relative to the manifest; blank lines and # comments are skipped).
+    """
+    seen = set()
+    for source in sources:
+        if os.path.isdir(source):
+            for folder, dirs, files in os.walk(source):
+                dirs.sort()
+                for f in sorted(files):
+                    path = os.path.join(folder, f)
+                    if os.path.splitext(f)[1].lower() in GAME_EXTENSIONS and path not in seen:
+                        seen.add(path)
+                        yield path
+        elif os.path.splitext(source)[1].lower() in (".txt", ".lst"):
+            base = os.path.dirname(source)
+            with open(source, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        path = os.path.normpath(os.path.join(base, line))
+                        if path not in seen:
+                            seen.add(path)
+                            yield path
+        elif source not in seen:
+            seen.add(source)
+            yield source
+
+
+def completed_games(output):
+    """
+    Games that already have a record in the output file. A last line cut short
+    by an interrupted run is removed so that new records start on a fresh line.
+    """
+    done = set()
+    if not os.path.exists(output):
+        return done
+    with open(output, "rb+") as f:
+        complete = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            complete += len(line)
+            try:
+                done.add(json.loads(line)["game"])
+            except (ValueError, KeyError):
+                continue
+        f.truncate(complete)
+    return done
+
+
+def run_batch(sources, output, analyses=tuple(ANALYSES), workers=None, timeout=None, restart=False,
+              profile=False, log=sys.stderr):
+    """
+    Analyse every game of `sources` with a process pool, appending one JSON line per
+    game to `output` as results come in. Games already in `output` are skipped
+    unless restart is True. Only a few tasks per worker are queued at a time,
+    so the list of games can be much larger than memory. With profile=True
+    every record carries its profiling report and the sum of them is printed
+    to `log` at the end. Returns the number of records written.
+    """
+    unknown = [a for a in analyses if a not in ANALYSES]
+    if unknown:
+        raise ValueError(f"Unknown analyses {unknown}, choose from {list(ANALYSES)}")
+    workers = workers or os.cpu_count() or 1
+    done = set() if restart else completed_games(output)
+    games = (path for path in find_games(sources) if path not in done)
+
+    written = failed = 0
+    reports = []
+    start = time.perf_counter()
+    with open(output, "w" if restart else "a", encoding="utf-8") as out, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < 4 * workers:
+                path = next(games, None)
+                if path is None:
+                    exhausted = True
+                else:
+                    pending.add(pool.submit(run_task, path, list(analyses), timeout, profile))
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record = future.result()
+                out.write(json.dumps(record) + "\n")
+                written += 1
+                failed += record["status"] != "ok"
+                if profile:
+                    reports.append(record["profile"])
+            # each line is on disk before the next batch is waited for
+            out.flush()
+            if log is not None:
+                log.write(f"\r{written} games, {failed} failed, {time.perf_counter() - start:.1f} s")
+                log.flush()
+    if log is not None:
+        log.write(f"\n{len(done)} games were already done\n" if done else "\n")
+        if profile:
+            log.write(profiling.ProfileReport.merge(reports).format() + "\n")
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse game files in parallel and write the results as JSON lines.")
+    parser.add_argument("sources", nargs="+", help="game files, directories of game files or manifests (.txt / .lst)")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="JSON lines output, also the resume checkpoint")
+    parser.add_argument("-a", "--analyses", default=",".join(ANALYSES),
+                        help=f"comma-separated subset of {', '.join(ANALYSES)} (default: all)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-t", "--timeout", type=float, default=None, help="seconds allowed per game")
+    parser.add_argument("--restart", action="store_true", help="overwrite the output instead of resuming it")
+    parser.add_argument("--profile", action="store_true",
+                        help="record timings, work counters and peak memory per game and print their total")
+    args = parser.parse_args(argv)
+
+    analyses = [a.strip() for a in args.analyses.split(",") if a.strip()]
+    try:
+        run_batch(args.sources, args.output, analyses, args.workers, args.timeout, args.restart, args.profile)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import numpy as np
+from Models.ExtensiveForm import ExtensiveFormNode, NodeInterner
+from Models.NormalForm import NormalFormGame, StrategySpace
+
+
+def _players(n):
+    return [f"Player {k + 1}" for k in range(n)]
+
+
+def _actions(player, n):
+    return [f"{player[0]}{player[-1]}_{j + 1}" for j in range(n)]
+
+
+def random_tensor_game(shape, seed=0, low=-10, high=10):
+    """
+    NormalFormGame with len(shape) players and independent integer payoffs in
+    [low, high]; player k has shape[k] strategies, each at a single info set.
+    """
+    rng = np.random.default_rng(seed)
+    players = _players(len(shape))
+    payoffs = rng.integers(low, high + 1, size=tuple(shape) + (len(shape),))
+    spaces = [StrategySpace([f"P{k + 1}_main"], [_actions(p, n)]) for k, (p, n) in enumerate(zip(players, shape))]
+    return NormalFormGame(players, payoffs, spaces)
+
+
+def random_bimatrix(n, m, seed=0, low=-10, high=10):
+    """Random n x m two-player game, see random_tensor_game."""
+    return random_tensor_game((n, m), seed, low, high)
+
+
+def random_symmetric_game(k, seed=0, low=-10, high=10):
+    """Random symmetric two-player game with k strategies: Player 2's payoffs are Player 1's transposed."""
+    game = random_tensor_game((k, k), seed, low, high)
+    game.payoffs[..., 1] = game.payoffs[..., 0].T
+    return game
+
+
+def random_tree(depth, branching, n_players=2, seed=0, info_set_size=1, low=-10, high=10):
+    """
+    Random game tree in which every decision node has `branching` actions and
+    the players move in turn, one per level, for `depth` levels.
+
+    With info_set_size=1 the game has perfect information. Otherwise the nodes
+    of every level are grouped, left to right, in info sets of info_set_size
+    nodes, so the mover does not know which node of the group it is at.
+    Built level by level, so deep trees do not recurse.
+    """
+    rng = np.random.default_rng(seed)
+    players = _players(n_players)
+    root = ExtensiveFormNode()
+    level = [root]
+    for d in range(depth):
+        player = players[d % n_players]
+        actions = _actions(player, branching)
+        following = []
+        for i, node in enumerate(level):
+            node.player = player
+            node.actions = list(actions)
+            node.info_set = f"P{d % n_players + 1}_d{d}_{i // info_set_size}"
+            for a in actions:
+                child = ExtensiveFormNode()
+                node.children[a] = child
+                following.append(child)
+        level = following
+    for leaf, payoffs in zip(level, rng.integers(low, high + 1, size=(len(level), n_players)).tolist()):
+        leaf.payoffs = tuple(payoffs)
+    return root
+
+
+def repeated_game_tree(stage_payoffs, rounds, actions=None):
+    """
+    Finitely repeated two-player simultaneous game with an (n, m, 2) stage
+    payoff grid. Both players see the running score after every round, which
+    is what the continuation game depends on, so equal continuations are
+    shared through a NodeInterner (as in games.build_repeated_pd_tree).
+    """
+    stage = np.asarray(stage_payoffs)
+    n, m = stage.shape[:2]
+    p1_actions, p2_actions = actions or (_actions("Player 1", n), _actions("Player 2", m))
+    stage = {(i, j): tuple(stage[i, j].tolist()) for i in range(n) for j in range(m)}
+    interner = NodeInterner()
+
+    states = [{(0, 0)}]
+    for _ in range(rounds):
+        states.append({(u1 + s1, u2 + s2) for u1, u2 in states[-1] for s1, s2 in stage.values()})
+
+    nodes = {score: interner.terminal(score) for score in states[rounds]}
+    for r in reversed(range(rounds)):
+        current = {}
+        for u1, u2 in states[r]:
+            p2_nodes = {
+                a1: interner.decision(
+                    "Player 2",
+                    p2_actions,
+                    {a2: nodes[(u1 + stage[i, j][0], u2 + stage[i, j][1])] for j, a2 in enumerate(p2_actions)},
+                    f"P2_round{r + 1}_{u1}_{u2}",
+                )
+                for i, a1 in enumerate(p1_actions)
+            }
+            current[(u1, u2)] = interner.decision("Player 1", p1_actions, p2_nodes, f"P1_round{r + 1}_{u1}_{u2}")
+        nodes = current
+    return nodes[(0, 0)]
+
+
+def random_repeated_game_tree(rounds, n=2, m=2, seed=0, low=0, high=5):
+    """repeated_game_tree of a random n x m stage game."""
+    rng = np.random.default_rng(seed)
+    return repeated_game_tree(rng.integers(low, high + 1, size=(n, m, 2)), rounds)
@@ -0,0 +1,210 @@
+"""
+Scaling benchmarks of the analysis utilities.
+
+    python -m benchmarks.run -o bench.json                      full sweep
+    python -m benchmarks.run --quick --compare bench.json       small sweep, compared with an earlier run
+
+Every benchmark builds its seeded game outside the timed region, then times the
+call `--repeat` times. Results go to JSON with the best and median time of
+each case, so two runs can be compared case by case; --compare exits with
+status 1 when a case got slower than --threshold times its earlier best.
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from Models.NormalForm import extensive_to_normal_form
+from utilities.best_responses import compute_best_responses
+from utilities.cfr import cfr
+from utilities.evolution import basins
+from utilities.dominance import get_strict_dominance, get_weak_dominance, mixed_dominance, rationalizability
+from utilities.learning import fictitious_play, regret_matching_plus
+from utilities.nash_equilibrium import pure_nash
+from games import build_kuhn_poker_tree
+from benchmarks.generators import random_bimatrix, random_symmetric_game, random_tensor_game, random_tree, random_repeated_game_tree
+
+
+def _quiet(f, *args, **kwargs):
+    # pure_nash prints its equilibria
+    with contextlib.redirect_stdout(io.StringIO()):
+        return f(*args, **kwargs)
+
+
+# normal form benchmarks: name -> call on the prepared game
+NORMAL_FORM_BENCHMARKS = {
+    "compute_best_responses": lambda game: compute_best_responses(game, players=game.players),
+    "pure_nash": lambda game: _quiet(pure_nash, game.players, game),
+    "get_strict_dominance": lambda game: get_strict_dominance(game, players=game.players),
+    "get_weak_dominance": lambda game: get_weak_dominance(game, players=game.players),
+    "mixed_dominance": mixed_dominance,
+    "rationalizability": rationalizability,
+}
+
+# two-player learning dynamics, run for a fixed number of iterations on the bimatrix games
+LEARNING_BENCHMARKS = {
+    "fictitious_play": lambda game: fictitious_play(game, iterations=200),
+    "regret_matching_plus": lambda game: regret_matching_plus(game, iterations=200),
+}
+
+EVOLUTION_BENCHMARKS = {
+    "replicator_basins": lambda game: basins(game, "replicator", count=1000, t_max=50),
+    "best_response_basins": lambda game: basins(game, "best-response", count=1000, t_max=50),
+}
+
+SWEEPS = {
+    "full": {
+        "bimatrix": [(4, 4), (16, 16), (64, 64), (256, 256), (1024, 1024)],
+        "tensor": [(8, 8, 8), (16, 16, 16), (32, 32, 32)],
+        "perfect_tree": [(3, 2), (4, 2), (5, 2), (3, 3)],
+        "imperfect_tree": [(4, 2, 2), (6, 2, 4), (8, 2, 16)],
+        "repeated": [1, 2],
+        "symmetric": [3, 8, 32],
+    },
+    "quick": {
+        "bimatrix": [(4, 4), (16, 16), (64, 64)],
+        "tensor": [(8, 8, 8)],
+        "perfect_tree": [(3, 2), (4, 2)],
+        "imperfect_tree": [(4, 2, 2), (6, 2, 4)],
+        "repeated": [1, 2],
+        "symmetric": [3, 8],
+    },
+}
+
+
+def cases(sweep, seed):
+    """(benchmark, params, build, run) for every case of a sweep."""
+    for name, run in NORMAL_FORM_BENCHMARKS.items():
+        for n, m in sweep["bimatrix"]:
+            yield name, {"game": "bimatrix", "shape": [n, m]}, lambda n=n, m=m: random_bimatrix(n, m, seed), run
+        for shape in sweep["tensor"]:
+            yield name, {"game": "tensor", "shape": list(shape)}, lambda shape=shape: random_tensor_game(shape, seed), run
+    for name, run in LEARNING_BENCHMARKS.items():
+        for n, m in sweep["bimatrix"]:
+            yield name, {"game": "bimatrix", "shape": [n, m]}, lambda n=n, m=m: random_bimatrix(n, m, seed), run
+    for name, run in EVOLUTION_BENCHMARKS.items():
+        for k in sweep["symmetric"]:
+            yield name, {"game": "symmetric", "strategies": k}, lambda k=k: random_symmetric_game(k, seed), run
+
+    convert = extensive_to_normal_form
+    for depth, branching in sweep["perfect_tree"]:
+        params = {"game": "perfect_tree", "depth": depth, "branching": branching}
+        yield "extensive_to_normal_form", params, lambda d=depth, b=branching: random_tree(d, b, seed=seed), convert
+    for depth, branching, size in sweep["imperfect_tree"]:
+        params = {"game": "imperfect_tree", "depth": depth, "branching": branching, "info_set_size": size}
+        build = lambda d=depth, b=branching, g=size: random_tree(d, b, seed=seed, info_set_size=g)
+        yield "extensive_to_normal_form", params, build, convert
+        yield "cfr", params, build, lambda root: cfr(root, iterations=100, check_every=100)
+    yield "cfr", {"game": "kuhn_poker"}, build_kuhn_poker_tree, lambda root: cfr(root, iterations=1000, check_every=1000)
+    for rounds in sweep["repeated"]:
+        params = {"game": "repeated", "rounds": rounds}
+        yield "extensive_to_normal_form", params, lambda r=rounds: random_repeated_game_tree(r, seed=seed), convert
+
+
+def case_key(record):
+    return record["benchmark"], json.dumps(record["params"], sort_keys=True)
+
+
+def time_case(run, game, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(game)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(sweep="full", repeat=3, seed=0, only=None, log=sys.stderr):
+    """Time every case of the sweep; returns the JSON-ready report."""
+    results = []
+    for benchmark, params, build, run in cases(SWEEPS[sweep], seed):
+        if only and not any(pattern in benchmark for pattern in only):
+            continue
+        game = build()
+        times = time_case(run, game, repeat)
+        record = {
+            "benchmark": benchmark,
+            "params": params,
+            "best": min(times),
+            "median": statistics.median(times),
+            "times": times,
+        }
+        results.append(record)
+        if log is not None:
+            log.write(f"{benchmark:<26} {json.dumps(params):<70} {record['best'] * 1000:10.2f} ms\n")
+            log.flush()
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.platform(),
+            "sweep": sweep,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, threshold=1.25, out=sys.stdout):
+    """
+    Print the best-time ratio of every case present in both reports and
+    return the cases that are more than `threshold` times slower.
+    """
+    before = {case_key(r): r for r in baseline["results"]}
+    regressions = []
+    for record in report["results"]:
+        old = before.get(case_key(record))
+        if old is None:
+            continue
+        ratio = record["best"] / old["best"] if old["best"] > 0 else float("inf")
+        flag = "  SLOWER" if ratio > threshold else ""
+        out.write(f"{record['benchmark']:<26} {json.dumps(record['params']):<70} {ratio:6.2f}x{flag}\n")
+        if ratio > threshold:
+            regressions.append((record, old, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the analysis utilities across game sizes.")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--quick", action="store_true", help="run the small sweep only")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (default 3)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated games")
+    parser.add_argument("--only", nargs="+", help="only the benchmarks whose name contains one of these")
+    parser.add_argument("--compare", help="earlier results JSON to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks("quick" if args.quick else "full", args.repeat, args.seed, args.only)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than {args.threshold}x")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,10 @@
-from Models.ExtensiveForm import ExtensiveFormNode
+import csv
+import os
+import re
+
+import numpy as np
+from Models.ExtensiveForm import ExtensiveFormNode, NodeInterner
+from utilities.game_io import load_library
 
 PLAYERS = ["Player 1", "Player 2"]
 
@@ -88,6 +94,215 @@ def build_hawk_dove_tree():
     return root
 
 
+# Ultimatum game: Player 1 proposes how much of the pie Player 2 gets,
+# Player 2 sees the offer and accepts or rejects it
+def build_ultimatum_tree(pie=10):
+    offers = [f"Offer {k}" for k in range(pie + 1)]
+    root = ExtensiveFormNode(player="Player 1", actions=offers, info_set="P1_offer")
+
+    for k, offer in enumerate(offers):
+        p2 = ExtensiveFormNode(player="Player 2", actions=["Accept", "Reject"], info_set=f"P2_{offer}")
+        root.children[offer] = p2
+        p2.children["Accept"] = ExtensiveFormNode(payoffs=(pie - k, k))
+        p2.children["Reject"] = ExtensiveFormNode(payoffs=(0, 0))
+
+    return root
+
+# Centipede game: players alternate between taking the larger share now or passing.
+# Taking at stage t gives the mover t + 2 and the other player t.
+# Built from the last stage backwards so long games do not recurse.
+def build_centipede_tree(rounds=6):
+    movers = PLAYERS
+
+    last = (rounds - 1) % 2
+    final = [0, 0]
+    final[last] = rounds
+    final[1 - last] = rounds + 2
+    node = ExtensiveFormNode(payoffs=tuple(final))
+
+    for t in reversed(range(rounds)):
+        mover = t % 2
+        take = [t, t]
+        take[mover] = t + 2
+        node = ExtensiveFormNode(
+            player=movers[mover],
+            actions=["Take", "Pass"],
+            children={"Take": ExtensiveFormNode(payoffs=tuple(take)), "Pass": node},
+            info_set=f"P{mover + 1}_stage{t}",
+        )
+
+    return node
+
+
+# Public goods game: every player simultaneously contributes their endowment to a
+# common pot or keeps it; the pot is multiplied and shared equally by everyone
+def build_public_goods_tree(n_players=3, endowment=10, multiplier=2):
+    players = [f"Player {k + 1}" for k in range(n_players)]
+    C, K = "Contribute", "Keep"
+
+    root = ExtensiveFormNode(player=players[0], actions=[C, K], info_set="P1_main")
+    level = [(root, ())]
+    for k in range(n_players):
+        next_level = []
+        for node, history in level:
+            for a in [C, K]:
+                moves = history + (a,)
+                if k + 1 < n_players:
+                    child = ExtensiveFormNode(player=players[k + 1], actions=[C, K], info_set=f"P{k + 2}_main")
+                    next_level.append((child, moves))
+                else:
+                    share = multiplier * endowment * moves.count(C) / n_players
+                    payoff = tuple(share + (endowment if m == K else 0) for m in moves)
+                    child = ExtensiveFormNode(payoffs=payoff)
+                node.children[a] = child
+        level = next_level
+
+    return root
+
+
+# Finitely repeated Prisoner's Dilemma: every round both players choose at the same time,
+# then see the running score. Continuation games only depend on the round and the score,
+# so they are built once per state and shared: the tree has 4**rounds leaves, the DAG
+# only a few thousand nodes for 10 rounds. Info sets are keyed by the score too, so
+# histories with equal scores share them: from round 3 on the players forget their own
+# past moves (imperfect recall). The normal form handles that; the sequence form refuses
+# the game and cfr() gives no guarantees on it, so it is not meant for them.
+def build_repeated_pd_tree(rounds=10):
+    C, D = "Cooperate", "Defect"
+    stage = {(C, C): (3, 3), (C, D): (0, 5), (D, C): (5, 0), (D, D): (1, 1)}
+    interner = NodeInterner()
+
+    # running scores that can be reached at the start of every round
+    states = [{(0, 0)}]
+    for _ in range(rounds):
+        states.append({(u1 + s1, u2 + s2) for u1, u2 in states[-1] for s1, s2 in stage.values()})
+
+    nodes = {score: interner.terminal(score) for score in states[rounds]}
+    for r in reversed(range(rounds)):
+        current = {}
+        for u1, u2 in states[r]:
+            p2_info = f"P2_round{r + 1}_{u1}_{u2}"
+            p2_nodes = {
+                a1: interner.decision(
+                    "Player 2",
+                    [C, D],
+                    {a2: nodes[(u1 + stage[(a1, a2)][0], u2 + stage[(a1, a2)][1])] for a2 in [C, D]},
+                    p2_info,
+                )
+                for a1 in [C, D]
+            }
+            current[(u1, u2)] = interner.decision("Player 1", [C, D], p2_nodes, f"P1_round{r + 1}_{u1}_{u2}")
+        nodes = current
+
+    return nodes[(0, 0)]
+
+
+# Kuhn poker: a chance node deals one of the cards J < Q < K to each player, both ante 1.
+# Player 1 checks or bets 1; facing a bet a player folds or calls, after a check Player 2
+# may check (showdown) or bet. Players only see their own card. It has a chance node, so
+# it is meant for cfr() and not listed in GAMES, whose analyses assume no chance moves.
+def build_kuhn_poker_tree():
+    cards = ["J", "Q", "K"]
+    check, bet, fold, call = "Check", "Bet", "Fold", "Call"
+    deals = [(c1, c2) for c1 in cards for c2 in cards if c1 != c2]
+    root = ExtensiveFormNode(actions=[f"{c1}{c2}" for c1, c2 in deals], probs={})
+
+    for c1, c2 in deals:
+        win = 1 if cards.index(c1) > cards.index(c2) else -1
+
+        def showdown(stake):
+            return ExtensiveFormNode(payoffs=(win * stake, -win * stake))
+
+        p1 = ExtensiveFormNode(player="Player 1", actions=[check, bet], info_set=f"P1_{c1}")
+        p2_check = ExtensiveFormNode(player="Player 2", actions=[check, bet], info_set=f"P2_{c2}_check")
+        p2_bet = ExtensiveFormNode(player="Player 2", actions=[fold, call], info_set=f"P2_{c2}_bet")
+        p1_bet = ExtensiveFormNode(player="Player 1", actions=[fold, call], info_set=f"P1_{c1}_check_bet")
+        p1.children = {check: p2_check, bet: p2_bet}
+        p2_check.children = {check: showdown(1), bet: p1_bet}
+        p2_bet.children = {fold: ExtensiveFormNode(payoffs=(1, -1)), call: showdown(2)}
+        p1_bet.children = {fold: ExtensiveFormNode(payoffs=(-1, 1)), call: showdown(2)}
+        root.children[f"{c1}{c2}"] = p1
+        root.probs[f"{c1}{c2}"] = 1 / len(deals)
+
+    return root
+
+
+# Two-player simultaneous game from a payoff grid: payoffs[i][j] = (payoff P1, payoff P2)
+# when Player 1 plays p1_actions[i] and Player 2 plays p2_actions[j]
+def build_matrix_game_tree(p1_actions, p2_actions, payoffs, info_sets=("P1_custom", "P2_custom")):
+    payoffs = np.asarray(payoffs).tolist()
+    root = ExtensiveFormNode(player="Player 1", actions=list(p1_actions), info_set=info_sets[0])
+    for i, a1 in enumerate(p1_actions):
+        p2 = ExtensiveFormNode(player="Player 2", actions=list(p2_actions), info_set=info_sets[1])
+        root.children[a1] = p2
+        for j, a2 in enumerate(p2_actions):
+            p2.children[a2] = ExtensiveFormNode(payoffs=tuple(payoffs[i][j]))
+    return root
+
+
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+def _payoff_pair(cell):
+    """(u1, u2) from a cell such as "3, 1", "(3;1)" or "3 1", None if it is not a pair."""
+    numbers = _NUMBER.findall(cell)
+    if len(numbers) != 2 or _NUMBER.sub("", cell).strip(" \t()[],;/|") != "":
+        return None
+    return tuple(int(x) if re.fullmatch(r"[-+]?\d+", x) else float(x) for x in numbers)
+
+
+def parse_payoff_grid(text):
+    """
+    Read a bimatrix pasted from a spreadsheet or loaded from a CSV file.
+
+    One line per Player 1 strategy, one cell per Player 2 strategy, each cell
+    holding both payoffs ("3, 1", "(3;1)", "3 1", ...). Cells are separated by
+    tabs when the text has any (spreadsheet paste), otherwise it is read as CSV,
+    so comma-separated pairs must be quoted there. An optional first row and
+    first column give the strategy names.
+
+    Returns (p1_actions, p2_actions, payoffs) where payoffs has shape (n, m, 2).
+    """
+    lines = [line for line in text.splitlines() if line.strip()]
+    if "\t" in text:
+        rows = [line.split("\t") for line in lines]
+    else:
+        rows = list(csv.reader(lines, skipinitialspace=True))
+    rows = [[cell.strip() for cell in row] for row in rows]
+    if not rows:
+        raise ValueError("No payoffs found")
+
+    # a header row / label column is whatever does not read as payoff pairs
+    has_header = all(_payoff_pair(cell) is None for cell in rows[0][1:]) and len(rows) > 1
+    body = rows[1:] if has_header else rows
+    has_labels = all(_payoff_pair(row[0]) is None for row in body)
+
+    width = max(len(row) for row in body) - (1 if has_labels else 0)
+    payoffs = []
+    for r, row in enumerate(body):
+        cells = row[1:] if has_labels else row
+        if len(cells) != width:
+            raise ValueError(f"Row {r + 1} has {len(cells)} payoff cells, expected {width}")
+        pairs = [_payoff_pair(cell) for cell in cells]
+        for c, pair in enumerate(pairs):
+            if pair is None:
+                raise ValueError(f"Cell ({r + 1}, {c + 1}) is not a payoff pair: {cells[c]!r}")
+        payoffs.append(pairs)
+
+    p1_actions = [row[0] for row in body] if has_labels else [f"R{i + 1}" for i in range(len(body))]
+    if has_header:
+        # the header may or may not have a cell above the label column
+        p2_actions = rows[0][1:] if has_labels and len(rows[0]) > width else rows[0]
+        p2_actions = (p2_actions + [""] * width)[:width]
+    else:
+        p2_actions = [""] * width
+    p2_actions = [name or f"C{j + 1}" for j, name in enumerate(p2_actions)]
+    for player, names in (("Player 1", p1_actions), ("Player 2", p2_actions)):
+        if len(set(names)) != len(names):
+            raise ValueError(f"Strategy names of {player} are not unique")
+    return p1_actions, p2_actions, np.array(payoffs)
+
+
 # User-defined game
 def build_custom_game():
     print("\n--- Create Your Own 2-Player Game ---")
@@ -99,32 +314,34 @@ def build_custom_game():
     p1_actions = [a.strip() for a in p1_actions]
     p2_actions = [a.strip() for a in p2_actions]
     
-    # This sets up Player 1's decision node.
-    root = ExtensiveFormNode(player="Player 1", actions=p1_actions, info_set="P1_custom")
-    
     # Ask payoff for each strategy profile
+    payoffs = []
     for a1 in p1_actions:
-        p2 = ExtensiveFormNode(player="Player 2", actions=p2_actions, info_set="P2_custom")
-        root.children[a1] = p2
-        
+        row = []
         for a2 in p2_actions:
             print(f"\nEnter payoffs for profile: ({a1}, {a2})")
             
             p1 = int(input("  Payoff Player 1: "))
             p2p = int(input("  Payoff Player 2: "))
             
-            payoff = (p1, p2p)
-            p2.children[a2] = ExtensiveFormNode(payoffs=payoff)
+            row.append((p1, p2p))
+        payoffs.append(row)
     
+    root = build_matrix_game_tree(p1_actions, p2_actions, payoffs)
     print("\nCustom game created successfully!")
     return root
 
 
+# Game files (Gambit .nfg / .efg and saved .game files) in this folder are listed with
+# the built-in games; set GAME_LIBRARY to use another folder
+GAME_LIBRARY = os.environ.get("GAME_LIBRARY", os.path.join(os.path.dirname(os.path.abspath(__file__)), "game_library"))
+
 GAMES = {
     "Prisoner's Dilemma": build_pd_tree,
     "Battle of the Sexes": build_bos_tree,
     "Matching Pennies": build_mp_tree,
     "Hawk-Dove Game": build_hawk_dove_tree,
+    **{name: build for name, build in load_library(GAME_LIBRARY).items()},
     "Custom Game": build_custom_game
 }
 
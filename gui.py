@@ -1,13 +1,18 @@
 import streamlit as st
 import numpy as np
-from graphviz import Digraph
+import pandas as pd
 
-from games import GAMES, PLAYERS
-from Models.NormalForm import extensive_to_normal_form, get_mixed_probs, compute_expected_payoff
-from utilities.visualization import print_tree, print_normal_form
+from games import GAMES, PLAYERS, build_matrix_game_tree, parse_payoff_grid
+from Models.NormalForm import NormalFormGame, extensive_to_normal_form, get_mixed_probs, compute_expected_payoff
+from utilities.visualization import print_tree, print_normal_form, TreeRenderer
 from utilities.nash_equilibrium import pure_nash
-from utilities.dominance import get_strict_dominance, get_weak_dominance, mixed_strategy_dominance_3x3, mixed_strategy_dominance_3x2, rationalizability_2x2
-from utilities.best_responses import compute_best_responses
+from utilities.dominance import get_strict_dominance, get_weak_dominance, mixed_dominance, rationalizability
+from utilities.best_responses import compute_best_responses, pure_nash_mask
+from utilities.mixed_nash import mixed_nash
+from utilities.evolution import DYNAMICS, symmetric_payoffs, rest_points, basins, phase_portrait
+from utilities.cache import AnalysisCache, tree_fingerprint, game_fingerprint
+from utilities.game_io import game_tree
+from utilities import profiling
 
 st.markdown("""
 <style>
@@ -54,15 +59,25 @@ if 'normal_form' not in st.session_state:
 if 'custom_game_ready' not in st.session_state:
     st.session_state.custom_game_ready = False
 
-def display_payoff_table(strategies, payoff_matrix, p1_actions, p2_actions):
+
+# games with more cells than this are shown as a paged table instead of one HTML table
+HTML_TABLE_CELLS = 400
+TABLE_PAGE_ROWS = 50
+# nodes drawn in the extensive form before the rest is collapsed
+TREE_MAX_NODES = 300
+
+
+@st.cache_resource
+def analysis_cache():
+    """One memo of analysis results for the whole server, keyed by game content."""
+    return AnalysisCache()
+
+
+cache = analysis_cache()
+
+def display_payoff_table(game, p1_actions, p2_actions):
     """Display payoff matrix as a styled HTML table"""
-    table_data = {}
-    for (strat, payoff) in zip(strategies, payoff_matrix):
-        a1 = list(strat[0].values())[0]
-        a2 = list(strat[1].values())[0]
-        if a1 not in table_data:
-            table_data[a1] = {}
-        table_data[a1][a2] = f"({payoff[0]}, {payoff[1]})"
+    payoffs = game.payoffs
     
     # Build HTML table
     html = """
@@ -81,37 +96,33 @@ def display_payoff_table(strategies, payoff_matrix, p1_actions, p2_actions):
         row_color = "#ecf0f1" if idx % 2 == 0 else "#ffffff"  # alternating row colors
         html += f'<tr style="background-color:{row_color};">'
         html += f'<td style="border: 1px solid #bdc3c7; padding: 10px; font-weight:bold;">{a1}</td>'
-        for a2 in p2_actions:
-            html += f'<td style="border: 1px solid #bdc3c7; padding: 10px;">{table_data[a1][a2]}</td>'
+        for j in range(len(p2_actions)):
+            cell = f"({payoffs[idx, j, 0]}, {payoffs[idx, j, 1]})"
+            html += f'<td style="border: 1px solid #bdc3c7; padding: 10px;">{cell}</td>'
         html += "</tr>"
 
     html += "</tbody></table>"
     return html
 
-def draw_extensive_form(node, dot=None, parent_id=None):
-    """Recursive function to create Graphviz diagram for extensive form"""
-    if dot is None:
-        dot = Digraph(format="png")
-        dot.attr('node', shape='circle', fontsize='12', fontname='Arial')
-
-    node_id = str(id(node))
-    if node.is_terminal():
-        label = f"{node.payoffs}"
-        dot.node(node_id, label=label, shape='box', style='filled', fillcolor='#d5f4e6')
-    else:
-        label = f"{node.player}"
-        dot.node(node_id, label=label, shape='circle', style='filled', fillcolor='#f9d5e5')
-
-    if parent_id is not None:
-        dot.edge(parent_id, node_id, label=getattr(node, 'action_from_parent', ''))
-
-    for action, child in node.children.items():
-        child.action_from_parent = str(action)
-        draw_extensive_form(child, dot, node_id)
+def path_label(path):
+    """Display name of the node reached by a tuple of actions."""
+    return " → ".join(map(str, path)) or "(root)"
 
-    return dot
+def path_actions(label):
+    return () if label == "(root)" else tuple(label.split(" → "))
 
+def payoff_table_page(payoffs, p1_actions, p2_actions, start, stop):
+    """Rows start..stop of the payoff grid as a DataFrame of "(u1, u2)" cells."""
+    rows = np.asarray(payoffs)[start:stop].tolist()
+    cells = [[f"({u1}, {u2})" for u1, u2 in row] for row in rows]
+    return pd.DataFrame(cells, index=p1_actions[start:stop], columns=p2_actions)
 
+def safe_mixed_nash(game, method):
+    """mixed_nash, or None when Lemke-Howson fails; the failure is cached too, so it is not rerun."""
+    try:
+        return mixed_nash(game, method=method)
+    except RuntimeError:
+        return None
 
 st.title("Game Theory Analyzer")
 st.markdown("Analyze game theory: extensive and normal forms, dominance, best responses, mixed strategies, and Nash equilibria.")
@@ -121,8 +132,7 @@ with st.sidebar:
     st.header("Game Selection")
     game_choice = st.selectbox(
         "Choose a game:",
-        ["Select a game...", "Prisoner's Dilemma", "Battle of the Sexes", 
-         "Matching Pennies", "Hawk-Dove Game", "Custom Game"]
+        ["Select a game...", *GAMES]
     )
     
     if game_choice != "Select a game...":
@@ -132,93 +142,177 @@ with st.sidebar:
                 st.session_state.custom_game_ready = False
             else:
                 st.session_state.game_selected = game_choice
+                # a tree, or a NormalFormGame for normal form library files
                 st.session_state.game_tree = GAMES[game_choice]()
-                st.session_state.normal_form = None
+                st.session_state.normal_form = (st.session_state.game_tree
+                                                if isinstance(st.session_state.game_tree, NormalFormGame) else None)
                 st.success(f"✓ {game_choice} loaded!")
 
+    st.header("Performance")
+    show_performance = st.checkbox("Collect performance data", help="Time the analyses of every rerun and count their work")
+    trace_memory = show_performance and st.checkbox("Trace peak memory (slower)")
+
+# reports belong to this session: a run interrupted by st.rerun() leaves its report
+# running, and the next run of the same session (maybe on another thread) stops it
+profiling.stop(st.session_state.pop("profile_report", None))
+if show_performance:
+    st.session_state.profile_report = profiling.start(memory=trace_memory)
+
 # Custom game input
 if st.session_state.game_selected == "Custom Game" and not st.session_state.custom_game_ready:
     st.header("Create Custom Game")
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.subheader("Player 1 Actions")
-        p1_actions_input = st.text_input("Enter actions (comma-separated):", "Action1, Action2", key="p1_actions")
-        p1_actions = [a.strip() for a in p1_actions_input.split(",") if a.strip()]
-
-    with col2:
-        st.subheader("Player 2 Actions")
-        p2_actions_input = st.text_input("Enter actions (comma-separated):", "Action1, Action2", key="p2_actions")
-        p2_actions = [a.strip() for a in p2_actions_input.split(",") if a.strip()]
-
-    if len(p1_actions) > 0 and len(p2_actions) > 0:
-        st.subheader("Payoff Matrix")
-        st.markdown("Enter payoffs for each strategy profile (Player 1, Player 2):")
-        payoffs_dict = {}
-
-        for i, a1 in enumerate(p1_actions):
-            cols = st.columns(len(p2_actions))
-            for j, a2 in enumerate(p2_actions):
-                with cols[j]:
-                    st.caption(f"({a1}, {a2})")
-                    p1_pay = st.number_input(f"P1 payoff", key=f"p1_{i}_{j}", value=0)
-                    p2_pay = st.number_input(f"P2 payoff", key=f"p2_{i}_{j}", value=0)
-                    payoffs_dict[(a1, a2)] = (p1_pay, p2_pay)
-        
-        if st.button("Create Game", type="primary"):
-            from Models.ExtensiveForm import ExtensiveFormNode
-            root = ExtensiveFormNode(player="Player 1", actions=p1_actions, info_set="P1_custom")
-            for a1 in p1_actions:
-                p2_node = ExtensiveFormNode(player="Player 2", actions=p2_actions, info_set="P2_custom")
-                root.children[a1] = p2_node
-                for a2 in p2_actions:
-                    payoff = payoffs_dict[(a1, a2)]
-                    p2_node.children[a2] = ExtensiveFormNode(payoffs=payoff)
-            st.session_state.game_tree = root
-            st.session_state.custom_game_ready = True
-            st.session_state.normal_form = None
-            st.success("Custom game created!")
-            st.rerun()
+    entry_mode = st.radio("Payoff entry", ["Grid editor", "Paste or import CSV"], horizontal=True)
+    custom = None
+
+    if entry_mode == "Grid editor":
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.subheader("Player 1 Actions")
+            p1_actions_input = st.text_input("Enter actions (comma-separated):", "Action1, Action2", key="p1_actions")
+            p1_actions = [a.strip() for a in p1_actions_input.split(",") if a.strip()]
+
+        with col2:
+            st.subheader("Player 2 Actions")
+            p2_actions_input = st.text_input("Enter actions (comma-separated):", "Action1, Action2", key="p2_actions")
+            p2_actions = [a.strip() for a in p2_actions_input.split(",") if a.strip()]
+
+        if len(set(p1_actions)) != len(p1_actions) or len(set(p2_actions)) != len(p2_actions):
+            st.error("Action names must be unique for each player")
+        elif len(p1_actions) > 0 and len(p2_actions) > 0:
+            st.subheader("Payoff Matrix")
+            st.markdown("Edit each player's payoffs (rows: Player 1 actions, columns: Player 2 actions):")
+            # one editor per player instead of two widgets per cell; new actions give a fresh grid
+            blank = pd.DataFrame(0, index=p1_actions, columns=p2_actions)
+            grid_key = f"{'|'.join(p1_actions)}/{'|'.join(p2_actions)}"
+            grids = []
+            for column, player in zip(st.columns(2), PLAYERS):
+                with column:
+                    st.markdown(f"**{player} payoffs**")
+                    grids.append(st.data_editor(blank, key=f"grid_{player}_{grid_key}", width="stretch"))
+            payoffs = np.stack([grid.fillna(0).to_numpy() for grid in grids], axis=-1)
+            custom = (p1_actions, p2_actions, payoffs)
+
+    else:
+        pasted = st.text_area(
+            "Paste the payoff grid: one line per Player 1 strategy, one cell per Player 2 strategy "
+            "holding both payoffs (e.g. `3, 1`), tab or comma separated, optional header row and label column",
+            height=200,
+        )
+        uploaded = st.file_uploader("...or import a CSV file", type=["csv", "tsv", "txt"])
+        text = uploaded.getvalue().decode("utf-8") if uploaded is not None else pasted
+        if text.strip():
+            try:
+                custom = parse_payoff_grid(text)
+            except ValueError as e:
+                st.error(f"Could not read the payoff grid: {e}")
+            else:
+                p1_actions, p2_actions, payoffs = custom
+                st.caption(f"Read a {len(p1_actions)} x {len(p2_actions)} game")
+                st.dataframe(payoff_table_page(payoffs, p1_actions, p2_actions, 0, TABLE_PAGE_ROWS),
+                             width="stretch")
+
+    if custom is not None and st.button("Create Game", type="primary"):
+        st.session_state.game_tree = build_matrix_game_tree(*custom)
+        st.session_state.custom_game_ready = True
+        st.session_state.normal_form = None
+        st.success("Custom game created!")
+        st.rerun()
 
 
 # Main content area
 if st.session_state.game_tree is not None:
     st.header(f"Analysis: {st.session_state.game_selected}")
     
-    # Show Extensive Form Tree
+    # Show Extensive Form Tree: big trees are cut at a depth / node budget and the
+    # subtrees below are drawn as summary boxes that can be opened one by one
     st.subheader("Extensive Form Tree")
-    dot = draw_extensive_form(st.session_state.game_tree)
-    st.graphviz_chart(dot)
+    # normal form library games stay tensors; their simultaneous-move tree is only built to be drawn
+    tree = st.session_state.game_tree
+    if isinstance(tree, NormalFormGame):
+        show_tree = st.checkbox("Draw as a simultaneous-move tree")
+        if show_tree:
+            game = tree
+            tree = cache.get(("tree", game_fingerprint(game)), lambda: game_tree(game))
+    else:
+        show_tree = True
+    if show_tree:
+        tree_key = tree_fingerprint(tree)
+        renderer = cache.get(("renderer", tree_key), lambda: TreeRenderer(tree))
+        max_depth = st.slider("Tree depth", 1, renderer.depth, renderer.depth) if renderer.depth > 1 else renderer.depth
+        expand_key = f"expand_{tree_key}"
+        opened = list(st.session_state.get(expand_key, []))
+        expanded = tuple(sorted(renderer.node_at(path_actions(label)) for label in opened))
+        dot_source, collapsed = cache.get(
+            ("dot", tree_key, max_depth, expanded),
+            lambda: renderer.render(max_depth, expanded, TREE_MAX_NODES)
+        )
+        with profiling.timer("send extensive form"):
+            st.graphviz_chart(dot_source)
+        if collapsed or opened:
+            st.multiselect(
+                "Expand collapsed subtrees",
+                opened + [label for label in map(path_label, collapsed) if label not in opened],
+                key=expand_key,
+            )
 
 
     # Convert to Normal Form button
     if st.session_state.normal_form is None:
+        reduced = st.checkbox(
+            "Reduced normal form",
+            help="Merge strategies that only differ at info sets the player's own moves never reach"
+        )
         if st.button("Convert to Normal Form", type="primary"):
-            st.session_state.normal_form = extensive_to_normal_form(
-                st.session_state.game_tree, 
-                PLAYERS
-            )
-            st.rerun()
+            try:
+                st.session_state.normal_form = cache.get(
+                    ("normal_form", tree_key, reduced),
+                    lambda: extensive_to_normal_form(tree, reduced=reduced)
+                )
+            except ValueError as e:
+                # e.g. a library game with chance moves, found when it is first converted
+                st.error(f"No normal form for this game: {e}")
+            else:
+                st.rerun()
     
     # Display Normal Form
-    if st.session_state.normal_form:
-        strategies = st.session_state.normal_form['strategies']
-        payoff_matrix = st.session_state.normal_form['payoff_matrix']
+    if st.session_state.normal_form is not None and st.session_state.normal_form.num_players != 2:
+        # library games may have any number of players; the views below are for two
+        game = st.session_state.normal_form
+        st.subheader("Normal Form Representation")
+        st.info(f"{game.num_players}-player game with {' x '.join(map(str, game.shape))} strategies: "
+                "the payoff table and the analyses are shown for two-player games only")
+    elif st.session_state.normal_form:
+        game = st.session_state.normal_form
+        # every analysis below is memoized on the game's content
+        game_key = game_fingerprint(game)
         
-        # Extract actions
-        p1_actions = sorted(set(s[0][list(s[0].keys())[0]] for s in strategies))
-        p2_actions = sorted(set(s[1][list(s[1].keys())[0]] for s in strategies))
+        # Strategy names in the order of the payoff tensor axes
+        p1_actions, p2_actions = game.labels
         
         st.subheader("Normal Form Representation")
-        st.markdown(display_payoff_table(strategies, payoff_matrix, p1_actions, p2_actions), unsafe_allow_html=True)
+        if len(p1_actions) * len(p2_actions) <= HTML_TABLE_CELLS:
+            table = cache.get(("table", game_key), lambda: display_payoff_table(game, p1_actions, p2_actions))
+            st.markdown(table, unsafe_allow_html=True)
+        else:
+            # large games: only the selected page of rows is formatted and sent to the browser
+            pages = -(-len(p1_actions) // TABLE_PAGE_ROWS)
+            page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1) if pages > 1 else 1
+            start = (page - 1) * TABLE_PAGE_ROWS
+            stop = min(start + TABLE_PAGE_ROWS, len(p1_actions))
+            frame = cache.get(("table_page", game_key, start),
+                              lambda: payoff_table_page(game.payoffs, p1_actions, p2_actions, start, stop))
+            st.dataframe(frame, width="stretch")
+            st.caption(f"Player 1 strategies {start + 1}-{stop} of {len(p1_actions)}")
         
         # Analysis tabs
-        tab1, tab2, tab3, tab4, tab5 = st.tabs([
+        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
             "Dominance", 
             "Best Responses", 
             "Rationalizability",
             "Nash Equilibrium",
-            "Mixed Strategies"
+            "Mixed Strategies",
+            "Evolutionary Dynamics"
         ])
         
         with tab1:
@@ -228,7 +322,7 @@ if st.session_state.game_tree is not None:
             
             with col1:
                 st.markdown("**Strict Dominance**")
-                strict_dom = get_strict_dominance(strategies, payoff_matrix, PLAYERS)
+                strict_dom = cache.get(("strict", game_key), lambda: get_strict_dominance(game, players=PLAYERS))
                 if any(strict_dom.values()):
                     for player, dominated in strict_dom.items():
                         if dominated:
@@ -238,7 +332,7 @@ if st.session_state.game_tree is not None:
             
             with col2:
                 st.markdown("**Weak Dominance**")
-                weak_dom = get_weak_dominance(strategies, payoff_matrix, PLAYERS)
+                weak_dom = cache.get(("weak", game_key), lambda: get_weak_dominance(game, players=PLAYERS))
                 if any(weak_dom.values()):
                     for player, dominated in weak_dom.items():
                         if dominated:
@@ -248,25 +342,15 @@ if st.session_state.game_tree is not None:
             
             st.markdown("**Mixed Strategy Dominance**")
             
-            # Capture print output from mixed strategy functions
-            import io
-            import sys
+            mixed_dom = cache.get(("mixed_dominance", game_key), lambda: mixed_dominance(game))
             
-            old_stdout = sys.stdout
-            sys.stdout = buffer = io.StringIO()
-            
-            if len(p1_actions) == 3 and len(p2_actions) == 3:
-                mixed_dom = mixed_strategy_dominance_3x3(strategies, payoff_matrix, PLAYERS)
-            elif (len(p1_actions) == 3 and len(p2_actions) == 2) or (len(p1_actions) == 2 and len(p2_actions) == 3):
-                mixed_dom = mixed_strategy_dominance_3x2(strategies, payoff_matrix, PLAYERS)
-            else:
-                mixed_dom = {PLAYERS[0]: set(), PLAYERS[1]: set()}
-            
-            output = buffer.getvalue()
-            sys.stdout = old_stdout
-            
-            if output:
-                st.code(output)
+            lines = []
+            for player, dominated in mixed_dom.items():
+                for strategy, mixture in dominated.items():
+                    mix = ", ".join(f"{a}: {p:.4f}" for a, p in mixture.items())
+                    lines.append(f"{strategy} is dominated by the mixed strategy: {{{mix}}}")
+            if lines:
+                st.code("\n".join(lines))
             
             if any(mixed_dom.values()):
                 for player, dominated in mixed_dom.items():
@@ -277,7 +361,7 @@ if st.session_state.game_tree is not None:
         
         with tab2:
             st.subheader("Best Response Analysis")
-            best_resp = compute_best_responses(strategies, payoff_matrix, PLAYERS)
+            best_resp = cache.get(("best_responses", game_key), lambda: compute_best_responses(game, players=PLAYERS))
             
             col1, col2 = st.columns(2)
             
@@ -295,17 +379,16 @@ if st.session_state.game_tree is not None:
             st.subheader("Rationalizability (Iterated Elimination of Never-Best Responses)")
             st.info("Strategies that survive iterative elimination of never-best responses are rationalizable.")
 
-            # Compute rationalizable strategies using your new function
-            rat_result = rationalizability_2x2(strategies, payoff_matrix)
+            rat_result = cache.get(("rationalizability", game_key), lambda: rationalizability(game))
 
-            remaining = rat_result["rationalizable_strategies"]
+            for step in rat_result["trace"]:
+                st.write(f"Round {step['round']}: removed {', '.join(step['removed'])} for {step['player']}")
 
-            if not remaining:
+            if not any(rat_result["surviving"].values()):
                 st.error("All strategies eliminated — no rationalizable strategies.")
             else:
-                # Extract final rationalizable actions
-                p1_rational = sorted({s[0]['P1_main'] for s in remaining})
-                p2_rational = sorted({s[1]['P2_main'] for s in remaining})
+                p1_rational = rat_result["surviving"][PLAYERS[0]]
+                p2_rational = rat_result["surviving"][PLAYERS[1]]
 
                 col1, col2 = st.columns(2)
 
@@ -328,15 +411,10 @@ if st.session_state.game_tree is not None:
         with tab4:
             st.subheader("Nash Equilibrium (Pure Strategies)")
             
-            equilibria = []
-            best_resp = compute_best_responses(strategies, payoff_matrix, PLAYERS)
-            
-            for strat, payoffs in zip(strategies, payoff_matrix):
-                a1 = strat[0][list(strat[0].keys())[0]]
-                a2 = strat[1][list(strat[1].keys())[0]]
-                
-                if a1 in best_resp[PLAYERS[0]][a2] and a2 in best_resp[PLAYERS[1]][a1]:
-                    equilibria.append((a1, a2, payoffs))
+            equilibria = cache.get(("pure_nash", game_key), lambda: [
+                (p1_actions[i], p2_actions[j], game.payoffs[i, j])
+                for i, j in np.argwhere(pure_nash_mask(game.payoffs))
+            ])
             
             if equilibria:
                 st.success(f"Found {len(equilibria)} Pure Strategy Nash Equilibrium/Equilibria:")
@@ -344,6 +422,23 @@ if st.session_state.game_tree is not None:
                     st.markdown(f"- **({a1}, {a2})** → Payoffs: ({payoffs[0]}, {payoffs[1]})")
             else:
                 st.warning("No pure strategy Nash equilibria found. Try mixed strategies!")
+
+            st.subheader("Nash Equilibrium (Mixed Strategies)")
+            # support enumeration grows exponentially, large games get one equilibrium by Lemke-Howson
+            method = "support" if min(game.shape) <= 10 else "lemke-howson"
+            mixed_eq = cache.get(("mixed_nash", game_key, method), lambda: safe_mixed_nash(game, method))
+            if mixed_eq is None:
+                st.warning("Lemke-Howson found no mixed equilibrium from any starting label for this game")
+            else:
+                for eq in mixed_eq["equilibria"]:
+                    p1_mix = ", ".join(f"{a}: {p:.3f}" for a, p in eq[PLAYERS[0]].items())
+                    p2_mix = ", ".join(f"{a}: {p:.3f}" for a, p in eq[PLAYERS[1]].items())
+                    st.markdown(f"- **P1 ({p1_mix})**, **P2 ({p2_mix})** → Payoffs: ({eq['payoffs'][0]:.3f}, {eq['payoffs'][1]:.3f})")
+                stats = mixed_eq["stats"]
+                if stats["method"] == "support":
+                    st.caption(f"Support enumeration: {stats['supports_checked']} support pairs in {stats['elapsed'] * 1000:.1f} ms")
+                else:
+                    st.caption(f"Lemke-Howson: {stats['pivots']} pivots in {stats['elapsed'] * 1000:.1f} ms")
         
         with tab5:
             st.subheader("Mixed Strategy Calculator")
@@ -389,7 +484,7 @@ if st.session_state.game_tree is not None:
             
             if abs(p1_sum - 1.0) <= 0.001 and abs(p2_sum - 1.0) <= 0.001:
                 if st.button("Calculate Expected Payoffs", type="primary"):
-                    exp1, exp2 = compute_expected_payoff(payoff_matrix, p1_probs, p2_probs)
+                    exp1, exp2 = compute_expected_payoff(game, p1_probs, p2_probs)
                     
                     st.success("Expected Payoffs:")
                     col1, col2 = st.columns(2)
@@ -398,6 +493,55 @@ if st.session_state.game_tree is not None:
                     with col2:
                         st.metric("Player 2", f"{exp2:.3f}")
 
+        with tab6:
+            st.subheader("Evolutionary Dynamics")
+            try:
+                strategies = symmetric_payoffs(game)[1]
+            except ValueError:
+                strategies = None
+                st.info("Evolutionary dynamics need a symmetric game: both players with the same strategies and mirrored payoffs")
+
+            if strategies is not None:
+                col1, col2 = st.columns(2)
+                with col1:
+                    dynamics = st.selectbox("Dynamics", list(DYNAMICS))
+                with col2:
+                    noise = st.slider("Noise", min_value=0.01, max_value=1.0, value=0.1, step=0.01) if dynamics == "logit" else 0.1
+
+                # rest points come from all 2 ** k supports
+                if len(strategies) <= 8:
+                    st.markdown("**Rest points of the replicator dynamics**")
+                    points = cache.get(("rest_points", game_key), lambda: rest_points(game))
+                    st.dataframe(pd.DataFrame([
+                        {**{a: round(p, 3) for a, p in point["state"].items()},
+                         "payoff": round(point["payoff"], 3), "Nash": point["nash"],
+                         "ESS": point["ess"], "stable": point["stable"]}
+                        for point in points
+                    ]), width="stretch", hide_index=True)
+
+                basin = cache.get(("basins", game_key, dynamics, noise), lambda: basins(game, dynamics, noise=noise))
+                st.markdown("**Basins of attraction**")
+                st.dataframe(pd.DataFrame([
+                    {"basin": i + 1, **{a: round(p, 3) for a, p in attractor.items()}, "share": round(share, 3)}
+                    for i, (attractor, share) in enumerate(zip(basin["attractors"], basin["share"]))
+                ]), width="stretch", hide_index=True)
+                stats = basin["stats"]
+                st.caption(f"{len(basin['states'])} populations, {basin['converged']:.0%} settled, "
+                           f"{stats['steps']} steps in {stats['elapsed'] * 1000:.1f} ms")
+
+                if len(strategies) == 2:
+                    portrait = cache.get(("phase_portrait", game_key, dynamics, noise),
+                                         lambda: phase_portrait(game, dynamics, resolution=50, noise=noise))
+                    st.markdown(f"**Growth of the share of {strategies[0]}**")
+                    st.line_chart(pd.DataFrame(portrait["plane"], columns=[strategies[0], "growth"]).set_index(strategies[0]))
+                elif len(strategies) == 3:
+                    # starting populations in the strategy triangle, coloured by the attractor they reach
+                    corners = np.array([[0.0, 0.0], [1.0, 0.0], [0.5, np.sqrt(3) / 2]])
+                    plane = pd.DataFrame(basin["states"] @ corners, columns=["x", "y"])
+                    plane["basin"] = [f"basin {l + 1}" if l >= 0 else "no attractor" for l in basin["label"]]
+                    st.markdown(f"**Basins in the triangle {', '.join(strategies)}** (corners left, right, top)")
+                    st.scatter_chart(plane, x="x", y="y", color="basin")
+
 else:
     st.info("Select a game from the sidebar to begin the analysis")
     
@@ -408,4 +552,23 @@ else:
     - **Matching Pennies**: Two players simultaneously place a penny, one wins if they match, the other if they differ.
     - **Hawk-Dove Game**: Two animals fight over a resource, can choose to be agressive or retreat.
     - **Custom Game**: Create your own payoff matrix!
-    """)
\ No newline at end of file
+    """)
+
+
+if show_performance:
+    report = profiling.stop(st.session_state.pop("profile_report"))
+    with st.expander("Performance", expanded=True):
+        summary = f"This run took {report.elapsed:.3f} s"
+        if report.peak_memory is not None:
+            summary += f", peak traced memory {report.peak_memory / 2 ** 20:.2f} MiB"
+        st.caption(summary)
+        col1, col2 = st.columns(2)
+        with col1:
+            stages = pd.DataFrame(
+                [(name, stage["calls"], stage["seconds"]) for name, stage in report.stages.items()],
+                columns=["stage", "calls", "seconds"],
+            )
+            st.dataframe(stages.sort_values("seconds", ascending=False).set_index("stage"), width="stretch")
+        with col2:
+            counters = pd.DataFrame(sorted(report.counters.items()), columns=["counter", "count"])
+            st.dataframe(counters.set_index("counter"), width="stretch")
@@ -1,11 +1,12 @@
 from games import GAMES, PLAYERS
-from Models.NormalForm import extensive_to_normal_form, get_mixed_probs
+from Models.NormalForm import NormalFormGame, extensive_to_normal_form, get_mixed_probs
 from utilities.visualization import print_tree, print_normal_form
 from utilities.nash_equilibrium import pure_nash
 from utilities.dominance import get_strict_dominance, get_weak_dominance, rationalizability_2x2
 from utilities.best_responses import compute_best_responses
+from utilities.mixed_nash import mixed_nash
+from utilities.game_io import game_tree
 import os
-from gui import run
 
 def menu():
     names = list(GAMES.keys())
@@ -24,20 +25,31 @@ def menu():
     
 
         game_name = names[int(choice) - 1]
-        root = GAMES[game_name]()
+        game = GAMES[game_name]()
+        # normal form library files load as tensors, their tree is only built to be printed
+        root = game_tree(game)
         print(f"\n-- {game_name} (Extensive Form) ---")
         print_tree(root)
-        print(extensive_to_normal_form(root, PLAYERS))
-
 
         # Normal form
-        result = extensive_to_normal_form(root, PLAYERS)
+        try:
+            result = game if isinstance(game, NormalFormGame) else extensive_to_normal_form(root, PLAYERS)
+        except ValueError as e:
+            # library games with chance moves are only found out here
+            print(f"No normal form for this game: {e}")
+            continue
+        print(result)
         print_normal_form(result["strategies"], result["payoff_matrix"], PLAYERS)
         
         # Best responses
         best = compute_best_responses(result["strategies"], result["payoff_matrix"], PLAYERS)
         print("Best Responses:", best)
 
+        # Mixed equilibria
+        print("\n=== Mixed Strategy Nash Equilibria ===")
+        for eq in mixed_nash(result)["equilibria"]:
+            print(f"  {eq[PLAYERS[0]]}, {eq[PLAYERS[1]]} -> {eq['payoffs']}")
+
         # Dominance
         print("\n=== Dominance Analysis ===")
         strict_dom = get_strict_dominance(result["strategies"], result["payoff_matrix"], PLAYERS)
@@ -46,8 +58,10 @@ def menu():
         print("Weakly Dominated Strategies:", weak_dom)
 
         # rationalizability
-        print("\n=== Rationalizability (2x2) ===")
-        rat = rationalizability_2x2(result["strategies"], result["payoff_matrix"])
+        print("\n=== Rationalizability ===")
+        rat = rationalizability_2x2(result["strategies"], result["payoff_matrix"], PLAYERS)
+        for step in rat["trace"]:
+            print(f"Round {step['round']}: {step['player']} removes {step['removed']}")
         print("Rationalizable strategies:")
         print_normal_form(rat["rationalizable_strategies"], rat["rationalizable_payoffs"], PLAYERS)
 
@@ -62,5 +76,6 @@ def menu():
             get_mixed_probs(root, result)
         
 
+# the GUI is started with `streamlit run gui.py`, batch runs with `python batch.py`
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    menu()
\ No newline at end of file
@@ -0,0 +1,39 @@
+import json
+import os
+import signal
+
+import pytest
+
+from batch import run_batch
+from benchmarks.generators import random_tensor_game
+from utilities.game_io import save_game
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGALRM"), reason="timeouts use SIGALRM")
+def test_resume_skips_finished_games_and_records_timeouts(tmp_path):
+    folder = tmp_path / "games"
+    folder.mkdir()
+    small, large = str(folder / "a_small.game"), str(folder / "b_large.game")
+    save_game(random_tensor_game((2, 2), seed=0), small)
+    # support enumeration over 10 x 10 takes well over a second
+    save_game(random_tensor_game((10, 10), seed=0), large)
+    output = str(tmp_path / "results.jsonl")
+
+    def records():
+        with open(output, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    assert run_batch([str(folder)], output, ["mixed_nash"], workers=1, timeout=0.3, log=None) == 2
+    first = {r["game"]: r for r in records()}
+    assert first[small]["status"] == "ok"
+    assert first[large]["status"] == "timeout"
+
+    # stop partway: only the small game's record made it, the large one was cut mid-line
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(json.dumps(first[small]) + "\n" + json.dumps(first[large])[:20])
+    assert run_batch([str(folder)], output, ["mixed_nash"], workers=1, timeout=0.3, log=None) == 1
+    resumed = records()
+    assert [r["game"] for r in resumed] == [small, large]
+    assert resumed[0] == first[small]
+    assert resumed[1]["status"] == "timeout"
+    assert os.path.getsize(output) == sum(len(json.dumps(r)) + 1 for r in resumed)
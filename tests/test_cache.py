@@ -0,0 +1,21 @@
+from games import build_kuhn_poker_tree
+from Models.FlatGameTree import FlatGameTree
+from utilities.cache import tree_fingerprint
+
+
+def test_flat_fingerprint_covers_chance_probabilities():
+    root = build_kuhn_poker_tree()
+    fair = FlatGameTree.from_tree(root)
+    deals = list(root.probs)
+    root.probs[deals[0]] += 0.1
+    root.probs[deals[1]] -= 0.1
+    skewed = FlatGameTree.from_tree(root)
+    assert tree_fingerprint(fair) != tree_fingerprint(skewed)
+
+
+def test_flat_fingerprint_ignores_generated_info_set_names():
+    # the chance node is unnamed, its generated info set name differs between copies
+    first = FlatGameTree.from_tree(build_kuhn_poker_tree())
+    second = FlatGameTree.from_tree(build_kuhn_poker_tree())
+    assert first.info_ids != second.info_ids
+    assert tree_fingerprint(first) == tree_fingerprint(second)
@@ -0,0 +1,37 @@
+import pytest
+
+from games import build_centipede_tree, build_kuhn_poker_tree
+from utilities.cfr import CFRSolver, cfr
+
+
+def test_kuhn_poker_cfr_plus():
+    result = cfr(build_kuhn_poker_tree(), iterations=300, check_every=300)
+    assert result["values"][0] == pytest.approx(-1 / 18, abs=2e-3)
+    assert result["exploitability"] < 2e-3
+
+
+@pytest.mark.parametrize("sampling", ["external", "outcome"])
+def test_kuhn_poker_sampled(sampling):
+    result = cfr(build_kuhn_poker_tree(), iterations=2000, sampling=sampling, seed=0, check_every=2000)
+    assert result["exploitability"] < 0.1
+
+
+def test_evaluate_exact_strategies():
+    solver = CFRSolver(build_kuhn_poker_tree())
+    # uniform play: Player 1's best response gain is known in closed form
+    values, nash_conv = solver.evaluate(solver.current_strategy())
+    assert values[0] == pytest.approx(0.125)
+    assert nash_conv > 0
+
+
+def test_deep_tree_does_not_recurse():
+    root = build_centipede_tree(3000)
+    result = cfr(root, iterations=4, sampling="external", seed=1, check_every=4)
+    assert result["iterations"] == 4
+    solver = result["solver"]
+    # taking at once is the subgame perfect play, a best response to it gains nothing
+    strategy = solver.regrets * 0
+    strategy[solver.info_ptr[:-1]] = 1.0
+    values, nash_conv = solver.evaluate(strategy)
+    assert values == (2.0, 0.0)
+    assert nash_conv == pytest.approx(0.0)
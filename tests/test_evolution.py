@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from games import build_bos_tree, build_hawk_dove_tree, build_pd_tree
+from Models.NormalForm import extensive_to_normal_form
+from utilities.evolution import DYNAMICS, basins, rest_points, symmetric_payoffs
+
+PLAYERS = ["Player 1", "Player 2"]
+RPS = np.array([[0, -1, 1], [1, 0, -1], [-1, 1, 0]])
+
+
+@pytest.mark.parametrize("dynamics", list(DYNAMICS))
+def test_hawk_dove_mixed_attractor(dynamics):
+    game = extensive_to_normal_form(build_hawk_dove_tree(), PLAYERS)
+    result = basins(game, dynamics, count=200, t_max=50)
+    assert result["attractors"] == [pytest.approx({"Hawk": 0.5, "Dove": 0.5}, abs=1e-2)]
+    assert result["converged"] > 0.95
+
+
+def test_hawk_dove_rest_points():
+    game = extensive_to_normal_form(build_hawk_dove_tree(), PLAYERS)
+    stable = [point["state"] for point in rest_points(game) if point["stable"]]
+    assert stable == [pytest.approx({"Hawk": 0.5, "Dove": 0.5})]
+
+
+def test_rock_paper_scissors_has_no_replicator_attractor():
+    # the corners are reached along the edges but are unstable, the interior orbits are closed
+    result = basins(RPS, "replicator", count=300, t_max=50)
+    assert result["attractors"] == []
+    assert result["converged"] == 0.0
+    assert (result["label"] == -1).all()
+    assert not any(point["stable"] for point in rest_points(RPS))
+
+
+def test_coordination_game_has_two_attractors():
+    result = basins(np.array([[2, 0], [0, 1]]), "replicator", count=301, t_max=50)
+    assert sorted(map(tuple, result["points"].round(3))) == [(0.0, 1.0), (1.0, 0.0)]
+    # the unstable mixed rest point at 1/3 splits the basins
+    assert result["share"].sum() == pytest.approx(1.0, abs=1e-2)
+    assert result["share"].max() == pytest.approx(2 / 3, abs=1e-2)
+
+
+def test_symmetric_payoffs_rejects_asymmetric_games():
+    game = extensive_to_normal_form(build_pd_tree(), PLAYERS)
+    A, labels = symmetric_payoffs(game)
+    assert A.shape == (2, 2)
+    with pytest.raises(ValueError, match="not symmetric"):
+        symmetric_payoffs(extensive_to_normal_form(build_bos_tree(), PLAYERS))
+    with pytest.raises(ValueError):
+        symmetric_payoffs(np.ones((2, 3)))
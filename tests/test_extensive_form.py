@@ -0,0 +1,58 @@
+import numpy as np
+
+from games import build_repeated_pd_tree
+from Models.ExtensiveForm import ExtensiveFormNode, NodeInterner
+from Models.NormalForm import extensive_to_normal_form
+
+PLAYERS = ["Player 1", "Player 2"]
+
+
+def _observed_move_tree():
+    """P1 plays L or R, then P2 moves at one of two identical, unnamed nodes."""
+    def responder():
+        return ExtensiveFormNode(
+            player="Player 2",
+            actions=["l", "r"],
+            children={"l": ExtensiveFormNode(payoffs=(1, 0)), "r": ExtensiveFormNode(payoffs=(0, 1))},
+        )
+    return ExtensiveFormNode(player="Player 1", actions=["L", "R"], children={"L": responder(), "R": responder()})
+
+
+def test_interning_keeps_unnamed_info_sets_apart():
+    root = _observed_move_tree()
+    shared = NodeInterner().intern(root)
+    before = extensive_to_normal_form(root, PLAYERS)
+    after = extensive_to_normal_form(shared, PLAYERS)
+    assert after.shape == before.shape == (2, 4)
+    assert np.array_equal(after.payoffs, before.payoffs)
+    # the identical payoff leaves are still shared
+    assert shared.children["L"].children["l"] is shared.children["R"].children["l"]
+
+
+def test_interning_preserves_the_normal_form():
+    root = build_repeated_pd_tree(2)
+    before = extensive_to_normal_form(root, PLAYERS)
+    after = extensive_to_normal_form(NodeInterner().intern(root), PLAYERS)
+    assert after.shape == before.shape
+    assert after.labels == before.labels
+    assert np.array_equal(after.payoffs, before.payoffs)
+
+
+def test_default_players_follow_the_payoff_columns():
+    # Player 2 moves first and Player 3 never moves, yet owns the third payoff column
+    root = ExtensiveFormNode(
+        player="Player 2",
+        actions=["a", "b"],
+        children={
+            "a": ExtensiveFormNode(player="Player 1", actions=["x", "y"], info_set="P1",
+                                   children={"x": ExtensiveFormNode(payoffs=(1, 2, 3)),
+                                             "y": ExtensiveFormNode(payoffs=(4, 5, 6))}),
+            "b": ExtensiveFormNode(player="Player 1", actions=["x", "y"], info_set="P1",
+                                   children={"x": ExtensiveFormNode(payoffs=(7, 8, 9)),
+                                             "y": ExtensiveFormNode(payoffs=(0, 1, 2))}),
+        },
+    )
+    game = extensive_to_normal_form(root)
+    assert game.players == ["Player 1", "Player 2", "Player 3"]
+    assert game.shape == (2, 2, 1)
+    assert game.payoffs[1, 0, 0].tolist() == [4, 5, 6]
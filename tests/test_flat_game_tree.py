@@ -0,0 +1,54 @@
+import numpy as np
+
+from games import build_kuhn_poker_tree
+from Models.FlatGameTree import FlatGameTree
+
+
+def _depths(root):
+    """{id(node): depth} of every node, breadth first."""
+    depths = {id(root): 0}
+    level = [root]
+    while level:
+        following = []
+        for node in level:
+            for child in node.children.values():
+                if id(child) not in depths:
+                    depths[id(child)] = depths[id(node)] + 1
+                    following.append(child)
+        level = following
+    return depths
+
+
+def test_levels_are_contiguous_and_ordered():
+    tree = FlatGameTree.from_tree(build_kuhn_poker_tree())
+    levels = tree.level_ptr.tolist()
+    assert levels[0] == 0 and levels[-1] == len(tree)
+    assert all(a < b for a, b in zip(levels, levels[1:]))
+    level_of = np.repeat(np.arange(len(levels) - 1), np.diff(levels))
+    for v in range(len(tree)):
+        for c in tree.children(v).tolist():
+            assert level_of[c] == level_of[v] + 1
+            assert tree.parent[c] == v
+
+
+def test_round_trip_keeps_payoffs_info_sets_and_probabilities():
+    root = build_kuhn_poker_tree()
+    tree = FlatGameTree.from_tree(root)
+    assert tree.chance_prob is not None
+    copy = tree.to_tree()
+    assert np.array_equal(FlatGameTree.from_tree(copy).payoffs, tree.payoffs)
+    assert max(_depths(copy).values()) == len(tree.level_ptr) - 2
+
+    stack = [(root, copy)]
+    while stack:
+        node, restored = stack.pop()
+        assert restored.payoffs == node.payoffs
+        if node.is_terminal():
+            continue
+        assert restored.player == node.player
+        assert restored.actions == node.actions
+        assert restored.probs == node.probs
+        # unnamed info sets come back under their generated name
+        if node.info_set is not None:
+            assert restored.info_set == node.info_set
+        stack.extend((node.children[a], restored.children[a]) for a in node.actions)
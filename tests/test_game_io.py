@@ -0,0 +1,124 @@
+import io
+import os
+
+import numpy as np
+import pytest
+
+from games import GAME_LIBRARY, build_centipede_tree
+from benchmarks.generators import random_tensor_game, random_tree
+from Models.FlatGameTree import FlatGameTree
+from Models.NormalForm import extensive_to_normal_form
+from utilities.game_io import game_tree, load_game, load_library, read_efg, read_header, read_nfg, save_game
+
+EFG = '''EFG 2 R "Observed move" { "Player 1" "Player 2" }
+""
+
+p "" 1 1 "Root" { "L" "R" } 0
+p "" 2 1 "After L" { "l" "r" } 0
+t "" 1 "P1 wins" { 1, -1 }
+t "" 2 "P2 wins" { -1, 1 }
+p "" 2 2 "After R" { "l" "r" } 0
+t "" 2
+t "" 1
+'''
+
+
+def test_normal_form_round_trip(tmp_path):
+    game = random_tensor_game((3, 4, 2), seed=1)
+    path = os.path.join(tmp_path, "tensor.game")
+    save_game(game, path, title="Tensor")
+    loaded = load_game(path)
+    assert read_header(path) == ("Tensor", game.players)
+    assert loaded.players == game.players
+    assert loaded.labels == game.labels
+    assert np.array_equal(loaded.payoffs, game.payoffs)
+
+
+def test_extensive_round_trip(tmp_path):
+    root = random_tree(4, 3, seed=5, info_set_size=3)
+    path = os.path.join(tmp_path, "tree.game")
+    save_game(root, path)
+    loaded = load_game(path, mmap=False)
+    assert isinstance(loaded, FlatGameTree)
+    flat = FlatGameTree.from_tree(root)
+    for name in ("parent", "first_child", "child", "child_action", "node_info", "payoffs", "payoff_row", "level_ptr"):
+        assert np.array_equal(getattr(loaded, name), getattr(flat, name))
+    assert loaded.info_ids == flat.info_ids
+    players = ["Player 1", "Player 2"]
+    before = extensive_to_normal_form(root, players)
+    after = extensive_to_normal_form(game_tree(loaded), players)
+    assert np.array_equal(after.payoffs, before.payoffs)
+
+
+def test_deep_tree_round_trip(tmp_path):
+    path = os.path.join(tmp_path, "centipede.game")
+    save_game(build_centipede_tree(3000), path)
+    root = game_tree(load_game(path))
+    depth = 0
+    while not root.is_terminal():
+        root = root.children["Pass"]
+        depth += 1
+    assert depth == 3000
+
+
+def test_read_nfg():
+    game = read_nfg(os.path.join(GAME_LIBRARY, "rock_paper_scissors.nfg"))
+    assert game.labels == [["Rock", "Paper", "Scissors"]] * 2
+    A = game.payoffs[..., 0]
+    assert np.array_equal(A, -A.T)
+    assert A[1, 0] == 1 and A[0, 1] == -1
+    assert np.array_equal(game.payoffs[..., 1], -A)
+
+
+def test_read_efg():
+    root = read_efg(io.StringIO(EFG))
+    assert root.player == "Player 1" and root.info_set == "Root"
+    left, right = root.children["L"], root.children["R"]
+    assert (left.info_set, right.info_set) == ("After L", "After R")
+    assert left.children["l"].payoffs == (1, -1)
+    assert right.children["l"].payoffs == (-1, 1)
+    game = extensive_to_normal_form(root, ["Player 1", "Player 2"])
+    assert game.shape == (2, 4)
+
+
+CHANCE_EFG = '''EFG 2 R "Coin" { "Player 1" "Player 2" }
+""
+
+c "" 1 "Coin" { "Heads" 1/2 "Tails" 1/2 } 0
+t "" 1 "P1 wins" { 1, -1 }
+t "" 2 "P2 wins" { -1, 1 }
+'''
+
+
+def test_read_efg_chance():
+    root = read_efg(io.StringIO(CHANCE_EFG))
+    assert root.is_chance()
+    assert root.probs == {"Heads": 0.5, "Tails": 0.5}
+
+
+def test_library_keeps_normal_form_files_as_tensors(tmp_path):
+    game = random_tensor_game((3, 4), seed=2)
+    save_game(game, os.path.join(tmp_path, "tensor.game"), title="Tensor")
+    loaded = load_library(str(tmp_path))["Tensor"]()
+    assert isinstance(loaded.payoffs.base, np.memmap)
+    assert loaded.players == ["Player 1", "Player 2"]
+    assert extensive_to_normal_form(game_tree(loaded)).labels == game.labels
+
+
+def test_library_finds_chance_games_when_they_are_built(tmp_path):
+    for name, text in (("observed.efg", EFG), ("coin.efg", CHANCE_EFG)):
+        with open(os.path.join(tmp_path, name), "w") as f:
+            f.write(text)
+    save_game(read_efg(io.StringIO(CHANCE_EFG)), os.path.join(tmp_path, "coin.game"), title="Saved coin")
+    library = load_library(str(tmp_path))
+    assert sorted(library) == ["Coin", "Observed move", "Saved coin"]
+    for name in ("Coin", "Saved coin"):
+        root = library[name]()
+        assert root.is_chance()
+        with pytest.raises(ValueError, match="Chance"):
+            extensive_to_normal_form(root)
+
+
+def test_normal_form_rejects_chance():
+    with pytest.raises(ValueError, match="Chance"):
+        extensive_to_normal_form(read_efg(io.StringIO(CHANCE_EFG)), ["Player 1", "Player 2"])
@@ -0,0 +1,38 @@
+import numpy as np
+
+from benchmarks.generators import random_bimatrix, random_tensor_game
+from games import build_pd_tree
+from Models.NormalForm import extensive_to_normal_form
+from utilities.iterated_elimination import iterated_elimination
+
+
+def test_prisoners_dilemma():
+    game = extensive_to_normal_form(build_pd_tree(), ["Player 1", "Player 2"])
+    for method in ("strict", "weak", "nbr"):
+        result = iterated_elimination(game, method=method)
+        assert result["surviving"] == {"Player 1": ["Defect"], "Player 2": ["Defect"]}
+
+
+def _pure_never_best_responses(game, tol=1e-9):
+    """Reference: eliminate rows that are not a best reply to any alive pure profile, one round at a time."""
+    alive = [np.ones(n, dtype=bool) for n in game.shape]
+    while True:
+        removals = []
+        for i in range(game.num_players):
+            index = [np.nonzero(mask)[0] for mask in alive]
+            index[i] = np.arange(game.shape[i])
+            cols = np.moveaxis(game.payoff_array(i)[np.ix_(*index)], i, 0).reshape(game.shape[i], -1)
+            values = np.where(alive[i][:, None], cols, -np.inf)
+            best = (values >= values.max(axis=0) - tol).any(axis=1)
+            removals.append(alive[i] & ~best)
+        if not any(r.any() for r in removals):
+            return alive
+        for mask, removed in zip(alive, removals):
+            mask &= ~removed
+
+
+def test_pure_never_best_responses():
+    for game in (random_bimatrix(12, 9, seed=4), random_tensor_game((5, 4, 6), seed=2)):
+        result = iterated_elimination(game, method="nbr", mixed=False)
+        expected = _pure_never_best_responses(game)
+        assert all((a == b).all() for a, b in zip(result["alive"], expected))
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from benchmarks.generators import random_tensor_game
+from games import build_pd_tree
+from Models.NormalForm import extensive_to_normal_form
+from utilities.learning import best_response_dynamics, fictitious_play, regret_matching_plus
+
+PLAYERS = ["Player 1", "Player 2"]
+RPS = np.array([[0, -1, 1], [1, 0, -1], [-1, 1, 0]])
+
+
+# fictitious play converges like 1 / sqrt(t) at best, regret matching+ much faster
+@pytest.mark.parametrize("solver, bound", [(fictitious_play, 0.05), (regret_matching_plus, 0.01)])
+def test_rock_paper_scissors_nash_conv(solver, bound):
+    result = solver((RPS, -RPS), iterations=2000)
+    assert result["nash_conv"] < bound
+    assert result["x"] == pytest.approx([1 / 3] * 3, abs=0.02)
+
+
+@pytest.mark.parametrize("solver", [fictitious_play, regret_matching_plus])
+def test_warm_start_continues_the_run(solver):
+    game = (RPS, -RPS)
+    whole = solver(game, iterations=300)
+    first = solver(game, iterations=120)
+    rest = solver(game, iterations=180, warm_start=first["state"])
+    assert np.allclose(rest["x"], whole["x"])
+    assert np.allclose(rest["y"], whole["y"])
+    assert rest["nash_conv"] == pytest.approx(whole["nash_conv"])
+
+
+def test_restarts_give_one_result_per_game():
+    result = fictitious_play((RPS, -RPS), iterations=50, restarts=4, seed=0)
+    assert result["x"].shape == (4, 3) and result["y"].shape == (4, 3)
+    assert result["nash_conv"].shape == (4,)
+    # the random starts differ, so do the runs
+    assert not np.allclose(result["x"][0], result["x"][1])
+
+
+def test_best_response_dynamics_prisoners_dilemma():
+    game = extensive_to_normal_form(build_pd_tree(), PLAYERS)
+    result = best_response_dynamics(game)
+    assert result["converged"] is True
+    assert result["nash_conv"] == 0.0
+    # mutual defection is the only pure equilibrium
+    assert result["strategies"] == {player: {"Cooperate": 0.0, "Defect": 1.0} for player in PLAYERS}
+
+
+def test_non_two_player_game_is_rejected():
+    with pytest.raises(ValueError):
+        fictitious_play(random_tensor_game((2, 2, 2), seed=0))
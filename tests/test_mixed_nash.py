@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from benchmarks.generators import random_bimatrix
+from utilities.mixed_nash import _bimatrix, is_nash, lemke_howson, mixed_nash
+
+
+def test_matching_pennies_support_enumeration():
+    A = np.array([[1, -1], [-1, 1]])
+    result = mixed_nash((A, -A))
+    assert len(result["equilibria"]) == 1
+    assert list(result["equilibria"][0]["Player 1"].values()) == pytest.approx([0.5, 0.5])
+
+
+@pytest.mark.parametrize("seed", [0, 1, 3])
+def test_lemke_howson_degenerate_integer_games(seed):
+    # integer payoffs in [-10, 10] have many ties; the ratio test must not cycle on them
+    game = random_bimatrix(30, 30, seed)
+    A, B = _bimatrix(game)
+    x, y, pivots = lemke_howson(game)
+    assert is_nash(A, B, x, y, tol=1e-7)
+    assert pivots < 1000
+
+
+@pytest.mark.parametrize("seed", [1, 3])
+def test_mixed_nash_tries_the_other_labels(seed):
+    # on seed 3 the path from label 0 is longer than max_pivots
+    game = random_bimatrix(100, 100, seed)
+    A, B = _bimatrix(game)
+    result = mixed_nash(game, method="lemke-howson")
+    assert len(result["equilibria"]) == 1
+    eq = result["equilibria"][0]
+    x = np.array(list(eq["Player 1"].values()))
+    y = np.array(list(eq["Player 2"].values()))
+    assert is_nash(A, B, x, y, tol=1e-7)
@@ -0,0 +1,88 @@
+from itertools import product
+
+import numpy as np
+import pytest
+
+from benchmarks.generators import random_tree
+from games import build_centipede_tree, build_ultimatum_tree
+from Models.NormalForm import evaluate_profile, extensive_to_normal_form, iter_profile_payoffs
+
+PLAYERS = ["Player 1", "Player 2"]
+
+
+@pytest.mark.parametrize("build, full_shape, reduced_shape", [
+    # each player moves at 3 stages, taking ends the game: Take, Pass-Take, ..., Pass-Pass-Pass
+    (lambda: build_centipede_tree(6), (8, 8), (4, 4)),
+    # Player 2 reaches every info set whatever they do, nothing merges
+    (lambda: build_ultimatum_tree(3), (4, 16), (4, 16)),
+])
+def test_reduced_normal_form_size(build, full_shape, reduced_shape):
+    root = build()
+    assert extensive_to_normal_form(root, PLAYERS).shape == full_shape
+    assert extensive_to_normal_form(root, PLAYERS, reduced=True).shape == reduced_shape
+
+
+def test_reduced_strategies_round_trip():
+    reduced = extensive_to_normal_form(build_centipede_tree(7), PLAYERS, reduced=True)
+    for space in reduced.player_strategies:
+        covered = []
+        for k in range(len(space)):
+            completions = space.completions(k)
+            assert space.reduce(completions).tolist() == [k] * len(completions)
+            covered.extend(completions.tolist())
+        # the completions partition the full strategies
+        assert sorted(covered) == list(range(len(space.full)))
+
+
+@pytest.mark.parametrize("build", [lambda: build_centipede_tree(6), lambda: build_ultimatum_tree(3)])
+def test_reduced_payoffs_match_their_completions(build):
+    root = build()
+    full = extensive_to_normal_form(root, PLAYERS)
+    reduced = extensive_to_normal_form(root, PLAYERS, reduced=True)
+    spaces = reduced.player_strategies
+    for profile in product(*(range(len(space)) for space in spaces)):
+        completions = np.ix_(*(space.completions(k) for space, k in zip(spaces, profile)))
+        assert (full.payoffs[completions] == reduced.payoffs[profile]).all()
+
+
+def _repeated_info_set_tree(seed):
+    """Random tree in which Player 1 meets the root's info set again two levels down."""
+    root = random_tree(4, 2, seed=seed, info_set_size=2)
+    for p2 in root.children.values():
+        for p1 in p2.children.values():
+            p1.info_set = root.info_set
+    return root
+
+
+@pytest.mark.parametrize("root", [
+    random_tree(3, 2, seed=1),
+    random_tree(3, 3, seed=2, info_set_size=3),
+    random_tree(3, 2, n_players=3, seed=3, info_set_size=2),
+    _repeated_info_set_tree(4),
+], ids=["perfect", "imperfect", "three players", "repeated info set"])
+def test_tensor_stream_and_profile_walks_agree(root):
+    tensor = extensive_to_normal_form(root, method="tensor")
+    stream = extensive_to_normal_form(root, method="stream", chunk_size=7)
+    assert tensor.labels == stream.labels
+    assert np.array_equal(tensor.payoffs, stream.payoffs)
+    for index in np.ndindex(*tensor.shape):
+        profile = {p: tensor.player_strategies[k][i] for k, (p, i) in enumerate(zip(tensor.players, index))}
+        assert evaluate_profile(root, profile) == tuple(tensor.payoffs[index].tolist())
+
+
+
+def test_streamed_output_into_a_memmap(tmp_path):
+    root = random_tree(3, 3, seed=5, info_set_size=3)
+    tensor = extensive_to_normal_form(root)
+    assert tensor.payoffs[..., 0].size % 10 != 0
+    out = np.memmap(tmp_path / "payoffs.dat", dtype=tensor.payoffs.dtype, mode="w+", shape=tensor.payoffs.shape)
+    game = extensive_to_normal_form(root, out=out, method="stream", chunk_size=10)
+    assert np.shares_memory(game.payoffs, out)
+    out.flush()
+    assert np.array_equal(np.memmap(tmp_path / "payoffs.dat", dtype=out.dtype, mode="r", shape=out.shape),
+                          tensor.payoffs)
+
+    chunks = list(iter_profile_payoffs(root, chunk_size=10))
+    assert [start for start, _ in chunks] == list(range(0, tensor.payoffs[..., 0].size, 10))
+    assert np.array_equal(np.concatenate([payoffs for _, payoffs in chunks]),
+                          tensor.payoffs.reshape(-1, tensor.num_players))
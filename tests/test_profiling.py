@@ -0,0 +1,45 @@
+import threading
+import tracemalloc
+
+from utilities import profiling
+
+
+def test_threads_collect_their_own_reports():
+    started = threading.Barrier(2)
+    stopped = threading.Event()
+    reports = {}
+
+    def other():
+        report = profiling.start(memory=True)
+        started.wait()
+        stopped.wait()
+        profiling.count("other")
+        reports["other"] = profiling.stop()
+        assert reports["other"] is report
+
+    thread = threading.Thread(target=other)
+    thread.start()
+    mine = profiling.start(memory=True)
+    started.wait()
+    profiling.count("mine")
+    # stopping here must leave the other thread's report and memory tracing running
+    assert profiling.stop() is mine
+    assert tracemalloc.is_tracing()
+    stopped.set()
+    thread.join()
+
+    assert dict(mine.counters) == {"mine": 1}
+    assert dict(reports["other"].counters) == {"other": 1}
+    assert mine.peak_memory is not None and reports["other"].peak_memory is not None
+    assert not tracemalloc.is_tracing()
+    assert not profiling.enabled()
+
+
+def test_stop_a_report_of_an_earlier_run():
+    leftover = []
+    thread = threading.Thread(target=lambda: leftover.append(profiling.start(memory=False)))
+    thread.start()
+    thread.join()
+    report = profiling.stop(leftover[0])
+    assert report is leftover[0] and report.elapsed > 0
+    assert profiling.stop() is None
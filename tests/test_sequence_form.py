@@ -0,0 +1,50 @@
+import pytest
+
+from games import build_kuhn_poker_tree, build_mp_tree, build_repeated_pd_tree
+from benchmarks.generators import random_tree
+from utilities.sequence_form import build_sequence_form, zero_sum_sequence_equilibrium
+from utilities.subgame_perfect import subgame_perfect_equilibrium
+
+
+def test_matching_pennies():
+    result = zero_sum_sequence_equilibrium(build_mp_tree())
+    assert result["value"] == pytest.approx(0.0, abs=1e-9)
+    for behavior in result["behavior_strategies"].values():
+        for probs in behavior.values():
+            assert list(probs.values()) == pytest.approx([0.5, 0.5])
+
+
+def test_info_sequences_match_sequences():
+    sf = build_sequence_form(random_tree(4, 2, seed=0, info_set_size=2))
+    for player, groups in sf["info_sequences"].items():
+        for info_id, indices in groups.items():
+            assert [sf["sequences"][player][i][0] for i in indices] == [info_id] * len(indices)
+
+
+def test_perfect_information_value():
+    root = random_tree(5, 2, seed=3)
+    # make the game zero-sum
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.is_terminal():
+            node.payoffs = (node.payoffs[0], -node.payoffs[0])
+        stack.extend(node.children.values())
+    value = zero_sum_sequence_equilibrium(root)["value"]
+    assert value == pytest.approx(subgame_perfect_equilibrium(root)["values"][0])
+
+
+def test_kuhn_poker_with_chance():
+    result = zero_sum_sequence_equilibrium(build_kuhn_poker_tree())
+    assert result["value"] == pytest.approx(-1 / 18, abs=1e-9)
+    # Player 2's equilibrium strategy is unique
+    p2 = result["behavior_strategies"]["Player 2"]
+    assert p2["P2_J_check"]["Bet"] == pytest.approx(1 / 3, abs=1e-6)
+    assert p2["P2_Q_bet"]["Call"] == pytest.approx(1 / 3, abs=1e-6)
+    assert p2["P2_K_bet"]["Call"] == pytest.approx(1.0)
+
+
+def test_repeated_pd_has_imperfect_recall():
+    # equal running scores after different histories share an info set
+    with pytest.raises(ValueError, match="perfect recall"):
+        build_sequence_form(build_repeated_pd_tree(3))
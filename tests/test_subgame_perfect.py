@@ -0,0 +1,22 @@
+from Models.FlatGameTree import FlatGameTree
+from benchmarks.generators import random_tree
+from games import build_centipede_tree
+from utilities.subgame_perfect import subgame_perfect_equilibrium
+
+
+def test_flat_tree_matches_tree():
+    # small integer payoffs, so ties have to be broken the same way
+    root = random_tree(6, 3, seed=2, low=0, high=2)
+    tree_result = subgame_perfect_equilibrium(root)
+    flat_result = subgame_perfect_equilibrium(FlatGameTree.from_tree(root))
+    assert flat_result["path"] == tree_result["path"]
+    assert flat_result["values"] == tuple(tree_result["values"])
+    assert flat_result["strategy"] == tree_result["strategy"]
+
+
+def test_deep_centipede():
+    root = build_centipede_tree(5000)
+    for game in (root, FlatGameTree.from_tree(root)):
+        result = subgame_perfect_equilibrium(game)
+        assert result["path"] == [("Player 1", "Take")]
+        assert result["values"] == (2, 0)
@@ -0,0 +1,33 @@
+from games import build_centipede_tree, build_kuhn_poker_tree
+from Models.ExtensiveForm import ExtensiveFormNode
+from utilities.visualization import TreeRenderer
+
+
+def test_collapsed_chance_subtree():
+    renderer = TreeRenderer(build_kuhn_poker_tree())
+    source, collapsed = renderer.render(max_depth=0)
+    assert collapsed == {(): 0}
+    assert "Chance\\n+54 nodes\\nPlayer 1: -2 .. 2\\nPlayer 2: -2 .. 2" in source
+
+
+def test_chance_probabilities_on_edges():
+    source, collapsed = TreeRenderer(build_kuhn_poker_tree()).render(max_depth=1)
+    assert 'label="JQ (0.166667)"' in source
+    assert len(collapsed) == 6
+
+
+def test_deep_tree_is_cut_at_max_nodes():
+    renderer = TreeRenderer(build_centipede_tree(3000))
+    source, collapsed = renderer.render(max_nodes=50)
+    assert len(collapsed) == 1
+    assert source.count("->") < 60
+
+
+def test_collapsed_labels_follow_payoff_columns():
+    # Player 2 moves first, the labels still name the columns by position
+    root = ExtensiveFormNode(player="Player 2", actions=["a"], info_set="P2", children={
+        "a": ExtensiveFormNode(player="Player 1", actions=["x"], info_set="P1",
+                               children={"x": ExtensiveFormNode(payoffs=(1, 5))}),
+    })
+    source, _ = TreeRenderer(root).render(max_depth=0)
+    assert "Player 1: 1 .. 1\\nPlayer 2: 5 .. 5" in source
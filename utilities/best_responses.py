@@ -1,6 +1,50 @@
-def compute_best_responses(strategies, payoff_matrix, players=["Player 1", "Player 2"]):
+import numpy as np
+from Models.NormalForm import as_normal_form_game
+from utilities import profiling
+
+
+def best_response_masks(payoffs, tol=1e-9):
+    """
+    Best-response masks straight from a payoff tensor.
+
+    :param payoffs: (..., n_1, ..., n_N, N) array, e.g. NormalFormGame.payoffs or a
+                    stack of same-shaped games with any leading batch axes
+    :param tol: payoffs within tol of the maximum count as ties
+
+    Returns a list with one boolean (..., n_1, ..., n_N) mask per player:
+    masks[k][profile] is True when player k's strategy in `profile` is a best
+    response to the other players' strategies in it (max along player k's axis).
+    """
+    payoffs = np.asarray(payoffs)
+    n_players = payoffs.shape[-1]
+    first_axis = payoffs.ndim - 1 - n_players
+
+    masks = []
+    for k in range(n_players):
+        u = payoffs[..., k]
+        masks.append(u >= u.max(axis=first_axis + k, keepdims=True) - tol)
+    return masks
+
+
+def pure_nash_mask(payoffs, tol=1e-9):
+    """
+    Pure Nash equilibria as a boolean mask: the profiles where every player
+    best-responds. Works on one game or on a stack of games at once, e.g. a
+    (g, n1, n2, 2) array gives a (g, n1, n2) mask.
+    """
+    masks = best_response_masks(payoffs, tol)
+    equilibria = masks[0]
+    for mask in masks[1:]:
+        equilibria = equilibria & mask
+    return equilibria
+
+
+def compute_best_responses(strategies, payoff_matrix=None, players=["Player 1", "Player 2"], tol=1e-9):
     """
     Returns a dictionary of best responses for each player.
+    Accepts a NormalFormGame or the legacy (strategies, payoff_matrix) lists.
+    With more than two players the opponents' strategies are keyed as a tuple
+    of labels, in player order.
     
     Example result:
     {
@@ -8,36 +52,20 @@ def compute_best_responses(strategies, payoff_matrix, players=["Player 1", "Play
       "Player 2": {"Defect": ["Cooperate"]},
     }
     """
-    best_responses = {players[0]: {}, players[1]: {}}
-    
-    # Separate players payoffs
-    # For Player 1: all payoffs against each P2 action
-    # For Player 2: all payoffs against each P1 action
-    p1_payoffs = {}
-    p2_payoffs = {}
-    
-    for (strat, payoff) in zip(strategies, payoff_matrix):
-        a1 = strat[0][list(strat[0].keys())[0]] # player 1's actions
-        a2 = strat[1][list(strat[1].keys())[0]] # player 2's actions
-        
-        if a2 not in p1_payoffs:
-            p1_payoffs[a2] = []
-        if a1 not in p2_payoffs:
-            p2_payoffs[a1] = []
-        
-        # This groups payoffs based on opponent action
-        p1_payoffs[a2].append((payoff[0], a1))  # (P1 payoff, P1 action)
-        p2_payoffs[a1].append((payoff[1], a2))  # (P2 payoff, P2 action)
-    
-    # Calculate best responses
-    # Finds the maximum payoff
-    # Returns all actions that achieve that maximum (in case of ties)
-    for opp_action, vals in p1_payoffs.items():
-        max_p1 = max(vals)[0]
-        best_responses[players[0]][opp_action] = [a for p,a in vals if p == max_p1]
-    
-    for opp_action, vals in p2_payoffs.items():
-        max_p2 = max(vals)[0]
-        best_responses[players[1]][opp_action] = [a for p,a in vals if p == max_p2]
-    
-    return best_responses
\ No newline at end of file
+    game = as_normal_form_game(strategies, payoff_matrix, players)
+    with profiling.timer("best response masks"):
+        masks = best_response_masks(game.payoffs, tol)
+    n_players = game.num_players
+
+    best_responses = {player: {} for player in game.players}
+    for k, player in enumerate(game.players):
+        own = game.labels[k]
+        others = [j for j in range(n_players) if j != k]
+        # player k's axis last: one row of candidate responses per opponent profile
+        mask = np.moveaxis(masks[k], k, -1)
+        for opp_index in np.ndindex(*mask.shape[:-1]):
+            opp = tuple(game.labels[j][i] for j, i in zip(others, opp_index))
+            key = opp[0] if len(opp) == 1 else opp
+            best_responses[player][key] = [own[i] for i in np.nonzero(mask[opp_index])[0]]
+
+    return best_responses
@@ -0,0 +1,161 @@
+import hashlib
+import re
+import sys
+from collections import OrderedDict
+from weakref import WeakKeyDictionary
+
+import numpy as np
+from Models.FlatGameTree import FlatGameTree
+from utilities import profiling
+
+# fingerprints of trees already hashed, valid while the tree is alive and unchanged
+_TREE_FINGERPRINTS = WeakKeyDictionary()
+
+
+def _digest(*parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        data = part if isinstance(part, bytes) else repr(part).encode()
+        h.update(len(data).to_bytes(8, "little"))
+        h.update(data)
+    return h.hexdigest()
+
+
+def tree_fingerprint(root):
+    """
+    Canonical content hash of a game tree.
+
+    Every node is hashed from its player, info set, actions and its children's
+    hashes (or its payoffs), so equal games give equal fingerprints whatever
+    objects they are made of, and shared subtrees are hashed once. Unnamed info
+    sets only depend on where they are. A FlatGameTree is hashed from its arrays,
+    its unnamed info sets from the nodes they hold (node_info) alone.
+    """
+    if isinstance(root, FlatGameTree):
+        # drop the "auto_{player}_{id(node)}" names, they change with every process
+        info_names = [None if isinstance(iid, str) and re.fullmatch(rf"auto_{re.escape(root.players[p])}_\d+", iid)
+                      else iid for iid, p in zip(root.info_ids, root.info_player.tolist())]
+        return _digest(
+            "flat", root.players, root.actions, info_names,
+            *(np.ascontiguousarray(a).tobytes() for a in (root.first_child, root.child, root.child_action,
+                                                          root.node_player, root.node_info, root.payoff_row)),
+            str(root.payoffs.dtype), np.ascontiguousarray(root.payoffs).tobytes(),
+            None if root.chance_prob is None else np.ascontiguousarray(root.chance_prob).tobytes(),
+        )
+
+    known = _TREE_FINGERPRINTS.get(root)
+    if known is not None:
+        return known
+
+    hashes = {}
+    stack = [root]
+    while stack:
+        node = stack[-1]
+        if id(node) in hashes:
+            stack.pop()
+            continue
+        if node.is_terminal():
+            hashes[id(node)] = _digest("leaf", tuple(node.payoffs))
+            stack.pop()
+            continue
+        pending = [child for child in node.children.values() if id(child) not in hashes]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        actions = node.actions or list(node.children)
+        hashes[id(node)] = _digest(
+            "node", node.player, node.info_set, list(actions),
+            [hashes[id(node.children[a])] for a in actions],
+            *([] if node.probs is None else [[node.probs[a] for a in actions]]),
+        )
+
+    _TREE_FINGERPRINTS[root] = hashes[id(root)]
+    return hashes[id(root)]
+
+
+def game_fingerprint(game):
+    """Content hash of a NormalFormGame: players, strategy labels and payoff tensor."""
+    payoffs = np.ascontiguousarray(game.payoffs)
+    return _digest("game", game.players, game.labels, str(payoffs.dtype), payoffs.shape, payoffs.tobytes())
+
+
+def approximate_size(value):
+    """Rough number of bytes held by a result (arrays, strings and the containers around them)."""
+    total = 0
+    seen = set()
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, np.ndarray):
+            total += obj.nbytes + 112
+            continue
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            stack.append(vars(obj))
+    return total
+
+
+class AnalysisCache:
+    """
+    Least-recently-used memo of analysis results, bounded by their total size.
+
+    Keys are built from content fingerprints (tree_fingerprint / game_fingerprint)
+    plus the analysis name and its options, so a result is reused whenever the
+    same game comes back, even as a new object. When the stored results exceed
+    max_bytes the least recently used ones are dropped; a single result larger
+    than the budget is returned but not kept.
+    """
+
+    def __init__(self, max_bytes=128 << 20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # key -> (value, size)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, compute):
+        """The cached value of key, calling compute() to produce it on a miss."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            profiling.count("analysis cache hits")
+            return entry[0]
+
+        self.misses += 1
+        profiling.count("analysis cache misses")
+        with profiling.timer(f"compute {key[0] if isinstance(key, tuple) else key}"):
+            value = compute()
+        size = approximate_size(value)
+        if size <= self.max_bytes:
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, dropped) = self._entries.popitem(last=False)
+                self.nbytes -= dropped
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+
+    def stats(self):
+        return {"entries": len(self), "bytes": self.nbytes, "hits": self.hits, "misses": self.misses}
+
+    def __repr__(self):
+        return f"AnalysisCache({len(self)} entries, {self.nbytes} of {self.max_bytes} bytes)"
@@ -0,0 +1,461 @@
+import random
+import time
+
+import numpy as np
+from Models.ExtensiveForm import CHANCE
+from Models.FlatGameTree import game_index
+from utilities import profiling
+
+SAMPLING = (None, "outcome", "external")
+
+
+class CFRSolver:
+    """
+    Counterfactual regret minimization (CFR, or CFR+ with plus=True) on an
+    extensive form game with imperfect information and chance nodes, given as
+    an ExtensiveFormNode tree or a FlatGameTree.
+
+    Regrets and strategies live in tables with one entry per (info set, action),
+    so the memory of the solver grows with the number of info sets, never with
+    the number of pure strategies:
+
+        info_ids[k]       player info set of table row k (chance info sets have no row)
+        info_player[k]    position of its player in `players` (its payoff column)
+        info_actions[k]   its actions
+        info_ptr          entries info_ptr[k]..info_ptr[k + 1] - 1 of the tables are row k
+        regrets           cumulative counterfactual regrets
+        strategy_sum      reach-weighted sum of the strategies played, see average_strategy()
+
+    sampling=None walks the whole tree every iteration, one array operation
+    per level (alternating the updated player when `alternating`, the default
+    for CFR+). "external" samples chance and opponent actions and explores all
+    actions of the updated player; "outcome" samples a single path with
+    `exploration` as the chance of trying a uniformly random action. Sampled
+    iterations only touch the nodes they visit.
+
+    Payoff column k of the tree belongs to players[k]; players default to the
+    players of the payoff columns (FlatGameTree.payoff_players). The convergence
+    guarantees and the best responses of evaluate() assume perfect recall.
+    """
+
+    def __init__(self, root, players=None, plus=True, sampling=None, alternating=None, exploration=0.6, seed=None):
+        if sampling not in SAMPLING:
+            raise ValueError(f"Unknown sampling {sampling!r}, choose from {SAMPLING}")
+        tree = game_index(root).tree
+        self.tree = tree
+        self.players = list(players) if players is not None else tree.payoff_players()
+        for p in tree.movers():
+            if p != CHANCE and p not in self.players:
+                raise ValueError(f"Decision node of {p!r}, which is not one of {self.players}")
+        if tree.payoffs.shape[1] < len(self.players):
+            raise ValueError(f"The payoffs have {tree.payoffs.shape[1]} columns for {len(self.players)} players")
+        self.plus = plus
+        self.sampling = sampling
+        self.alternating = plus if alternating is None else alternating
+        self.exploration = exploration
+        self.iterations = 0
+        self._rng = random.Random(seed)
+
+        n = len(tree)
+        degree = np.diff(tree.first_child)
+        column = np.array([self.players.index(p) if p in self.players else -1 for p in tree.players] + [-1])
+        self._edge_src = np.repeat(np.arange(n, dtype=np.int64), degree)
+        self._mover = column[tree.node_player]          # payoff column of the mover, -1 at terminal and chance nodes
+        self._decision = tree.payoff_row < 0
+        self._shared = len(tree.child) != n - 1
+        chance_node = self._decision & (self._mover < 0)
+        self._chance = (tree.chance_prob if tree.chance_prob is not None
+                        else np.full(len(tree.child), np.nan))
+        if not np.array_equal(np.isfinite(self._chance), chance_node[self._edge_src]):
+            raise ValueError(f"Nodes of {CHANCE} need probabilities for their actions, and only they may have them")
+
+        # one table row per player info set
+        info_column = column[tree.info_player]
+        rows = np.nonzero(info_column >= 0)[0]
+        actions = game_index(root).info_actions
+        self.info_ids = [tree.info_ids[g] for g in rows.tolist()]
+        self.info_player = info_column[rows]
+        self.info_actions = [actions[g] for g in rows.tolist()]
+        sizes = np.array([len(a) for a in self.info_actions], dtype=np.int64)
+        self.info_ptr = np.concatenate([[0], np.cumsum(sizes)])
+        self._entry_size = np.repeat(sizes, sizes)
+        row_of = np.full(len(tree.info_ids) + 1, -1, dtype=np.int64)
+        row_of[rows] = np.arange(len(rows))
+        node_row = row_of[tree.node_info]
+        self._node_entry = np.where(node_row >= 0, self.info_ptr[node_row.clip(0)], -1)
+        position = np.arange(len(tree.child)) - tree.first_child[self._edge_src]
+        src_entry = self._node_entry[self._edge_src]
+        self._edge_entry = np.where(src_entry >= 0, src_entry + position, -1)
+        self._player_edges = np.nonzero(self._edge_entry >= 0)[0]
+
+        self.regrets = np.zeros(self.info_ptr[-1])
+        self.strategy_sum = np.zeros(self.info_ptr[-1])
+
+    def __repr__(self):
+        variant = "CFR+" if self.plus else "CFR"
+        sampling = f", {self.sampling} sampling" if self.sampling else ""
+        return f"CFRSolver({variant}{sampling}, {len(self.info_ids)} info sets, {self.iterations} iterations)"
+
+    # ------------------------------------------------------------------ strategies
+
+    def _normalize(self, weights):
+        """weights / their info set's total, uniform where the total is 0."""
+        if not len(weights):
+            return weights.copy()
+        totals = np.repeat(np.add.reduceat(weights, self.info_ptr[:-1]), np.diff(self.info_ptr))
+        return np.where(totals > 0, weights / np.where(totals > 0, totals, 1), 1 / self._entry_size)
+
+    def current_strategy(self):
+        """Regret matching on the positive regrets, one probability per table entry."""
+        return self._normalize(np.maximum(self.regrets, 0))
+
+    def average_strategy(self):
+        """The average strategy, which is what converges to an equilibrium."""
+        return self._normalize(self.strategy_sum)
+
+    def table(self, values):
+        """Per-entry values (regrets, a strategy, ...) as {player: {info_set: {action: value}}}."""
+        values = np.asarray(values).tolist()
+        result = {p: {} for p in self.players}
+        for k, (info_id, actions) in enumerate(zip(self.info_ids, self.info_actions)):
+            start = int(self.info_ptr[k])
+            result[self.players[self.info_player[k]]][info_id] = dict(zip(actions, values[start:start + len(actions)]))
+        return result
+
+    def _edge_probs(self, strategy):
+        probs = self._chance.copy()
+        probs[self._player_edges] = strategy[self._edge_entry[self._player_edges]]
+        return probs
+
+    # ------------------------------------------------------------------ full-width passes
+
+    def _reach(self, probs):
+        """
+        (others, own), (n, N) arrays: for every node and player, the probability
+        that chance and the other players (others) or the player itself (own)
+        play to the node, summed over the paths to a shared node.
+        """
+        tree = self.tree
+        shape = (len(tree), len(self.players))
+        others, own = np.zeros(shape), np.zeros(shape)
+        others[0] = own[0] = 1
+        columns = np.arange(len(self.players))
+        levels = tree.level_ptr.tolist()
+        for start, stop in zip(levels[:-1], levels[1:]):
+            lo, hi = tree.first_child[start], tree.first_child[stop]
+            if lo == hi:
+                continue
+            src, dst = self._edge_src[lo:hi], tree.child[lo:hi]
+            mine = self._mover[src][:, None] == columns
+            p = probs[lo:hi, None]
+            reach_others = others[src] * np.where(mine, 1, p)
+            reach_own = own[src] * np.where(mine, p, 1)
+            if self._shared:
+                np.add.at(others, dst, reach_others)
+                np.add.at(own, dst, reach_own)
+            else:
+                others[dst], own[dst] = reach_others, reach_own
+        return others, own
+
+    def _values(self, probs):
+        """(n, N) expected payoffs of every subtree when the edges are played with probs."""
+        tree = self.tree
+        values = np.zeros((len(tree), len(self.players)))
+        terminal = ~self._decision
+        values[terminal] = tree.payoffs[tree.payoff_row[terminal], :len(self.players)]
+        levels = tree.level_ptr.tolist()
+        for start, stop in zip(levels[-2::-1], levels[:0:-1]):
+            nodes = start + np.nonzero(self._decision[start:stop])[0]
+            if not len(nodes):
+                continue
+            lo, hi = tree.first_child[start], tree.first_child[stop]
+            weighted = probs[lo:hi, None] * values[tree.child[lo:hi]]
+            values[nodes] = np.add.reduceat(weighted, tree.first_child[nodes] - lo)
+        return values
+
+    def _full_iteration(self, update):
+        """One full-width pass updating the regrets and average strategy of the players in `update`."""
+        strategy = self.current_strategy()
+        probs = self._edge_probs(strategy)
+        others, own = self._reach(probs)
+        values = self._values(probs)
+
+        edges = self._player_edges
+        src = self._edge_src[edges]
+        mover = self._mover[src]
+        keep = np.isin(mover, update)
+        edges, src, mover = edges[keep], src[keep], mover[keep]
+        entry = self._edge_entry[edges]
+        size = len(self.regrets)
+        regret = others[src, mover] * (values[self.tree.child[edges], mover] - values[src, mover])
+        self.regrets += np.bincount(entry, regret, minlength=size)
+        if self.plus:
+            np.maximum(self.regrets, 0, out=self.regrets)
+        weight = self.iterations if self.plus else 1
+        self.strategy_sum += weight * np.bincount(entry, own[src, mover] * strategy[entry], minlength=size)
+        profiling.count("nodes visited", len(self.tree))
+
+    # ------------------------------------------------------------------ sampled passes
+
+    def _lists(self):
+        tree = self.tree
+        return (tree.first_child.tolist(), tree.child.tolist(), tree.payoff_row.tolist(),
+                tree.payoffs[:, :len(self.players)].tolist(), self._mover.tolist(),
+                self._node_entry.tolist(), self._chance.tolist())
+
+    @staticmethod
+    def _matched(regrets, start, k):
+        positive = [max(r, 0.0) for r in regrets[start:start + k]]
+        total = sum(positive)
+        return [r / total for r in positive] if total > 0 else [1.0 / k] * k
+
+    def _pick(self, probs):
+        x = self._rng.random()
+        for d, p in enumerate(probs):
+            x -= p
+            if x < 0:
+                return d
+        return len(probs) - 1
+
+    def _external(self, i, regrets, strategy_sum, weight, arrays):
+        """
+        One external-sampling pass for player i, depth first from the root with
+        an explicit stack: chance and opponent nodes sample a single child,
+        player i's nodes wait on the stack for the values of all their children.
+        Returns the sampled value of the root.
+        """
+        first_child, child, payoff_row, payoffs, mover, node_entry, chance = arrays
+        stack = []                  # [lo, start, k, sigma, values of the children so far]
+        v = 0
+        while True:
+            # descend to a terminal node
+            while payoff_row[v] < 0:
+                lo, hi = first_child[v], first_child[v + 1]
+                if mover[v] < 0:
+                    v = child[lo + self._pick(chance[lo:hi])]
+                    continue
+                start, k = node_entry[v], hi - lo
+                sigma = self._matched(regrets, start, k)
+                if mover[v] != i:
+                    for d in range(k):
+                        strategy_sum[start + d] += weight * sigma[d]
+                    v = child[lo + self._pick(sigma)]
+                    continue
+                stack.append([lo, start, k, sigma, []])
+                v = child[lo]
+            u = payoffs[payoff_row[v]][i]
+
+            # hand the value up until a node of player i still has children to walk
+            while stack:
+                lo, start, k, sigma, values = stack[-1]
+                values.append(u)
+                if len(values) < k:
+                    v = child[lo + len(values)]
+                    break
+                stack.pop()
+                u = sum(s * x for s, x in zip(sigma, values))
+                for d in range(k):
+                    regrets[start + d] += values[d] - u
+                    if self.plus and regrets[start + d] < 0:
+                        regrets[start + d] = 0.0
+            else:
+                return u
+
+    def _outcome(self, i, regrets, strategy_sum, weight, arrays):
+        # chance probabilities are left out of both the reach and the sampling
+        # probability, where they would cancel
+        first_child, child, payoff_row, payoffs, mover, node_entry, chance = arrays
+        eps = self.exploration
+        path = []
+        v, own, others, sample = 0, 1.0, 1.0, 1.0
+        while payoff_row[v] < 0:
+            lo, hi = first_child[v], first_child[v + 1]
+            if mover[v] < 0:
+                v = child[lo + self._pick(chance[lo:hi])]
+                continue
+            start, k = node_entry[v], hi - lo
+            sigma = self._matched(regrets, start, k)
+            q = [eps / k + (1 - eps) * s for s in sigma] if mover[v] == i else sigma
+            d = self._pick(q)
+            path.append((mover[v] == i, start, k, sigma, d, own, others, sample))
+            if mover[v] == i:
+                own *= sigma[d]
+            else:
+                others *= sigma[d]
+            sample *= q[d]
+            v = child[lo + d]
+
+        u = payoffs[payoff_row[v]][i] / sample
+        tail = 1.0
+        for mine, start, k, sigma, d, own, others, sample in reversed(path):
+            if mine:
+                w = u * others
+                for b in range(k):
+                    regrets[start + b] += w * tail * (1 - sigma[d]) if b == d else -w * tail * sigma[d]
+                    if self.plus and regrets[start + b] < 0:
+                        regrets[start + b] = 0.0
+                for b in range(k):
+                    strategy_sum[start + b] += weight * own / sample * sigma[b]
+            tail *= sigma[d]
+
+    # ------------------------------------------------------------------ driver
+
+    def iterate(self, iterations=1):
+        """Run more iterations; every iteration updates every player once."""
+        with profiling.timer(f"cfr {self.sampling or 'full'}"):
+            if self.sampling is None:
+                for _ in range(iterations):
+                    self.iterations += 1
+                    if self.alternating:
+                        for i in range(len(self.players)):
+                            self._full_iteration([i])
+                    else:
+                        self._full_iteration(list(range(len(self.players))))
+            else:
+                arrays = self._lists()
+                regrets, strategy_sum = self.regrets.tolist(), self.strategy_sum.tolist()
+                for _ in range(iterations):
+                    self.iterations += 1
+                    weight = self.iterations if self.plus else 1
+                    for i in range(len(self.players)):
+                        if self.sampling == "external":
+                            self._external(i, regrets, strategy_sum, weight, arrays)
+                        else:
+                            self._outcome(i, regrets, strategy_sum, weight, arrays)
+                self.regrets, self.strategy_sum = np.array(regrets, dtype=float), np.array(strategy_sum, dtype=float)
+        profiling.count("cfr iterations", iterations)
+
+    # ------------------------------------------------------------------ evaluation
+
+    def _best_response_value(self, i, probs, reach):
+        """
+        Value for player i of a best response to the other players' edge probs.
+        The best action of an info set depends on all of its nodes, weighted by
+        their reach, so values are settled bottom up by a post-order walk with an
+        explicit stack: a node of player i waits for the children of every node
+        of its info set, any other node for its own children.
+        """
+        tree = self.tree
+        first_child, child = tree.first_child.tolist(), tree.child.tolist()
+        payoff_row, payoffs = tree.payoff_row.tolist(), tree.payoffs[:, i].tolist()
+        mover, node_info = self._mover.tolist(), tree.node_info.tolist()
+        probs, reach = probs.tolist(), reach.tolist()
+        members = {}
+        for v in np.nonzero(self._mover == i)[0].tolist():
+            members.setdefault(node_info[v], []).append(v)
+
+        value = [None] * len(tree)
+        expanded = [False] * len(tree)
+        best = {}
+        stack = [0]
+        while stack:
+            v = stack[-1]
+            if value[v] is not None:
+                stack.pop()
+                continue
+            lo, hi = first_child[v], first_child[v + 1]
+            if payoff_row[v] >= 0:
+                value[v] = payoffs[payoff_row[v]]
+                stack.pop()
+                continue
+
+            g = node_info[v] if mover[v] == i else None
+            if g is None:
+                needed = child[lo:hi]
+            elif g not in best:
+                needed = [c for h in members[g] for c in child[first_child[h]:first_child[h + 1]]]
+            else:
+                needed = [child[lo + best[g]]]
+            pending = [c for c in needed if value[c] is None]
+            if pending:
+                if expanded[v]:
+                    # only happens when an info set waits on itself
+                    raise ValueError("Best responses need perfect recall: info sets of "
+                                     f"{self.players[i]} depend on each other")
+                expanded[v] = True
+                stack.extend(pending)
+                continue
+
+            if g is None:
+                value[v] = sum(probs[e] * value[child[e]] for e in range(lo, hi))
+            else:
+                if g not in best:
+                    q = [0.0] * (hi - lo)
+                    for h in members[g]:
+                        base = first_child[h]
+                        for d in range(hi - lo):
+                            q[d] += reach[h] * value[child[base + d]]
+                    best[g] = q.index(max(q))
+                value[v] = value[child[lo + best[g]]]
+            stack.pop()
+        return value[0]
+
+    def evaluate(self, strategy=None):
+        """
+        (values, nash_conv) of a strategy given per table entry (the average
+        strategy by default): the expected payoffs and the sum over the players
+        of what a best response against the others would gain.
+        """
+        strategy = self.average_strategy() if strategy is None else np.asarray(strategy, dtype=float)
+        probs = self._edge_probs(strategy)
+        values = self._values(probs)[0]
+        others, _ = self._reach(probs)
+        best = [self._best_response_value(i, probs, others[:, i]) for i in range(len(self.players))]
+        return tuple(values.tolist()), float(sum(b - v for b, v in zip(best, values)))
+
+
+def cfr(root, iterations=1000, players=None, plus=True, sampling=None, check_every=100, tol=None,
+        seed=None, solver=None):
+    """
+    Approximate a Nash equilibrium of an imperfect-information game tree with
+    counterfactual regret minimization, see CFRSolver for the variants.
+
+    Runs `iterations` more iterations, checking the exploitability of the
+    average strategy every check_every of them and stopping once it is at
+    most tol. Pass the "solver" of an earlier result to continue it (the other
+    solver arguments are then ignored).
+
+    Returns a dictionary like:
+    {
+      "strategy":       {"Player 1": {info_set: {action: probability}}, ...},   # average strategy
+      "values":         (-0.0555, 0.0555),     # expected payoffs of the average strategy
+      "nash_conv":      0.0012,                # sum of the players' best response gains
+      "exploitability": 0.0006,                # nash_conv / number of players
+      "iterations":     1000,                  # total, including earlier runs of the solver
+      "history":        [(iteration, exploitability), ...],
+      "solver":         CFRSolver,
+      "stats":          {"method", "info_sets", "table_entries", "elapsed"},
+    }
+    """
+    start = time.perf_counter()
+    if solver is None:
+        solver = CFRSolver(root, players, plus=plus, sampling=sampling, seed=seed)
+
+    history = []
+    done = 0
+    while done < iterations:
+        step = min(check_every, iterations - done)
+        solver.iterate(step)
+        done += step
+        values, nash_conv = solver.evaluate()
+        history.append((solver.iterations, nash_conv / len(solver.players)))
+        if tol is not None and history[-1][1] <= tol:
+            break
+    if not history:
+        values, nash_conv = solver.evaluate()
+
+    return {
+        "strategy": solver.table(solver.average_strategy()),
+        "values": values,
+        "nash_conv": nash_conv,
+        "exploitability": nash_conv / len(solver.players),
+        "iterations": solver.iterations,
+        "history": history,
+        "solver": solver,
+        "stats": {
+            "method": ("CFR+" if solver.plus else "CFR") + (f" ({solver.sampling} sampling)" if solver.sampling else ""),
+            "info_sets": len(solver.info_ids),
+            "table_entries": len(solver.regrets),
+            "elapsed": time.perf_counter() - start,
+        },
+    }
@@ -0,0 +1,522 @@
+import time
+from itertools import combinations
+
+import numpy as np
+from Models.NormalForm import NormalFormGame
+from utilities import profiling
+
+
+def symmetric_payoffs(game):
+    """
+    (A, labels) of a symmetric two-player game: A[i, j] is the payoff of
+    strategy i against strategy j. game is a NormalFormGame whose Player 2
+    payoffs are Player 1's transposed, or a square matrix A.
+    """
+    if isinstance(game, NormalFormGame):
+        if game.num_players != 2:
+            raise ValueError("Evolutionary dynamics need a two-player game")
+        A, B = game.payoffs[..., 0].astype(float), game.payoffs[..., 1].astype(float)
+        if A.shape[0] != A.shape[1] or not np.allclose(B, A.T):
+            raise ValueError("The game is not symmetric: Player 2's payoffs must be Player 1's transposed")
+        return A, list(game.labels[0])
+    A = np.asarray(game, dtype=float)
+    if A.ndim != 2 or A.shape[0] != A.shape[1]:
+        raise ValueError(f"Expected a square payoff matrix, got shape {A.shape}")
+    return A, [f"S{i + 1}" for i in range(len(A))]
+
+
+# ------------------------------------------------------------------ dynamics
+# Every dynamic maps population states X, shape (s, k), to their time derivatives.
+
+def _fitness(X, A):
+    """Payoff of every strategy against every population, (s, k)."""
+    return X @ A.T
+
+
+def _replicator(X, A, noise):
+    F = _fitness(X, A)
+    return X * (F - (X * F).sum(axis=1, keepdims=True))
+
+
+def _best_response(X, A, noise):
+    F = _fitness(X, A)
+    best = np.zeros_like(X)
+    best[np.arange(len(X)), np.argmax(F, axis=1)] = 1.0
+    return best - X
+
+
+def _logit(X, A, noise):
+    F = _fitness(X, A) / noise
+    weights = np.exp(F - F.max(axis=1, keepdims=True))
+    return weights / weights.sum(axis=1, keepdims=True) - X
+
+
+def _smith(X, A, noise):
+    F = _fitness(X, A)
+    # gain[s, i, j] = [f_i - f_j]+, the pull of strategy i on players of strategy j
+    gain = np.maximum(F[:, :, None] - F[:, None, :], 0)
+    return (gain * X[:, None, :]).sum(axis=2) - X * gain.sum(axis=1)
+
+
+DYNAMICS = {
+    "replicator": _replicator,
+    "best-response": _best_response,
+    "logit": _logit,
+    "smith": _smith,
+}
+
+
+def velocity(game, X, dynamics="replicator", noise=0.1):
+    """Time derivative of the population states X (one state or a (s, k) batch)."""
+    A, _ = symmetric_payoffs(game)
+    X = np.asarray(X, dtype=float)
+    return DYNAMICS[dynamics](np.atleast_2d(X), A, noise).reshape(X.shape)
+
+
+# ------------------------------------------------------------------ integration
+
+# Dormand-Prince 5(4) tableau
+_C = np.array([0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1, 1])
+_A = [
+    [],
+    [1 / 5],
+    [3 / 40, 9 / 40],
+    [44 / 45, -56 / 15, 32 / 9],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+    [35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84],
+]
+_B5 = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0])
+_B4 = np.array([5179 / 57600, 0, 7571 / 16695, 393 / 640, -92097 / 339200, 187 / 2100, 1 / 40])
+
+
+def _project(X):
+    """Back onto the simplex after a step: clip rounding below zero, renormalize."""
+    X = np.clip(X, 0, None)
+    return X / X.sum(axis=1, keepdims=True)
+
+
+def _advance(rhs, X, duration, h, rtol, atol, min_step, max_rounds, counts):
+    """
+    Move every state of the batch `duration` forward in time with Dormand-Prince
+    steps. Each state has its own step size h[s] and clock; a round computes one
+    trial step for all states still behind, accepts the ones within tolerance
+    and rescales every step size from its error estimate. X and h are updated
+    in place.
+    """
+    remaining = np.full(len(X), float(duration))
+    h_min = min(min_step, duration)
+    for _ in range(max_rounds):
+        active = np.nonzero(remaining > 0)[0]
+        if not len(active):
+            return True
+        x = X[active]
+        step = np.minimum(h[active], remaining[active])
+        clipped = step < h[active]
+        dt = step[:, None]
+
+        stages = []
+        for row in _A:
+            stages.append(rhs(x + dt * sum(a * k for a, k in zip(row, stages)) if row else x))
+        stages = np.stack(stages)
+        x5 = x + dt * np.tensordot(_B5, stages, axes=1)
+        error = dt * np.tensordot(_B5 - _B4, stages, axes=1)
+        scale = atol + rtol * np.maximum(np.abs(x), np.abs(x5))
+        norm = np.sqrt(np.mean((error / scale) ** 2, axis=1))
+
+        # a step at the minimum size is taken regardless, so no state can stall
+        accept = (norm <= 1) | (step <= h_min)
+        done = active[accept]
+        X[done] = _project(x5[accept])
+        remaining[done] = np.where(clipped[accept], 0.0, remaining[done] - step[accept])
+
+        factor = np.clip(0.9 * np.where(norm > 0, norm, 1e-10) ** -0.2, 0.2, 5.0)
+        # a step only shortened to land on the end keeps its size for the next segment
+        h[active] = np.where(accept & clipped, h[active], np.maximum(step * factor, h_min))
+        counts["steps"] += int(accept.sum())
+        counts["rejected"] += int((~accept).sum())
+    return not (remaining > 0).any()
+
+
+def _best_response_target(A, tied):
+    """
+    Where best-response dynamics head from a state whose best replies are `tied`
+    (a boolean mask): the pure strategy of the set that stays a best reply
+    once the population moves toward it, or else the mixture over the set that
+    keeps its payoffs equal (the flow then slides along the tie).
+    """
+    members = np.nonzero(tied)[0]
+    for j in members:
+        if (A[j, j] >= A[members, j] - 1e-12).all():
+            target = np.zeros(len(A))
+            target[j] = 1.0
+            return target
+    size = len(members)
+    system = np.zeros((size + 1, size + 1))
+    system[:size, :size] = A[np.ix_(members, members)]
+    system[:size, size] = -1.0
+    system[size, :size] = 1.0
+    rhs = np.zeros(size + 1)
+    rhs[size] = 1.0
+    target = np.zeros(len(A))
+    try:
+        mixture = np.linalg.solve(system, rhs)[:size]
+    except np.linalg.LinAlgError:
+        mixture = None
+    if mixture is None or (mixture < -1e-12).any():
+        target[members[0]] = 1.0
+    else:
+        target[members] = np.clip(mixture, 0, None) / np.clip(mixture, 0, None).sum()
+    return target
+
+
+# best-response switches closer together than this (in time) are merged into a tie
+_BR_MERGE = 1e-3
+
+
+def _advance_best_response(A, X, duration, pinned, max_rounds, counts):
+    """
+    Best-response dynamics solved exactly, event by event. While the best reply
+    b stays the same, x(t) = b + (x - b) e^-t and the payoffs are affine in
+    1 - e^-t, so the next switch of every state is a ratio of payoff gaps.
+    A round moves each state to its next switch or to the end of `duration`;
+    at a tie the flow follows _best_response_target. This replaces the
+    Runge-Kutta steps, which would shrink to nothing at the discontinuities.
+
+    Switches can pile up in finite time (around the centre of Rock-Paper-
+    Scissors, say). A strategy that catches up within _BR_MERGE time units is
+    therefore joined to the tie, and stays there while the state slides;
+    pinned (s, k) holds these ties and is updated in place, like h in _advance.
+    """
+    remaining = np.full(len(X), float(duration))
+    targets = {}
+    scale = max(np.abs(A).max(), 1.0)
+    for _ in range(max_rounds):
+        active = np.nonzero(remaining > 1e-12)[0]
+        if not len(active):
+            return True
+        x = X[active]
+        F = x @ A.T
+        tied = (F >= F.max(axis=1, keepdims=True) - 1e-9 * scale) | pinned[active]
+        # the target only depends on the set of best replies, computed once per set
+        sets, first, inverse = np.unique(np.packbits(tied, axis=1), axis=0, return_index=True, return_inverse=True)
+        for key, i in zip(sets, first):
+            if key.tobytes() not in targets:
+                targets[key.tobytes()] = _best_response_target(A, tied[i])
+        target = np.array([targets[key.tobytes()] for key in sets])[inverse.ravel()]
+
+        # payoffs along the path: F + s G with s = 1 - e^-t
+        G = target @ A.T - F
+        lead = np.argmax(np.where(tied, G, -np.inf), axis=1)
+        rows = np.arange(len(active))
+        gap = F[rows, lead, None] - F
+        closing = G - G[rows, lead, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            hits = np.where(~tied & (closing > 1e-12), gap / closing, np.inf)
+        s_event = hits.min(axis=1)
+        s_end = -np.expm1(-remaining[active])
+        s = np.minimum(s_event, s_end)
+        X[active] = _project(x + s[:, None] * (target - x))
+        remaining[active] = np.where(s_event < s_end, remaining[active] + np.log1p(-s), 0.0)
+        # keep the tie only while sliding on a mixture; a pure target leaves it
+        sliding = (target > 0).sum(axis=1) > 1
+        merge = (s_event < _BR_MERGE) & (s_event < s_end)
+        hitting = hits <= s_event[:, None] * (1 + 1e-9)
+        pinned[active] = (tied & (sliding | merge)[:, None]) | (hitting & merge[:, None])
+        counts["steps"] += len(active)
+    return not (remaining > 1e-12).any()
+
+
+def simulate(game, states, t_max=50.0, dynamics="replicator", noise=0.1, samples=50,
+             rtol=1e-6, atol=1e-9, min_step=1e-6, max_rounds=100000):
+    """
+    Integrate the evolutionary dynamics from many initial population states at once.
+
+    states is a (s, k) array of mixtures over the k strategies (rows are
+    normalized). All states form one ODE system integrated with an adaptive
+    Dormand-Prince 5(4) method, each state with its own step size, so stiff or
+    fast states do not slow down the others; steps of min_step are taken even
+    when they miss the tolerance. Best-response dynamics, whose right-hand
+    side jumps, are solved exactly between switches instead (see
+    _advance_best_response). `dynamics` is one of DYNAMICS; noise is the
+    temperature of the logit dynamics.
+
+    Returns:
+    {
+      "times":       (samples,) times of the recorded states, from 0 to t_max
+      "states":      (samples, s, k) the population states at those times
+      "final":       (s, k) states at t_max
+      "velocity":    (s, k) time derivatives at t_max (zero at rest points)
+      "stats":       {"dynamics", "steps", "rejected", "complete", "elapsed"}
+    }
+    """
+    if dynamics not in DYNAMICS:
+        raise ValueError(f"Unknown dynamics {dynamics!r}, choose from {list(DYNAMICS)}")
+    start = time.perf_counter()
+    A, _ = symmetric_payoffs(game)
+    X = np.array(states, dtype=float, ndmin=2)
+    if X.shape[1] != len(A):
+        raise ValueError(f"States have {X.shape[1]} strategies, the game has {len(A)}")
+    X = _project(X)
+    f = DYNAMICS[dynamics]
+
+    def rhs(Y):
+        return f(Y, A, noise)
+
+    times = np.linspace(0.0, t_max, max(samples, 2))
+    recorded = [X.copy()]
+    h = np.full(len(X), max(t_max, 1.0) * 1e-3)
+    pinned = np.zeros(X.shape, dtype=bool)
+    counts = {"steps": 0, "rejected": 0}
+    complete = True
+    with profiling.timer(f"evolution {dynamics}"):
+        for segment in np.diff(times):
+            if dynamics == "best-response":
+                complete &= _advance_best_response(A, X, segment, pinned, max_rounds, counts)
+            else:
+                complete &= _advance(rhs, X, segment, h, rtol, atol, min_step, max_rounds, counts)
+            recorded.append(X.copy())
+    profiling.count("ODE steps", counts["steps"])
+
+    return {
+        "times": times,
+        "states": np.stack(recorded),
+        "final": X,
+        "velocity": rhs(X),
+        "stats": {"dynamics": dynamics, **counts, "complete": bool(complete),
+                  "elapsed": time.perf_counter() - start},
+    }
+
+
+# ------------------------------------------------------------------ rest points and stability
+
+def simplex_grid(k, resolution):
+    """All mixtures over k strategies with probabilities in steps of 1 / resolution."""
+    cuts = np.array(list(combinations(range(resolution + k - 1), k - 1)), dtype=np.int64).reshape(-1, k - 1)
+    bounds = np.hstack([np.full((len(cuts), 1), -1), cuts, np.full((len(cuts), 1), resolution + k - 1)])
+    return (np.diff(bounds, axis=1) - 1) / resolution
+
+
+def _tangent_basis(keep):
+    """Orthonormal basis, (k, d), of the directions z with sum 0 that are zero outside `keep`."""
+    idx = np.nonzero(keep)[0]
+    basis = np.zeros((len(keep), max(len(idx) - 1, 0)))
+    if len(idx) > 1:
+        basis[idx] = np.linalg.svd(np.ones((1, len(idx))))[2][1:].T
+    return basis
+
+
+def is_ess(game, x, tol=1e-9):
+    """
+    True if the mixture x is an evolutionarily stable strategy.
+
+    x must be a symmetric Nash equilibrium, and every mutant y that does as
+    well against x must do strictly worse against itself. With S the support
+    of x and E its best replies, that is z A z < 0 for all z != 0 with sum 0,
+    zero outside E and non-negative on E \\ S. The quadratic form is checked on
+    every face of that cone through the eigenvectors of its restriction
+    (exact unless eigenvalues are repeated).
+    """
+    A, _ = symmetric_payoffs(game)
+    x = np.asarray(x, dtype=float)
+    f = A @ x
+    value = x @ f
+    if f.max() > value + tol:
+        return False
+    support = x > tol
+    extra = np.nonzero((f >= value - tol) & ~support)[0]
+    M = (A + A.T) / 2
+    for r in range(len(extra) + 1):
+        for face in combinations(extra.tolist(), r):
+            keep = support.copy()
+            keep[list(face)] = True
+            basis = _tangent_basis(keep)
+            if not basis.shape[1]:
+                continue
+            eigenvalues, vectors = np.linalg.eigh(basis.T @ M @ basis)
+            for lam, u in zip(eigenvalues, vectors.T):
+                if lam < -tol:
+                    continue
+                z = (basis @ u)[list(face)]
+                # a direction inside the face (both signs allowed on S alone) with z A z >= 0
+                if not face or (z > tol).all() or (z < -tol).all():
+                    return False
+    return True
+
+
+def _eigenvalues(A, x, dynamics, noise=0.1):
+    """
+    Eigenvalues of the Jacobian of the dynamics at x, restricted to the simplex.
+    The replicator Jacobian is exact; the other dynamics are differentiated
+    numerically (a best-response switch shows up as a steep slope towards it).
+    """
+    basis = _tangent_basis(np.ones(len(A), dtype=bool))
+    if not basis.shape[1]:
+        return np.zeros(0)
+    if dynamics == "replicator":
+        f = A @ x
+        # Jacobian of x_i (f_i - x A x)
+        jacobian = (np.diag(f - x @ f) + x[:, None] * (A - (x @ A + f)[None, :])) @ basis
+    else:
+        h = 1e-6
+        v = DYNAMICS[dynamics](np.vstack([x + h * basis.T, x - h * basis.T]), A, noise)
+        d = basis.shape[1]
+        jacobian = (v[:d] - v[d:]).T / (2 * h)
+    return np.linalg.eigvals(basis.T @ jacobian)
+
+
+def rest_points(game, tol=1e-9):
+    """
+    Rest points of the replicator dynamics, one per support on which some mixture
+    equalizes the payoffs of the strategies in it (the vertices always are).
+    Supports are solved size by size as batches of linear systems, so the work
+    grows as 2 ** k; degenerate supports with a continuum of rest points are
+    skipped.
+
+    Returns a list of dictionaries:
+    {
+      "state":       {label: probability}
+      "x":           (k,) array of the same
+      "payoff":      x A x
+      "nash":        True if no strategy does better against x
+      "ess":         see is_ess
+      "stable":      True if the replicator dynamics are asymptotically stable
+                     there to first order (all eigenvalues on the simplex < 0)
+      "eigenvalues": eigenvalues of the Jacobian along the simplex
+    }
+    """
+    A, labels = symmetric_payoffs(game)
+    k = len(A)
+    points = []
+    for size in range(1, k + 1):
+        supports = np.array(list(combinations(range(k), size)), dtype=np.int64)
+        # [A_SS  -1; 1..1  0] (x_S, value) = (0, .., 0, 1)
+        systems = np.zeros((len(supports), size + 1, size + 1))
+        systems[:, :size, :size] = A[supports[:, :, None], supports[:, None, :]]
+        systems[:, :size, size] = -1.0
+        systems[:, size, :size] = 1.0
+        scale = np.maximum(np.abs(systems).max(axis=(1, 2)), 1.0)
+        ok = np.abs(np.linalg.det(systems / scale[:, None, None])) > tol
+        if not ok.any():
+            continue
+        rhs = np.zeros((int(ok.sum()), size + 1, 1))
+        rhs[:, size] = 1.0
+        solutions = np.linalg.solve(systems[ok], rhs)[..., 0]
+        for support, z in zip(supports[ok], solutions):
+            if (z[:size] > tol).all():
+                x = np.zeros(k)
+                x[support] = z[:size]
+                points.append(x)
+
+    result = []
+    for x in points:
+        f = A @ x
+        value = x @ f
+        eigenvalues = _eigenvalues(A, x, "replicator")
+        result.append({
+            "state": {label: float(p) for label, p in zip(labels, x)},
+            "x": x,
+            "payoff": float(value),
+            "nash": bool(f.max() <= value + 1e-7),
+            "ess": is_ess(A, x),
+            "stable": bool((eigenvalues.real < -tol).all()),
+            "eigenvalues": eigenvalues,
+        })
+    return result
+
+
+def initial_states(k, count=2000, seed=0):
+    """
+    About `count` starting populations covering the simplex: a regular grid
+    for up to three strategies, uniform random mixtures beyond.
+    """
+    if k == 2:
+        p = np.linspace(0, 1, count)
+        return np.column_stack([p, 1 - p])
+    if k == 3:
+        # (r + 1)(r + 2) / 2 grid points
+        resolution = max(int(np.sqrt(2 * count)) - 1, 1)
+        return simplex_grid(3, resolution)
+    return np.random.default_rng(seed).dirichlet(np.ones(k), count)
+
+
+def basins(game, dynamics="replicator", states=None, count=2000, t_max=100.0, noise=0.1, seed=0, tol=1e-3):
+    """
+    Basins of attraction: where the dynamics take each of many starting
+    populations (initial_states by default), all integrated as one batch.
+
+    A run has converged when it moved less than tol over the last tenth of
+    the time; converged end states closer than 10 * tol are one candidate.
+    A candidate is only an attractor if it passes the `stable` check of
+    rest_points under the chosen dynamics; runs that end on an unstable rest
+    point (e.g. a corner of Rock-Paper-Scissors reached along an edge) count
+    as not converged.
+
+    Returns:
+    {
+      "states":     (s, k) starting populations
+      "final":      (s, k) their states at t_max
+      "label":      (s,) index of the attractor reached, -1 when still moving (e.g. cycles)
+                    or resting on an unstable point
+      "attractors": [{label: probability}, ...]
+      "points":     (c, k) array of the attractors
+      "share":      (c,) fraction of the starting populations in each basin
+      "converged":  fraction of the runs that reached an attractor
+      "stats":      simulate()'s stats
+    }
+    """
+    A, labels = symmetric_payoffs(game)
+    states = initial_states(len(A), count, seed) if states is None else np.asarray(states, dtype=float)
+    run = simulate(A, states, t_max, dynamics, noise, samples=11)
+    final = run["final"]
+    moving = np.abs(final - run["states"][-2]).max(axis=1) > tol
+
+    label = np.full(len(final), -1, dtype=np.int64)
+    points = []
+    unassigned = ~moving
+    while unassigned.any():
+        seed_state = final[np.argmax(unassigned)]
+        members = unassigned & (np.abs(final - seed_state).max(axis=1) <= 10 * tol)
+        unassigned &= ~members
+        point = final[members].mean(axis=0)
+        if (_eigenvalues(A, point, dynamics, noise).real < -1e-9).all():
+            label[members] = len(points)
+            points.append(point)
+
+    points = np.array(points).reshape(-1, len(A))
+    return {
+        "states": states,
+        "final": final,
+        "label": label,
+        "attractors": [{l: float(p) for l, p in zip(labels, x)} for x in points],
+        "points": points,
+        "share": np.bincount(label[label >= 0], minlength=len(points)) / len(final),
+        "converged": float((label >= 0).mean()),
+        "stats": run["stats"],
+    }
+
+
+def phase_portrait(game, dynamics="replicator", resolution=20, noise=0.1):
+    """
+    Velocity field of the dynamics on a grid of the simplex, for plotting.
+
+    For two strategies the grid is the share of the first strategy; for three
+    the points are also given in the plane of the equilateral triangle whose
+    corners are the pure strategies (first at (0, 0), second at (1, 0), third
+    on top).
+
+    Returns {"states": (p, k), "velocity": (p, k), "plane": (p, 2), "labels": labels}
+    where plane is (share of the first strategy, its growth rate) for two strategies.
+    """
+    A, labels = symmetric_payoffs(game)
+    k = len(A)
+    if k not in (2, 3):
+        raise ValueError("Phase portraits are drawn for games with two or three strategies")
+    states = simplex_grid(k, resolution)
+    v = DYNAMICS[dynamics](states, A, noise)
+    if k == 2:
+        plane = np.column_stack([states[:, 0], v[:, 0]])
+    else:
+        corners = np.array([[0.0, 0.0], [1.0, 0.0], [0.5, np.sqrt(3) / 2]])
+        plane = states @ corners
+    return {"states": states, "velocity": v, "plane": plane, "labels": labels}
@@ -0,0 +1,517 @@
+import copy
+import json
+import os
+import re
+from fractions import Fraction
+
+import numpy as np
+from Models.ExtensiveForm import CHANCE, ExtensiveFormNode
+from Models.FlatGameTree import FlatGameTree
+from Models.NormalForm import NormalFormGame, StrategySpace
+
+# Binary game file:
+#   MAGIC | header length (uint64, little endian) | JSON header | arrays
+# Every array starts on a 64 byte boundary at header["arrays"][name]["offset"]
+# bytes after the end of the padded header, so it can be memory-mapped in place.
+MAGIC = b"GTGAME1\n"
+_ALIGN = 64
+
+_FLAT_ARRAYS = ("parent", "first_child", "child", "child_action", "node_player",
+                "node_info", "info_player", "payoffs", "payoff_row", "level_ptr")
+
+
+def _aligned(n):
+    return -(-n // _ALIGN) * _ALIGN
+
+
+def _write_container(path, header, arrays):
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+    offset = 0
+    header = dict(header, arrays={})
+    for name, a in arrays.items():
+        header["arrays"][name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset}
+        offset = _aligned(offset + a.nbytes)
+    text = json.dumps(header).encode()
+    start = _aligned(len(MAGIC) + 8 + len(text))
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(text).to_bytes(8, "little"))
+        f.write(text)
+        for name, a in arrays.items():
+            f.seek(start + header["arrays"][name]["offset"])
+            f.write(a.tobytes())
+        f.truncate(start + offset)
+
+
+def _read_header(f):
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{getattr(f, 'name', 'file')} is not a saved game")
+    size = int.from_bytes(f.read(8), "little")
+    header = json.loads(f.read(size))
+    return header, _aligned(len(MAGIC) + 8 + size)
+
+
+def _read_container(path, mmap=True):
+    """(header, {name: array}); arrays are read-only memory maps unless mmap is False."""
+    with open(path, "rb") as f:
+        header, start = _read_header(f)
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+            count = int(np.prod(shape, dtype=np.int64))
+            if mmap and count:
+                arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=start + spec["offset"], shape=shape)
+            else:
+                f.seek(start + spec["offset"])
+                arrays[name] = np.fromfile(f, dtype=dtype, count=count).reshape(shape)
+    return header, arrays
+
+
+def _strategies_spec(strats):
+    if isinstance(strats, StrategySpace):
+        return {"info_ids": strats.info_ids, "actions": strats.actions}
+    # explicit (or reduced) lists keep their {info_set: action} dicts in order
+    return {"strategies": [list(s.items()) for s in strats]}
+
+
+def _strategies_from_spec(spec):
+    if "info_ids" in spec:
+        return StrategySpace(spec["info_ids"], spec["actions"])
+    return [dict((iid, action) for iid, action in s) for s in spec["strategies"]]
+
+
+def save_game(game, path, title=""):
+    """
+    Write a NormalFormGame, FlatGameTree or ExtensiveFormNode tree to a binary game file.
+    Strategy labels, players and info sets go in the JSON header, the payoff
+    tensor (or the arrays of the flat tree) follow as raw little-endian data.
+    """
+    if isinstance(game, NormalFormGame):
+        header = {
+            "kind": "normal",
+            "title": title,
+            "players": game.players,
+            "info_ids": game.info_ids,
+            "strategies": [_strategies_spec(s) for s in game.player_strategies],
+        }
+        payoffs = game.payoffs.astype(game.payoffs.dtype.newbyteorder("<"))
+        _write_container(path, header, {"payoffs": payoffs})
+        return
+
+    tree = game if isinstance(game, FlatGameTree) else FlatGameTree.from_tree(game)
+    header = {
+        "kind": "extensive",
+        "title": title,
+        "players": tree.players,
+        "actions": tree.actions,
+        "info_ids": tree.info_ids,
+    }
+    arrays = {name: getattr(tree, name) for name in _FLAT_ARRAYS}
+    if tree.chance_prob is not None:
+        arrays["chance_prob"] = tree.chance_prob
+    _write_container(path, header, {n: a.astype(a.dtype.newbyteorder("<")) for n, a in arrays.items()})
+
+
+def load_game(path, mmap=True):
+    """
+    Open a game file: a saved binary game, a Gambit .nfg or a Gambit .efg file.
+
+    Binary normal form games come back as a NormalFormGame whose payoff tensor is
+    memory-mapped, so opening one does not read the payoffs; extensive games come
+    back as a FlatGameTree. Gambit files are parsed into a NormalFormGame (.nfg)
+    or an ExtensiveFormNode tree (.efg).
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".nfg":
+        return read_nfg(path)
+    if extension == ".efg":
+        return read_efg(path)
+
+    header, arrays = _read_container(path, mmap)
+    if header["kind"] == "normal":
+        strategies = [_strategies_from_spec(spec) for spec in header["strategies"]]
+        return NormalFormGame(header["players"], arrays["payoffs"], strategies, header["info_ids"])
+    if header["kind"] == "extensive":
+        return FlatGameTree(
+            header["players"], arrays["parent"], arrays["first_child"], arrays["child"],
+            arrays["child_action"], header["actions"], arrays["node_player"], arrays["node_info"],
+            header["info_ids"], arrays["info_player"], arrays["payoffs"], arrays["payoff_row"],
+            arrays["level_ptr"], arrays.get("chance_prob"),
+        )
+    raise ValueError(f"Unknown game kind {header['kind']!r} in {path}")
+
+
+def read_header(path):
+    """(title, players) of a game file, without reading the game itself."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".nfg", ".efg"):
+        with open(path, "r", encoding="utf-8") as f:
+            return _header(_Tokens(f), extension[1:].upper())
+    with open(path, "rb") as f:
+        header = _read_header(f)[0]
+    return header.get("title", ""), header["players"]
+
+
+# ---------------------------------------------------------------- Gambit files
+
+# a brace, a quoted string (backslash escapes) or a bare word; commas separate like spaces
+_TOKEN = re.compile(r'[\s,]*(?:([{}])|"((?:[^"\\]|\\.)*)"|([^\s,{}"]+))', re.S)
+
+
+class _Tokens:
+    """
+    Tokens of a Gambit file, read from the stream one chunk at a time so that
+    big files are never held in memory. A token is ("{" | "}" | "str" | "word", text).
+    """
+
+    def __init__(self, stream, chunk_size=1 << 16):
+        self._iter = self._scan(stream, chunk_size)
+        self._next = None
+
+    @staticmethod
+    def _scan(stream, chunk_size):
+        buffer = ""
+        while True:
+            chunk = stream.read(chunk_size)
+            buffer += chunk
+            pos = 0
+            while True:
+                m = _TOKEN.match(buffer, pos)
+                # a token touching the end of the buffer may continue in the next chunk
+                if m is None or (chunk and m.end() == len(buffer)):
+                    break
+                pos = m.end()
+                if m.group(1):
+                    yield m.group(1), m.group(1)
+                elif m.group(2) is not None:
+                    yield "str", re.sub(r"\\(.)", r"\1", m.group(2))
+                else:
+                    yield "word", m.group(3)
+            buffer = buffer[pos:]
+            if not chunk:
+                if buffer.strip(" \t\r\n,"):
+                    raise ValueError(f"Unterminated token at the end of the file: {buffer[:40]!r}")
+                return
+
+    def peek(self):
+        if self._next is None:
+            self._next = next(self._iter, (None, None))
+        return self._next
+
+    def next(self, kind=None):
+        token = self.peek()
+        self._next = None
+        if token[0] is None:
+            raise ValueError("Unexpected end of file")
+        if kind is not None and token[0] != kind:
+            raise ValueError(f"Expected {kind!r}, found {token[1]!r}")
+        return token
+
+    def word(self):
+        return self.next("word")[1]
+
+    def string(self):
+        return self.next("str")[1]
+
+    def strings(self):
+        """A braced list of quoted strings."""
+        self.next("{")
+        items = []
+        while self.peek()[0] != "}":
+            items.append(self.string())
+        self.next("}")
+        return items
+
+    def number(self):
+        return _number(self.word())
+
+    def numbers(self):
+        """A braced list of numbers."""
+        self.next("{")
+        items = []
+        while self.peek()[0] != "}":
+            items.append(self.number())
+        self.next("}")
+        return items
+
+
+def _number(word):
+    """Gambit number: integer, decimal or rational "p/q" (kept exact when integral)."""
+    try:
+        if "/" in word:
+            value = Fraction(word)
+            return int(value) if value.denominator == 1 else float(value)
+        if re.fullmatch(r"[-+]?\d+", word):
+            return int(word)
+        return float(word)
+    except (ValueError, ZeroDivisionError):
+        raise ValueError(f"Expected a number, found {word!r}") from None
+
+
+def _open_text(source):
+    return open(source, "r", encoding="utf-8") if isinstance(source, (str, os.PathLike)) else source
+
+
+def _header(tokens, magic):
+    if tokens.word() != magic:
+        raise ValueError(f"Not a Gambit {magic} file")
+    tokens.word()                       # version
+    if tokens.word() not in ("R", "D"):
+        raise ValueError("Gambit files must use rational (R) or decimal (D) numbers")
+    title = tokens.string()
+    players = tokens.strings()
+    return title, players
+
+
+def read_nfg(source, players=None):
+    """
+    Parse a Gambit .nfg normal form file (path or text stream) into a NormalFormGame.
+
+    Both payoff layouts are read: the plain list of payoff vectors and the
+    outcome list followed by one outcome number per profile. As in Gambit,
+    the first player's strategy changes fastest along the profiles. players
+    renames the players by position.
+    """
+    with _open_text(source) as f:
+        tokens = _Tokens(f)
+        _, names = _header(tokens, "NFG")
+        n = len(names)
+
+        tokens.next("{")
+        if tokens.peek()[0] == "{":
+            labels = []
+            while tokens.peek()[0] != "}":
+                labels.append(tokens.strings())
+            tokens.next("}")
+        else:
+            labels = []
+            while tokens.peek()[0] != "}":
+                labels.append([str(j + 1) for j in range(int(tokens.word()))])
+            tokens.next("}")
+        if len(labels) != n:
+            raise ValueError(f"{n} players but {len(labels)} strategy lists")
+        shape = tuple(len(l) for l in labels)
+        size = int(np.prod(shape, dtype=np.int64))
+
+        if tokens.peek()[0] == "str":
+            tokens.string()             # comment
+        if tokens.peek()[0] == "{":
+            # outcome list, then the outcome of every profile (0: all payoffs zero)
+            table = [[0] * n]
+            tokens.next("{")
+            while tokens.peek()[0] != "}":
+                tokens.next("{")
+                tokens.string()
+                outcome = [tokens.number() for _ in range(n)]
+                tokens.next("}")
+                table.append(outcome)
+            tokens.next("}")
+            table = np.array(table)
+            rows = np.empty(size, dtype=np.int64)
+            for k in range(size):
+                rows[k] = int(tokens.word())
+            if rows.min(initial=0) < 0 or rows.max(initial=0) >= len(table):
+                raise ValueError("Profile refers to an outcome that does not exist")
+            flat = table[rows]
+        else:
+            flat = np.empty((size, n))
+            integral = True
+            for k in range(size):
+                for i in range(n):
+                    value = tokens.number()
+                    integral = integral and isinstance(value, int)
+                    flat[k, i] = value
+            if integral:
+                flat = flat.astype(np.int64)
+        if tokens.peek()[0] is not None:
+            raise ValueError(f"Unexpected {tokens.peek()[1]!r} after the payoffs")
+
+    # profiles run with player 1 fastest, the tensor is indexed (s_1, ..., s_N)
+    payoffs = flat.reshape(shape[::-1] + (n,)).transpose(tuple(range(n - 1, -1, -1)) + (n,))
+    players = list(players) if players is not None else names
+    info_ids = [f"P{k + 1}_main" for k in range(n)]
+    for player, strategies in zip(players, labels):
+        if len(set(strategies)) != len(strategies):
+            raise ValueError(f"Strategy names of {player} are not unique")
+    spaces = [StrategySpace([iid], [strategies]) for iid, strategies in zip(info_ids, labels)]
+    return NormalFormGame(players, np.ascontiguousarray(payoffs), spaces)
+
+
+def read_efg(source, players=None):
+    """
+    Parse a Gambit .efg extensive form file (path or text stream) into an
+    ExtensiveFormNode tree; returns the root.
+
+    Nodes are read one line at a time in the file's depth-first order.
+    Outcomes attached to inner nodes are added to the payoffs of every
+    terminal node below them. Info sets take their Gambit name, or
+    "P{player}_{number}" when unnamed. Chance nodes become CHANCE nodes with
+    their probabilities, each in an info set of its own. players renames the
+    players by position.
+    """
+    with _open_text(source) as f:
+        tokens = _Tokens(f)
+        _, names = _header(tokens, "EFG")
+        players = list(players) if players is not None else names
+        n = len(names)
+        if tokens.peek()[0] == "str":
+            tokens.string()             # comment
+
+        outcomes = {0: (0,) * n}
+        info_names = {}
+        root = None
+        stack = []                      # [node, next action position, payoffs so far]
+        while tokens.peek()[0] is not None:
+            if root is not None and not stack:
+                raise ValueError("Nodes after the end of the tree")
+            kind = tokens.word()
+            tokens.string()             # node name
+            if kind == "c":
+                tokens.word()               # info set number
+                if tokens.peek()[0] == "str":
+                    tokens.string()
+                tokens.next("{")
+                actions, probs = [], {}
+                while tokens.peek()[0] != "}":
+                    actions.append(tokens.string())
+                    probs[actions[-1]] = float(Fraction(tokens.word()))
+                tokens.next("}")
+            elif kind == "p":
+                mover = int(tokens.word())
+                number = int(tokens.word())
+                name = tokens.string() if tokens.peek()[0] == "str" else ""
+                actions = tokens.strings()
+            elif kind != "t":
+                raise ValueError(f"Unknown node type {kind!r}")
+
+            outcome = int(tokens.word())
+            if tokens.peek()[0] == "str":
+                tokens.string()
+                outcomes[outcome] = tuple(tokens.numbers())
+            if outcome not in outcomes:
+                raise ValueError(f"Outcome {outcome} is used before its payoffs are given")
+            if len(outcomes[outcome]) != n:
+                raise ValueError(f"Outcome {outcome} has {len(outcomes[outcome])} payoffs for {n} players")
+            above = stack[-1][2] if stack else (0,) * n
+            payoffs = tuple(a + b for a, b in zip(above, outcomes[outcome]))
+
+            if kind == "t":
+                node = ExtensiveFormNode(payoffs=payoffs)
+            elif kind == "c":
+                node = ExtensiveFormNode(player=CHANCE, actions=actions, probs=probs)
+            else:
+                if not 1 <= mover <= n:
+                    raise ValueError(f"Unknown player {mover}")
+                key = (mover, number)
+                if key not in info_names:
+                    taken = name and name in info_names.values()
+                    info_names[key] = name if name and not taken else f"P{mover}_{number}"
+                node = ExtensiveFormNode(player=players[mover - 1], actions=actions, info_set=info_names[key])
+
+            if stack:
+                parent = stack[-1]
+                parent[0].children[parent[0].actions[parent[1]]] = node
+                parent[1] += 1
+            else:
+                root = node
+            if kind != "t" and actions:
+                stack.append([node, 0, payoffs])
+            while stack and stack[-1][1] == len(stack[-1][0].actions):
+                stack.pop()
+
+    if root is None:
+        raise ValueError("The file has no nodes")
+    if stack:
+        raise ValueError("The file ends before the tree is complete")
+    return root
+
+
+# ------------------------------------------------------------------ game library
+
+def game_tree(game, players=None):
+    """
+    ExtensiveFormNode tree of a loaded game. A NormalFormGame becomes the
+    simultaneous-move tree in which every player picks one pure strategy at a
+    single info set. players renames the players of a NormalFormGame or a
+    FlatGameTree by position.
+    """
+    if isinstance(game, ExtensiveFormNode):
+        return game
+    if isinstance(game, FlatGameTree):
+        if players is not None:
+            game = copy.copy(game)
+            game.players = list(players)
+        return game.to_tree()
+
+    players = list(players) if players is not None else game.players
+    info_ids = [
+        strats.info_ids[0] if isinstance(strats, StrategySpace) and len(strats.info_ids) == 1 else f"P{k + 1}_main"
+        for k, strats in enumerate(game.player_strategies)
+    ]
+    payoffs = np.asarray(game.payoffs)
+    labels = game.labels
+
+    root = ExtensiveFormNode(player=players[0], actions=list(labels[0]), info_set=info_ids[0])
+    level = [(root, ())]
+    for k in range(game.num_players):
+        following = []
+        for node, profile in level:
+            for j, action in enumerate(labels[k]):
+                if k + 1 < game.num_players:
+                    child = ExtensiveFormNode(player=players[k + 1], actions=list(labels[k + 1]), info_set=info_ids[k + 1])
+                    following.append((child, profile + (j,)))
+                else:
+                    child = ExtensiveFormNode(payoffs=tuple(payoffs[profile + (j,)].tolist()))
+                node.children[action] = child
+        level = following
+    return root
+
+
+GAME_EXTENSIONS = (".nfg", ".efg", ".game")
+
+
+def load_library(directory):
+    """
+    {name: builder} for every game file in directory (.nfg, .efg and binary .game files).
+    Games are named by their title, or by the file name when untitled, and are
+    only read when their builder is called. Builders return the game with its
+    players called "Player 1", "Player 2", ... like the built-in games:
+    normal form files as a NormalFormGame (memory-mapped for .game files),
+    extensive ones as a tree. game_tree() draws a NormalFormGame as a tree
+    when a view needs one.
+    Files are not parsed here, so extensive games with chance moves are listed
+    too; extensive_to_normal_form refuses them when they are first analysed.
+    """
+    games = {}
+    if not os.path.isdir(directory):
+        return games
+    for file in sorted(os.listdir(directory)):
+        path = os.path.join(directory, file)
+        if os.path.splitext(file)[1].lower() not in GAME_EXTENSIONS:
+            continue
+        try:
+            title, players = read_header(path)
+        except (OSError, ValueError, KeyError):
+            continue
+        name = title or os.path.splitext(file)[0]
+        if name in games:
+            name = f"{name} ({file})"
+        games[name] = lambda path=path, players=players: _library_game(path, players)
+    return games
+
+
+def _library_game(path, declared):
+    # "Player 1", "Player 2", ... in place of the declared names; CHANCE keeps its name
+    numbers = iter(range(1, len(declared) + 1))
+    players = [p if p == CHANCE else f"Player {next(numbers)}" for p in declared]
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".efg":
+        return read_efg(path, players)
+    if extension == ".nfg":
+        return read_nfg(path, players)
+    game = load_game(path)
+    if isinstance(game, NormalFormGame):
+        game.players = players
+        return game
+    return game_tree(game, players)
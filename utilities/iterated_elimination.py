@@ -0,0 +1,220 @@
+import numpy as np
+from scipy.optimize import linprog
+from Models.NormalForm import NormalFormGame
+from utilities import profiling
+
+# columns compared at once when (re)building the dominance counters
+CHUNK = 256
+
+
+def _opponent_columns(U, i, alive, slab=None):
+    """
+    Player i's payoffs as a (n_i, profiles) matrix over the alive opponent profiles.
+    If slab = (j, k) only the profiles in which opponent j plays k are kept.
+    """
+    index = []
+    for j, mask in enumerate(alive):
+        if j == i:
+            index.append(np.arange(len(mask)))
+        elif slab is not None and j == slab[0]:
+            index.append(np.array([slab[1]]))
+        else:
+            index.append(np.nonzero(mask)[0])
+    sub = U[np.ix_(*index)]
+    return np.moveaxis(sub, i, 0).reshape(len(alive[i]), -1)
+
+
+class DominanceCounters:
+    """
+    Pairwise comparison counts of one player's strategies over the alive opponent
+    profiles:  worse[s, t] = #profiles where s pays less than t,  ties[s, t] = #ties.
+    Deleting an opponent strategy only subtracts the profiles that disappear.
+    """
+
+    def __init__(self, cols):
+        n = cols.shape[0]
+        self.worse = np.zeros((n, n), dtype=np.int64)
+        self.ties = np.zeros((n, n), dtype=np.int64)
+        self.total = 0
+        self.update(cols, +1)
+
+    def update(self, cols, sign):
+        for start in range(0, cols.shape[1], CHUNK):
+            block = cols[:, start:start + CHUNK]
+            left, right = block[:, None, :], block[None, :, :]
+            self.worse += sign * np.sum(left < right, axis=2)
+            self.ties += sign * np.sum(left == right, axis=2)
+        self.total += sign * cols.shape[1]
+
+    def dominated(self, alive, weak):
+        """Mask of alive strategies dominated by another alive pure strategy."""
+        if weak:
+            # never worse and strictly better somewhere
+            dominates = (self.worse == 0) & (self.ties < self.total)
+        else:
+            dominates = (self.worse == 0) & (self.ties == 0)
+        dominates &= alive[:, None]
+        np.fill_diagonal(dominates, False)
+        return alive & dominates.any(axis=0) if self.total else np.zeros_like(alive)
+
+
+def _dominated_by_mixture(cols, s, weak, tol):
+    """LP test: is row s (strictly / weakly) dominated by a mixture of the other rows?"""
+    n, m = cols.shape
+    others = [t for t in range(n) if t != s]
+    if not others:
+        return False
+    diff = cols[others] - cols[s]          # gain of each other row over s, per profile
+    profiling.count("LP solves")
+    if weak:
+        # max total gain  s.t.  gain >= 0 on every profile
+        res = linprog(-diff.sum(axis=1), A_ub=-diff.T, b_ub=np.zeros(m),
+                      A_eq=np.ones((1, len(others))), b_eq=[1.0],
+                      bounds=[(0, None)] * len(others), method="highs")
+        return res.status == 0 and -res.fun > tol
+    # max eps  s.t.  gain >= eps on every profile
+    res = linprog(np.append(np.zeros(len(others)), -1.0),
+                  A_ub=np.hstack([-diff.T, np.ones((m, 1))]), b_ub=np.zeros(m),
+                  A_eq=np.append(np.ones(len(others)), 0.0)[None, :], b_eq=[1.0],
+                  bounds=[(0, None)] * len(others) + [(None, None)], method="highs")
+    return res.status == 0 and -res.fun > tol
+
+
+def _never_best_response(cols, t, tol):
+    """LP test: is there no belief over the alive opponent profiles making row t a best response?"""
+    n, m = cols.shape
+    others = [s for s in range(n) if s != t]
+    if not others:
+        return False
+    profiling.count("LP solves")
+    res = linprog(np.zeros(m), A_ub=cols[others] - cols[t], b_ub=np.full(len(others), tol),
+                  A_eq=np.ones((1, m)), b_eq=[1.0], bounds=[(0, None)] * m, method="highs")
+    return res.status == 2
+
+
+def iterated_elimination(game, method="strict", mixed=True, tol=1e-9):
+    """
+    Iterated elimination of dominated strategies / never-best responses.
+
+    method="strict": IESDS, strategies strictly dominated by another strategy
+                     (or by a mixture of the alive strategies when mixed=True)
+    method="weak":   IEWDS, weakly dominated strategies (same for mixed)
+    method="nbr":    never-best responses, to mixed beliefs over the alive opponent
+                     profiles when mixed=True (rationalizability), or only to pure ones
+
+    Each round removes what is eliminable for every player at the same time.
+    The state is a boolean alive-mask per player; the pairwise dominance counters
+    are built once and each deletion only subtracts the opponent profiles it
+    removes, and the LP tests only rerun for players whose opponents changed.
+
+    Returns:
+    {
+      "alive": [mask of Player 1, mask of Player 2, ...],
+      "surviving": {player: [labels]},
+      "trace": [{"round": 1, "player": "Player 1", "removed": ["Cooperate"]}, ...],
+      "rounds": number of rounds that removed something,
+    }
+    """
+    if method not in ("strict", "weak", "nbr"):
+        raise ValueError(f"Unknown method {method!r}")
+
+    players = game.players
+    n_players = len(players)
+    U = [game.payoff_array(i).astype(float) for i in range(n_players)]
+    alive = [np.ones(n, dtype=bool) for n in game.shape]
+
+    # never-best responses are read off the payoffs directly, only dominance needs counters
+    counters = None
+    if method in ("strict", "weak"):
+        counters = [DominanceCounters(_opponent_columns(U[i], i, alive)) for i in range(n_players)]
+
+    # players whose opponents changed since their last LP check
+    stale = [True] * n_players
+    trace = []
+    rounds = 0
+
+    while True:
+        removals = []
+        for i in range(n_players):
+            mask = alive[i]
+            if mask.sum() <= 1:
+                removals.append(np.zeros_like(mask))
+                continue
+
+            if method == "nbr" and not mixed:
+                # best response to some alive pure opponent profile
+                cols = _opponent_columns(U[i], i, alive)
+                values = np.where(mask[:, None], cols, -np.inf)
+                best = values >= values.max(axis=0, keepdims=True) - tol
+                removed = mask & ~best.any(axis=1)
+            elif method == "nbr":
+                removed = np.zeros_like(mask)
+                if stale[i]:
+                    rows = np.nonzero(mask)[0]
+                    cols = _opponent_columns(U[i], i, alive)[rows]
+                    # a best response to a pure profile survives without an LP
+                    best = cols >= cols.max(axis=0, keepdims=True) - tol
+                    for r, t in enumerate(rows):
+                        if not best[r].any() and _never_best_response(cols, r, tol):
+                            removed[t] = True
+                    stale[i] = False
+            else:
+                removed = counters[i].dominated(mask, weak=(method == "weak"))
+                if mixed and not removed.any() and stale[i]:
+                    rows = np.nonzero(mask)[0]
+                    cols = _opponent_columns(U[i], i, alive)[rows]
+                    # a mixture never beats the best other row of a column, so rows that are
+                    # best (strict: weakly, weak: uniquely) somewhere need no LP
+                    top2 = np.sort(cols, axis=0)[-2:]
+                    best_other = np.where(cols == top2[-1], top2[0], top2[-1])
+                    if method == "weak":
+                        candidates = np.all(best_other >= cols, axis=1)
+                    else:
+                        candidates = np.all(best_other > cols + tol, axis=1)
+                    for r, t in enumerate(rows):
+                        if candidates[r] and _dominated_by_mixture(cols, r, method == "weak", tol):
+                            removed[t] = True
+                    stale[i] = False
+
+            # keep at least one strategy (only matters for ties under weak dominance)
+            if removed.sum() == mask.sum():
+                removed[np.nonzero(removed)[0][0]] = False
+            removals.append(removed)
+
+        if not any(r.any() for r in removals):
+            break
+        rounds += 1
+
+        for j in range(n_players):
+            for k in np.nonzero(removals[j])[0]:
+                # subtract the opponent profiles that disappear with (j, k)
+                if counters is not None:
+                    for i in range(n_players):
+                        if i != j:
+                            counters[i].update(_opponent_columns(U[i], i, alive, slab=(j, k)), -1)
+                alive[j][k] = False
+            if removals[j].any():
+                trace.append({
+                    "round": rounds,
+                    "player": players[j],
+                    "removed": [game.labels[j][k] for k in np.nonzero(removals[j])[0]],
+                })
+                for i in range(n_players):
+                    if i != j:
+                        stale[i] = True
+
+    profiling.count("elimination rounds", rounds)
+    return {
+        "alive": alive,
+        "surviving": {p: [game.labels[i][k] for k in np.nonzero(alive[i])[0]] for i, p in enumerate(players)},
+        "trace": trace,
+        "rounds": rounds,
+    }
+
+
+def restrict_game(game, alive):
+    """Subgame keeping only the strategies marked in the alive masks."""
+    index = [np.nonzero(mask)[0] for mask in alive]
+    payoffs = game.payoffs[np.ix_(*index, np.arange(game.num_players))]
+    strategies = [[game.player_strategies[i][k] for k in idx] for i, idx in enumerate(index)]
+    return NormalFormGame(game.players, payoffs, strategies, game.info_ids)
@@ -0,0 +1,265 @@
+import time
+import numpy as np
+from Models.NormalForm import NormalFormGame
+from utilities import profiling
+
+
+def _payoff_arrays(game):
+    """
+    (A, B, batched): float payoff matrices of Player 1 and Player 2 with a leading
+    batch axis, from a two-player NormalFormGame, an (A, B) pair of (n, m) arrays
+    or an (A, B) pair of (g, n, m) stacks of games.
+    """
+    if isinstance(game, NormalFormGame):
+        if game.num_players != 2:
+            raise ValueError("The learning dynamics are implemented for two-player games")
+        payoffs = np.asarray(game.payoffs, dtype=float)
+        A, B = payoffs[..., 0], payoffs[..., 1]
+    else:
+        A, B = (np.asarray(M, dtype=float) for M in game)
+    if A.shape != B.shape or A.ndim not in (2, 3):
+        raise ValueError(f"Payoff matrices must have the same (n, m) or (g, n, m) shape, got {A.shape} and {B.shape}")
+    batched = A.ndim == 3
+    if not batched:
+        A, B = A[None], B[None]
+    return A, B, batched
+
+
+def _row_values(A, y):
+    """A y for every game of the batch: (g, n, m) x (g, m) -> (g, n)."""
+    return np.matmul(A, y[..., None])[..., 0]
+
+
+def _column_values(x, B):
+    """x B for every game of the batch: (g, n) x (g, n, m) -> (g, m)."""
+    return np.matmul(x[:, None, :], B)[:, 0]
+
+
+def _nash_conv(A, B, x, y):
+    u = _row_values(A, y)
+    v = _column_values(x, B)
+    return u.max(axis=1) - (x * u).sum(axis=1) + v.max(axis=1) - (y * v).sum(axis=1)
+
+
+def nash_conv(game, x, y):
+    """
+    NashConv of the mixed profile (x, y): the sum over both players of what a
+    best response would gain, max(A y) - x A y + max(x B) - x B y. It is zero
+    exactly at Nash equilibria. Batched games take (g, n) / (g, m) strategies
+    and give one value per game.
+    """
+    A, B, batched = _payoff_arrays(game)
+    x = np.asarray(x, dtype=float).reshape(len(A) if batched else 1, -1)
+    y = np.asarray(y, dtype=float).reshape(len(A) if batched else 1, -1)
+    conv = _nash_conv(A, B, x, y)
+    return conv if batched else float(conv[0])
+
+
+def exploitability(game, x, y):
+    """Average gain of a best response over the two players, NashConv / 2."""
+    return nash_conv(game, x, y) / 2
+
+
+def _one_hot(values):
+    """Pure best responses (first maximum) to payoff vectors (g, k), as (g, k) 0/1 rows."""
+    best = np.zeros_like(values)
+    best[np.arange(len(values)), np.argmax(values, axis=1)] = 1.0
+    return best
+
+
+def _setup(game, x0, y0, restarts, seed):
+    """
+    Batched payoffs and starting strategies. `restarts` copies an unbatched game
+    that many times with random starting points (uniform on the simplex), so
+    restarts run as one batch; otherwise the start is x0 / y0 or uniform.
+    """
+    A, B, batched = _payoff_arrays(game)
+    g, n, m = A.shape
+    if restarts is not None:
+        if batched:
+            raise ValueError("restarts are only drawn for a single game, stack the games instead")
+        A, B = np.broadcast_to(A, (restarts, n, m)), np.broadcast_to(B, (restarts, n, m))
+        rng = np.random.default_rng(seed)
+        g, batched = restarts, True
+        x0 = rng.dirichlet(np.ones(n), restarts) if x0 is None else x0
+        y0 = rng.dirichlet(np.ones(m), restarts) if y0 is None else y0
+    x = np.broadcast_to(np.full(n, 1 / n) if x0 is None else np.asarray(x0, dtype=float), (g, n)).copy()
+    y = np.broadcast_to(np.full(m, 1 / m) if y0 is None else np.asarray(y0, dtype=float), (g, m)).copy()
+    return A, B, batched, x, y
+
+
+def _result(game, A, B, batched, x, y, iterations, history, state, method, start):
+    conv = _nash_conv(A, B, x, y)
+    result = {
+        "x": x if batched else x[0],
+        "y": y if batched else y[0],
+        "nash_conv": conv if batched else float(conv[0]),
+        "iterations": iterations,
+        "history": history,
+        "state": state,
+        "stats": {"method": method, "elapsed": time.perf_counter() - start},
+    }
+    if isinstance(game, NormalFormGame) and not batched:
+        result["strategies"] = {
+            player: {label: float(p) for label, p in zip(game.labels[k], s)}
+            for k, (player, s) in enumerate(zip(game.players, (x[0], y[0])))
+        }
+    profiling.count("learning iterations", iterations)
+    return result
+
+
+def _check(A, B, x, y, iteration, history, tol):
+    """Record the largest NashConv of the batch; True once every game is below tol."""
+    worst = float(_nash_conv(A, B, x, y).max())
+    history.append((iteration, worst))
+    return tol is not None and worst <= tol
+
+
+def fictitious_play(game, iterations=1000, tol=None, check_every=10, alternating=False,
+                    x0=None, y0=None, restarts=None, seed=None, warm_start=None):
+    """
+    Fictitious play on a bimatrix game, or on a batch of them at once.
+
+    Every player best-responds to the empirical average of the other's past
+    play; the averages converge to an equilibrium in zero-sum and 2 x n games
+    (not in general). An iteration is two matrix-vector products per game.
+    alternating=True lets Player 2 answer Player 1's updated average.
+
+    x0 / y0 are the initial beliefs (uniform by default), `restarts` runs that
+    many random initial beliefs of one game as a batch. warm_start takes the
+    "state" of an earlier result and continues it.
+
+    Returns:
+    {
+      "x", "y":      average strategies, (n,) / (m,) or (g, n) / (g, m) for a batch
+      "nash_conv":   NashConv of (x, y), a float or one per game
+      "iterations":  iterations run (stops early once every NashConv <= tol)
+      "history":     [(iteration, largest NashConv of the batch), ...] every check_every iterations
+      "state":       pass as warm_start to continue
+      "strategies":  {player: {label: probability}} for a single NormalFormGame
+      "stats":       {"method", "elapsed"}
+    }
+    """
+    start = time.perf_counter()
+    A, B, batched, x, y = _setup(game, x0, y0, restarts, seed)
+    t = 1
+    if warm_start is not None:
+        x, y, t = warm_start["x"].copy(), warm_start["y"].copy(), warm_start["t"]
+
+    history = []
+    done = 0
+    with profiling.timer("fictitious play"):
+        for it in range(1, iterations + 1):
+            bx = _one_hot(_row_values(A, y))
+            if alternating:
+                x += (bx - x) / (t + 1)
+                by = _one_hot(_column_values(x, B))
+            else:
+                by = _one_hot(_column_values(x, B))
+                x += (bx - x) / (t + 1)
+            y += (by - y) / (t + 1)
+            t += 1
+            done = it
+            if (it % check_every == 0 or it == iterations) and _check(A, B, x, y, it, history, tol):
+                break
+
+    state = {"x": x, "y": y, "t": t}
+    return _result(game, A, B, batched, x, y, done, history, state, "fictitious play", start)
+
+
+def _regret_strategy(R):
+    """Strategies proportional to the positive regrets, uniform where all are zero."""
+    total = R.sum(axis=1, keepdims=True)
+    return np.where(total > 0, R / np.where(total > 0, total, 1), 1 / R.shape[1])
+
+
+def regret_matching_plus(game, iterations=1000, tol=None, check_every=10, alternating=True,
+                         x0=None, y0=None, restarts=None, seed=None, warm_start=None):
+    """
+    Regret matching+ on a bimatrix game, or on a batch of them at once.
+
+    Each player keeps its cumulative regrets clipped at zero and plays in
+    proportion to them; the linearly weighted average strategies converge to
+    an equilibrium in zero-sum games (outside them there is no guarantee).
+    An iteration is two matrix-vector products per game.
+
+    alternating=True (the usual RM+) updates Player 2 against Player 1's new
+    strategy. x0 / y0 seed the regrets so that the first strategies are
+    x0 / y0. Arguments and result as in fictitious_play.
+    """
+    start = time.perf_counter()
+    A, B, batched, x, y = _setup(game, x0, y0, restarts, seed)
+    R1, R2 = x.copy(), y.copy()
+    x_sum, y_sum = np.zeros_like(x), np.zeros_like(y)
+    weight = 0.0
+    t = 0
+    if warm_start is not None:
+        R1, R2 = warm_start["R1"].copy(), warm_start["R2"].copy()
+        x_sum, y_sum = warm_start["x_sum"].copy(), warm_start["y_sum"].copy()
+        weight, t = warm_start["weight"], warm_start["t"]
+
+    history = []
+    done = 0
+    x_avg, y_avg = x, y
+    with profiling.timer("regret matching+"):
+        for it in range(1, iterations + 1):
+            t += 1
+            x, y = _regret_strategy(R1), _regret_strategy(R2)
+            u = _row_values(A, y)
+            R1 = np.maximum(R1 + u - (x * u).sum(axis=1, keepdims=True), 0)
+            if alternating:
+                x = _regret_strategy(R1)
+            v = _column_values(x, B)
+            R2 = np.maximum(R2 + v - (y * v).sum(axis=1, keepdims=True), 0)
+
+            # linear averaging: iteration t counts t times
+            x_sum += t * x
+            y_sum += t * y
+            weight += t
+            done = it
+            if it % check_every == 0 or it == iterations:
+                x_avg, y_avg = x_sum / weight, y_sum / weight
+                if _check(A, B, x_avg, y_avg, it, history, tol):
+                    break
+
+    if done:
+        x_avg, y_avg = x_sum / weight, y_sum / weight
+    state = {"R1": R1, "R2": R2, "x_sum": x_sum, "y_sum": y_sum, "weight": weight, "t": t}
+    return _result(game, A, B, batched, x_avg, y_avg, done, history, state, "regret matching+", start)
+
+
+def best_response_dynamics(game, iterations=100, alternating=False, x0=None, y0=None,
+                           restarts=None, seed=None, warm_start=None):
+    """
+    Pure best-response dynamics: at every step the players switch to a best
+    response (first maximum) to the other's current strategy, both at once
+    (simultaneous) or Player 1 first (alternating=True).
+
+    A game stops changing once it reaches a pure Nash equilibrium; the run
+    ends when every game of the batch has, or after `iterations` steps
+    (the dynamics may cycle). result["converged"] marks the games at a pure
+    equilibrium. Other arguments and the result are as in fictitious_play,
+    with x / y the current strategies instead of averages.
+    """
+    start = time.perf_counter()
+    A, B, batched, x, y = _setup(game, x0, y0, restarts, seed)
+    if warm_start is not None:
+        x, y = warm_start["x"].copy(), warm_start["y"].copy()
+
+    history = []
+    done = 0
+    with profiling.timer("best response dynamics"):
+        for it in range(1, iterations + 1):
+            bx = _one_hot(_row_values(A, y))
+            by = _one_hot(_column_values(bx if alternating else x, B))
+            stable = np.all(bx == x, axis=1) & np.all(by == y, axis=1)
+            x, y = bx, by
+            done = it
+            history.append((it, int((~stable).sum())))
+            if stable.all():
+                break
+
+    result = _result(game, A, B, batched, x, y, done, history, {"x": x, "y": y}, "best response dynamics", start)
+    converged = np.atleast_1d(result["nash_conv"]) <= 1e-12
+    result["converged"] = converged if batched else bool(converged[0])
+    return result
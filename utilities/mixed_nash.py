@@ -0,0 +1,253 @@
+import time
+from itertools import combinations, islice
+import numpy as np
+from Models.NormalForm import NormalFormGame
+from utilities import profiling
+
+
+def _bimatrix(game):
+    """(A, B) float payoff matrices of Player 1 and Player 2."""
+    if isinstance(game, NormalFormGame):
+        if game.num_players != 2:
+            raise ValueError("Mixed equilibria are computed for two-player games only")
+        payoffs = game.payoffs.astype(float)
+        return payoffs[..., 0], payoffs[..., 1]
+    A, B = game
+    return np.asarray(A, dtype=float), np.asarray(B, dtype=float)
+
+
+def is_nash(A, B, x, y, tol=1e-9):
+    """True if (x, y) is a mixed Nash equilibrium of the bimatrix game (A, B)."""
+    u1 = x @ A @ y
+    u2 = x @ B @ y
+    return bool(np.max(A @ y) <= u1 + tol and np.max(x @ B) <= u2 + tol)
+
+
+def _indifference_systems(M, rows, cols):
+    """
+    Stacked (k+1)x(k+1) systems  [M_IJ  -1; 1..1  0] z = (0, .., 0, 1)
+    whose solution z = (mixture over J, value) makes the row player
+    indifferent over the rows I. rows / cols have shape (b, k).
+    """
+    b, k = rows.shape
+    systems = np.zeros((b, k + 1, k + 1))
+    systems[:, :k, :k] = M[rows[:, :, None], cols[:, None, :]]
+    systems[:, :k, k] = -1.0
+    systems[:, k, :k] = 1.0
+    return systems
+
+
+def _solve_batch(systems, tol):
+    """Solve the non-singular systems of a batch, returns (solutions, mask)."""
+    k1 = systems.shape[-1]
+    rhs = np.zeros(k1)
+    rhs[-1] = 1.0
+    scale = np.maximum(np.abs(systems).max(axis=(1, 2)), 1.0)
+    ok = np.abs(np.linalg.det(systems / scale[:, None, None])) > tol
+    solutions = np.zeros(systems.shape[:2])
+    if ok.any():
+        solutions[ok] = np.linalg.solve(systems[ok], np.broadcast_to(rhs, (int(ok.sum()), k1))[..., None])[..., 0]
+    return solutions, ok
+
+
+def support_enumeration(game, tol=1e-9, max_support=None, chunk_size=4096):
+    """
+    All equilibria of a non-degenerate bimatrix game by support enumeration.
+
+    For every support size k, all pairs of supports (I, J) with |I| = |J| = k are
+    solved in batches of chunk_size stacked linear systems: y on J makes Player 1
+    indifferent over I, x on I makes Player 2 indifferent over J. A pair is kept
+    when both mixtures are non-negative and no pure strategy does better than the
+    support.
+    Singular systems are skipped and equilibria closer than `tol` are merged, so
+    degenerate games do not produce duplicates (but may miss equilibria whose
+    supports have different sizes).
+
+    Returns (equilibria, stats): equilibria is a list of (x, y) arrays.
+    """
+    A, B = _bimatrix(game)
+    n, m = A.shape
+    top = min(n, m) if max_support is None else min(n, m, max_support)
+
+    found = []
+    checked = 0
+    for k in range(1, top + 1):
+        # supports are drawn from the generators chunk by chunk, never all at once
+        pairs = ((I, J) for I in combinations(range(n), k) for J in combinations(range(m), k))
+        while True:
+            chunk = list(islice(pairs, chunk_size))
+            if not chunk:
+                break
+            rows, cols = (np.array(sets) for sets in zip(*chunk))
+            checked += len(chunk)
+
+            # y makes Player 1 indifferent over rows, x makes Player 2 indifferent over cols
+            zy, ok_y = _solve_batch(_indifference_systems(A, rows, cols), tol)
+            zx, ok_x = _solve_batch(_indifference_systems(B.T, cols, rows), tol)
+            ok = ok_x & ok_y
+            ok &= np.all(zy[:, :k] >= -tol, axis=1) & np.all(zx[:, :k] >= -tol, axis=1)
+            if not ok.any():
+                continue
+
+            idx = np.nonzero(ok)[0]
+            y = np.zeros((len(idx), m))
+            x = np.zeros((len(idx), n))
+            np.put_along_axis(y, cols[idx], np.clip(zy[idx, :k], 0, None), axis=1)
+            np.put_along_axis(x, rows[idx], np.clip(zx[idx, :k], 0, None), axis=1)
+
+            # no profitable pure deviation outside the supports
+            best1 = np.max(y @ A.T, axis=1) <= zy[idx, k] + tol
+            best2 = np.max(x @ B, axis=1) <= zx[idx, k] + tol
+            for i in np.nonzero(best1 & best2)[0]:
+                if not any(np.allclose(x[i], fx, atol=1e-6) and np.allclose(y[i], fy, atol=1e-6) for fx, fy in found):
+                    found.append((x[i], y[i]))
+
+    return found, {"supports_checked": checked}
+
+
+def _pivot(tableau, basis, entering, identity_cols, tol):
+    """
+    One pivot of Lemke-Howson: `entering` joins the basis, the row is chosen by
+    the lexicographic minimum ratio test (robust to degenerate ties).
+    Returns the label that left the basis.
+    """
+    column = tableau[:, entering]
+    rows = np.nonzero(column > tol)[0]
+    if len(rows) == 0:
+        raise RuntimeError("Lemke-Howson: unbounded pivot column")
+
+    # lexicographic ratio test on (rhs, identity columns) / pivot column; ratios
+    # within tol of the minimum are ties, so rounding noise cannot pick the row
+    for col in [-1] + identity_cols:
+        ratios = tableau[rows, col] / column[rows]
+        rows = rows[ratios <= ratios.min() + tol]
+        if len(rows) == 1:
+            break
+    best = rows[0]
+
+    tableau[best] /= tableau[best, entering]
+    pivot_row = tableau[best].copy()
+    tableau -= np.outer(tableau[:, entering], pivot_row)
+    tableau[best] = pivot_row
+    leaving = basis[best]
+    basis[best] = entering
+    return leaving
+
+
+def lemke_howson(game, initial_label=0, tol=1e-9, max_pivots=10000):
+    """
+    One equilibrium of a bimatrix game by the Lemke-Howson algorithm.
+
+    Labels 0..n-1 are Player 1's strategies and n..n+m-1 Player 2's.
+    The path starts by dropping `initial_label` and pivots alternately in the two
+    tableaus until that label is picked up again.
+
+    Returns (x, y, pivots).
+    """
+    A, B = _bimatrix(game)
+    n, m = A.shape
+
+    # shift payoffs so every entry is positive, this does not change equilibria
+    A_pos = A - A.min() + 1.0
+    B_pos = B - B.min() + 1.0
+
+    # column tableau: A y + r = 1  (r_i has label i, y_j has label n + j)
+    col_tableau = np.hstack([np.eye(n), A_pos, np.ones((n, 1))])
+    col_basis = list(range(n))
+    # row tableau: B^T x + s = 1  (x_i has label i, s_j has label n + j)
+    row_tableau = np.hstack([B_pos.T, np.eye(m), np.ones((m, 1))])
+    row_basis = list(range(n, n + m))
+
+    col_side = (col_tableau, col_basis, list(range(n)))
+    row_side = (row_tableau, row_basis, list(range(n, n + m)))
+
+    # x variables live in the row tableau, y variables in the column tableau
+    current, other = (row_side, col_side) if initial_label < n else (col_side, row_side)
+    entering = initial_label
+    pivots = 0
+    while True:
+        leaving = _pivot(current[0], current[1], entering, current[2], tol)
+        pivots += 1
+        if leaving == initial_label:
+            break
+        if pivots >= max_pivots:
+            raise RuntimeError("Lemke-Howson did not converge")
+        entering = leaving
+        current, other = other, current
+
+    x = np.zeros(n)
+    y = np.zeros(m)
+    for r, label in enumerate(row_basis):
+        if label < n:
+            x[label] = row_tableau[r, -1]
+    for r, label in enumerate(col_basis):
+        if label >= n:
+            y[label - n] = col_tableau[r, -1]
+    return x / x.sum(), y / y.sum(), pivots
+
+
+def mixed_nash(game, method="support", tol=1e-9, initial_label=0):
+    """
+    Mixed strategy Nash equilibria of a two-player NormalFormGame.
+
+    method="support": all equilibria by vectorized support enumeration
+    method="lemke-howson": a single equilibrium, fast; if the path from
+                           `initial_label` fails or ends in a degenerate point
+                           the other labels are tried in turn, and a
+                           RuntimeError is raised when none of them works
+
+    Example result:
+    {
+      "equilibria": [{"Player 1": {"Heads": 0.5, "Tails": 0.5},
+                      "Player 2": {"Heads": 0.5, "Tails": 0.5},
+                      "payoffs": (0.0, 0.0)}],
+      "stats": {"method": "support", "elapsed": 0.0004, "supports_checked": 5},
+    }
+    """
+    A, B = _bimatrix(game)
+    start = time.perf_counter()
+
+    if method not in ("support", "lemke-howson"):
+        raise ValueError(f"Unknown method {method!r}")
+
+    with profiling.timer(f"mixed_nash {method}"):
+        if method == "support":
+            equilibria, stats = support_enumeration((A, B), tol=tol)
+        else:
+            n, m = A.shape
+            equilibria, stats = [], {"pivots": 0}
+            for label in [initial_label] + [l for l in range(n + m) if l != initial_label]:
+                try:
+                    x, y, pivots = lemke_howson((A, B), initial_label=label, tol=tol)
+                except RuntimeError:
+                    # too long a path or a numerically broken one, start from the next label
+                    continue
+                stats["pivots"] += pivots
+                if is_nash(A, B, x, y, tol=max(tol, 1e-7)):
+                    equilibria = [(x, y)]
+                    break
+            else:
+                raise RuntimeError("Lemke-Howson found no equilibrium from any initial label")
+
+    stats["method"] = method
+    stats["elapsed"] = time.perf_counter() - start
+    if method == "support":
+        profiling.count("supports checked", stats["supports_checked"])
+    else:
+        profiling.count("Lemke-Howson pivots", stats["pivots"])
+
+    if isinstance(game, NormalFormGame):
+        players, labels = game.players, game.labels
+    else:
+        players = ["Player 1", "Player 2"]
+        labels = [list(range(A.shape[0])), list(range(A.shape[1]))]
+
+    results = []
+    for x, y in equilibria:
+        results.append({
+            players[0]: {label: float(p) for label, p in zip(labels[0], x)},
+            players[1]: {label: float(p) for label, p in zip(labels[1], y)},
+            "payoffs": (float(x @ A @ y), float(x @ B @ y)),
+        })
+    stats["equilibria"] = len(results)
+    return {"equilibria": results, "stats": stats}
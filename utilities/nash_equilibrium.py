@@ -1,18 +1,18 @@
-from .best_responses import compute_best_responses
+import numpy as np
+from Models.NormalForm import as_normal_form_game
+from .best_responses import pure_nash_mask
 
-def pure_nash(players, strategies, payoff_matrix):
+def pure_nash(players, strategies, payoff_matrix=None, tol=1e-9):
+    game = as_normal_form_game(strategies, payoff_matrix, players)
     equilibria = []
-    best_resps = compute_best_responses(strategies, payoff_matrix, players)
 
-    for strat, payoffs in zip(strategies, payoff_matrix):
-        a1 = strat[0][list(strat[0].keys())[0]] # player 1's actions
-        a2 = strat[1][list(strat[1].keys())[0]] # player 2's actions
-
-        if a1 in best_resps[players[0]][a2] and a2 in best_resps[players[1]][a1]:
-            equilibria.append((strat, payoffs))
+    # profiles where both players best-respond, in row-major order
+    for index in np.argwhere(pure_nash_mask(game.payoffs, tol)):
+        strat = tuple(game.player_strategies[k][i] for k, i in enumerate(index))
+        equilibria.append((strat, tuple(game.payoffs[tuple(index)].tolist())))
 
     print("Pure Strategy Nash Equilibria:" )
     for eq in equilibria:
         print(f"  {eq[0]} -> {eq[1]}")
 
-    return equilibria
\ No newline at end of file
+    return equilibria
@@ -0,0 +1,198 @@
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+# the report being collected by the current thread (or task), None when profiling is off;
+# concurrent runs, e.g. the sessions of the GUI, each collect their own report
+_active = ContextVar("profiling_report", default=None)
+_OFF = nullcontext()
+
+# tracemalloc is process wide: it runs while any report traces memory
+_trace_lock = threading.Lock()
+_tracers = 0
+
+
+class ProfileReport:
+    """
+    Timings and counters collected between start() and stop(), or in a profiling() block.
+
+        stages      {name: {"calls": n, "seconds": total}}, nested stages included in their parents
+        counters    {name: n}, e.g. "nodes visited", "profiles evaluated", "LP solves"
+        peak_memory largest traced allocation in bytes (None without memory tracing)
+        elapsed     seconds spent in the block
+    """
+
+    def __init__(self):
+        self.stages = defaultdict(lambda: {"calls": 0, "seconds": 0.0})
+        self.counters = defaultdict(int)
+        self.peak_memory = None
+        self.elapsed = 0.0
+        self._start = None
+        self._tracing = False
+
+    def as_dict(self):
+        return {
+            "elapsed": self.elapsed,
+            "peak_memory": self.peak_memory,
+            "stages": {name: dict(stage) for name, stage in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+    @classmethod
+    def merge(cls, reports):
+        """Sum of several reports (or their as_dict() forms); the peak memory is the largest one."""
+        total = cls()
+        for report in reports:
+            report = report.as_dict() if isinstance(report, ProfileReport) else report
+            total.elapsed += report["elapsed"]
+            if report["peak_memory"] is not None:
+                total.peak_memory = max(total.peak_memory or 0, report["peak_memory"])
+            for name, stage in report["stages"].items():
+                total.stages[name]["calls"] += stage["calls"]
+                total.stages[name]["seconds"] += stage["seconds"]
+            for name, n in report["counters"].items():
+                total.counters[name] += n
+        return total
+
+    def format(self):
+        """Plain text table of the report, slowest stages first."""
+        lines = [f"Total {self.elapsed:.4f} s"]
+        if self.peak_memory is not None:
+            lines[0] += f", peak memory {self.peak_memory / 2 ** 20:.2f} MiB"
+        if self.stages:
+            lines.append(f"  {'stage':<36} {'calls':>8} {'seconds':>10}")
+            for name, stage in sorted(self.stages.items(), key=lambda item: -item[1]["seconds"]):
+                lines.append(f"  {name:<36} {stage['calls']:>8} {stage['seconds']:>10.4f}")
+        if self.counters:
+            lines.append(f"  {'counter':<36} {'count':>8}")
+            for name, n in sorted(self.counters.items()):
+                lines.append(f"  {name:<36} {n:>8}")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"ProfileReport({len(self.stages)} stages, {len(self.counters)} counters, {self.elapsed:.4f} s)"
+
+
+class _Timer:
+    __slots__ = ("report", "name", "start")
+
+    def __init__(self, report, name):
+        self.report = report
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        stage = self.report.stages[self.name]
+        stage["calls"] += 1
+        stage["seconds"] += time.perf_counter() - self.start
+        return False
+
+
+def enabled():
+    return _active.get() is not None
+
+
+def timer(name):
+    """
+    Context manager adding the time of its block to stage `name`.
+    Returns a shared no-op context when profiling is off.
+    """
+    report = _active.get()
+    if report is None:
+        return _OFF
+    return _Timer(report, name)
+
+
+def count(name, n=1):
+    """Add n to counter `name` while profiling."""
+    report = _active.get()
+    if report is not None:
+        report.counters[name] += n
+
+
+def _start_tracing():
+    """Join the memory tracing; False when tracemalloc was started by someone else."""
+    global _tracers
+    with _trace_lock:
+        if _tracers == 0:
+            if tracemalloc.is_tracing():
+                return False
+            tracemalloc.start()
+        _tracers += 1
+        return True
+
+
+def _stop_tracing():
+    """Peak traced memory, stopping tracemalloc once no report traces any more."""
+    global _tracers
+    with _trace_lock:
+        peak = tracemalloc.get_traced_memory()[1]
+        _tracers -= 1
+        if _tracers == 0:
+            tracemalloc.stop()
+        return peak
+
+
+def start(memory=True):
+    """
+    Start collecting into a new report for the current thread and return it.
+    memory=True also traces allocations with tracemalloc (slower) to report
+    the peak memory; tracing is shared by the process, so the peak of runs
+    that overlap covers all of them. A report left running in this thread
+    (e.g. by an interrupted script) is stopped first.
+    """
+    if _active.get() is not None:
+        stop()
+    report = ProfileReport()
+    report._start = time.perf_counter()
+    report._tracing = memory and _start_tracing()
+    _active.set(report)
+    return report
+
+
+def stop(report=None):
+    """
+    Stop collecting; returns the finished report (None if profiling was off).
+    Without `report` the current thread's report is stopped; a report started
+    by an earlier run (e.g. one interrupted before it could stop it) can be
+    passed explicitly. Other threads' reports are never touched.
+    """
+    if report is None:
+        report = _active.get()
+    if _active.get() is report:
+        _active.set(None)
+    if report is None or report._start is None:
+        return report
+    report.elapsed = time.perf_counter() - report._start
+    report._start = None
+    if report._tracing:
+        report.peak_memory = _stop_tracing()
+        report._tracing = False
+    return report
+
+
+@contextmanager
+def profiling(memory=True):
+    """
+    Collect timings and counters from the instrumented code run in the block:
+
+        with profiling() as report:
+            extensive_to_normal_form(root)
+        print(report.format())
+
+    Blocks do not nest: an inner block reports into the outer one.
+    """
+    if _active.get() is not None:
+        yield _active.get()
+        return
+    report = start(memory)
+    try:
+        yield report
+    finally:
+        stop()
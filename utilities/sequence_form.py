@@ -0,0 +1,207 @@
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+from Models.ExtensiveForm import CHANCE
+from Models.FlatGameTree import game_index
+
+
+def build_sequence_form(root, players=["Player 1", "Player 2"]):
+    """
+    Sequence form of a two-player game tree with perfect recall.
+
+    A sequence of a player is the list of its own (info_set, action) choices on the
+    way to a node; because of perfect recall it is identified by its last choice.
+    Sequence 0 of every player is the empty sequence. Chance nodes have no
+    sequences: the payoffs of a leaf are weighted by the probability that chance
+    reaches it. The representation is linear in the size of the tree:
+
+        sequences[p]       [None, (info_set, action), ...]
+        E, e / F, f        realization plan constraints  E x = e, F y = f  (x, y >= 0)
+                           row 0 fixes the empty sequence to 1, every other row says
+                           that the actions of an info set split its parent sequence
+        A, B               sparse payoff matrices indexed by (sequence P1, sequence P2)
+        info_sets[p]       info set ids in the row order of E / F (row r + 1)
+        parents[p]         {info_set: index of the parent sequence}
+        info_sequences[p]  {info_set: indices of its sequences, in action order}
+    """
+    if len(players) != 2:
+        raise ValueError("The sequence form is only built for two-player games")
+
+    # integer view of the tree; also validates the info sets' actions
+    index = game_index(root)
+    tree = index.tree
+    info_sets = index.info_sets()
+    first_child = tree.first_child.tolist()
+    child = tree.child.tolist()
+    row = tree.payoff_row.tolist()
+    node_player = tree.node_player.tolist()
+    node_info = tree.node_info.tolist()
+    terminal_payoffs = tree.payoffs.tolist()
+    chance_prob = tree.chance_prob.tolist() if tree.chance_prob is not None else None
+
+    sequences = {p: [None] for p in players}
+    seq_index = {p: {} for p in players}
+    parents = {p: {} for p in players}
+    info_sequences = {p: {} for p in players}
+    info_order = {p: [] for p in players}
+    payoff_cells = {}
+
+    # each stack entry carries the current sequence index of both players and
+    # the probability that chance plays towards the node
+    stack = [(0, (0, 0), 1.0)]
+    while stack:
+        v, current, reach = stack.pop()
+
+        if row[v] >= 0:
+            payoffs = terminal_payoffs[row[v]]
+            cell = payoff_cells.setdefault(current, [0.0, 0.0])
+            cell[0] += reach * payoffs[0]
+            cell[1] += reach * payoffs[1]
+            continue
+
+        mover = tree.players[node_player[v]]
+        if mover == CHANCE:
+            for e in range(first_child[v], first_child[v + 1]):
+                stack.append((child[e], current, reach * chance_prob[e]))
+            continue
+        if mover not in players:
+            raise ValueError(f"Decision node of {mover!r}, which is not one of {players}")
+        p = players.index(mover)
+        player = players[p]
+        info_id = tree.info_ids[node_info[v]]
+
+        if info_id not in parents[player]:
+            parents[player][info_id] = current[p]
+            info_order[player].append(info_id)
+            info_sequences[player][info_id] = []
+            for action in info_sets[player][info_id]:
+                seq_index[player][(info_id, action)] = len(sequences[player])
+                info_sequences[player][info_id].append(len(sequences[player]))
+                sequences[player].append((info_id, action))
+        elif parents[player][info_id] != current[p]:
+            raise ValueError(f"Info set {info_id} of {player} violates perfect recall")
+
+        for action, c in zip(info_sets[player][info_id], child[first_child[v]:first_child[v + 1]]):
+            nxt = list(current)
+            nxt[p] = seq_index[player][(info_id, action)]
+            stack.append((c, tuple(nxt), reach))
+
+    constraints = {}
+    for player in players:
+        rows, cols, vals = [0], [0], [1.0]
+        for r, info_id in enumerate(info_order[player], start=1):
+            rows.append(r)
+            cols.append(parents[player][info_id])
+            vals.append(-1.0)
+            for i in info_sequences[player][info_id]:
+                rows.append(r)
+                cols.append(i)
+                vals.append(1.0)
+        shape = (len(info_order[player]) + 1, len(sequences[player]))
+        matrix = sparse.csr_matrix((vals, (rows, cols)), shape=shape)
+        rhs = np.zeros(shape[0])
+        rhs[0] = 1.0
+        constraints[player] = (matrix, rhs)
+
+    n1, n2 = len(sequences[players[0]]), len(sequences[players[1]])
+    keys = list(payoff_cells.keys())
+    rows = [k[0] for k in keys]
+    cols = [k[1] for k in keys]
+    A = sparse.csr_matrix(([payoff_cells[k][0] for k in keys], (rows, cols)), shape=(n1, n2))
+    B = sparse.csr_matrix(([payoff_cells[k][1] for k in keys], (rows, cols)), shape=(n1, n2))
+
+    E, e = constraints[players[0]]
+    F, f = constraints[players[1]]
+    return {
+        "players": list(players),
+        "sequences": sequences,
+        "info_sets": info_order,
+        "parents": parents,
+        "info_sequences": info_sequences,
+        "E": E, "e": e,
+        "F": F, "f": f,
+        "A": A, "B": B,
+    }
+
+
+def _behavior_from_plan(plan, sf, player, tol):
+    """Turn a realization plan into action probabilities at every info set."""
+    behavior = {}
+    sequences = sf["sequences"][player]
+    for info_id, indices in sf["info_sequences"][player].items():
+        parent = float(plan[sf["parents"][player][info_id]])
+        if parent > tol:
+            behavior[info_id] = {sequences[i][1]: max(float(plan[i]), 0.0) / parent for i in indices}
+        else:
+            # unreachable under the plan, any choice is optimal
+            behavior[info_id] = {sequences[i][1]: 1.0 / len(indices) for i in indices}
+    return behavior
+
+
+def zero_sum_sequence_equilibrium(root, players=["Player 1", "Player 2"], tol=1e-9):
+    """
+    Equilibrium of a two-player zero-sum (or constant-sum) game tree through the
+    sequence form LP, solved with SciPy's HiGHS. Player 1 solves
+
+        max f.q   s.t.  F^T q - A^T x <= 0,  E x = e,  x >= 0
+
+    and Player 2 the symmetric minimisation, so both LPs have one variable per
+    sequence and one constraint per info set.
+
+    Returns:
+    {
+      "value": expected payoff of Player 1,
+      "realization_plans": {player: {sequence: probability}},
+      "behavior_strategies": {player: {info_set: {action: probability}}},
+      "sequence_form": the output of build_sequence_form,
+    }
+    """
+    sf = build_sequence_form(root, players)
+    A = sf["A"]
+    E, e, F, f = sf["E"], sf["e"], sf["F"], sf["f"]
+
+    # the LP only uses A, so the game must be constant-sum at every leaf
+    leaves = game_index(root).tree.payoffs
+    if np.ptp(leaves[:, 0] + leaves[:, 1]) > tol:
+        raise ValueError("The game is not zero-sum (payoff sums differ across leaves)")
+
+    n1, n2 = A.shape
+    k1, k2 = E.shape[0], F.shape[0]
+
+    # Player 1: variables (x, q)
+    res1 = linprog(
+        c=np.concatenate([np.zeros(n1), -f]),
+        A_ub=sparse.hstack([-A.T, F.T]).tocsr(),
+        b_ub=np.zeros(n2),
+        A_eq=sparse.hstack([E, sparse.csr_matrix((k1, k2))]).tocsr(),
+        b_eq=e,
+        bounds=[(0, None)] * n1 + [(None, None)] * k2,
+        method="highs",
+    )
+    # Player 2: variables (y, p)
+    res2 = linprog(
+        c=np.concatenate([np.zeros(n2), e]),
+        A_ub=sparse.hstack([A, -E.T]).tocsr(),
+        b_ub=np.zeros(n1),
+        A_eq=sparse.hstack([F, sparse.csr_matrix((k2, k1))]).tocsr(),
+        b_eq=f,
+        bounds=[(0, None)] * n2 + [(None, None)] * k1,
+        method="highs",
+    )
+    if res1.status != 0 or res2.status != 0:
+        raise RuntimeError(f"Sequence form LP failed: {res1.message} / {res2.message}")
+
+    x, y = res1.x[:n1], res2.x[:n2]
+    p1, p2 = players
+    return {
+        "value": float(-res1.fun) + 0.0,
+        "realization_plans": {
+            p1: dict(zip(sf["sequences"][p1], x.tolist())),
+            p2: dict(zip(sf["sequences"][p2], y.tolist())),
+        },
+        "behavior_strategies": {
+            p1: _behavior_from_plan(x, sf, p1, tol),
+            p2: _behavior_from_plan(y, sf, p2, tol),
+        },
+        "sequence_form": sf,
+    }
@@ -0,0 +1,183 @@
+import numpy as np
+
+from Models.FlatGameTree import FlatGameTree
+from utilities import profiling
+
+
+def subgame_perfect_equilibrium(root, players=["Player 1", "Player 2"]):
+    """
+    Backward induction on a perfect-information extensive form tree.
+
+    The tree is solved in a single post-order pass over ExtensiveFormNode.children,
+    driven by an explicit stack so deep trees cannot overflow the recursion limit.
+    Every node is valued once (subtrees shared by several parents are reused).
+    Ties are broken in favour of the first action in node.actions.
+
+    Returns a dictionary like:
+    {
+      "path": [("Player 1", "Pass"), ("Player 2", "Take")],   # equilibrium play from the root
+      "values": (1, 3),                                        # payoff vector of the equilibrium
+      "strategy": {"Player 1": {info_set: action}, ...},       # choice at every decision node
+      "node_strategy": {node: action},
+      "node_values": {node: payoff vector},
+    }
+
+    `root` may also be a FlatGameTree, which is solved level by level with array
+    operations; node_strategy and node_values are then keyed by node index.
+    """
+    if isinstance(root, FlatGameTree):
+        return _flat_backward_induction(root, players)
+
+    player_index = {p: i for i, p in enumerate(players)}
+
+    values = {}       # id(node) -> payoff vector of the subgame
+    choice = {}       # id(node) -> equilibrium action
+    nodes = {}        # id(node) -> node, keeps the results addressable by node
+    info_owner = {}   # info_set -> id of the only node it may contain
+
+    stack = [root]
+    while stack:
+        node = stack[-1]
+        key = id(node)
+        if key in values:
+            stack.pop()
+            continue
+
+        if node.is_terminal():
+            values[key] = tuple(node.payoffs)
+            nodes[key] = node
+            stack.pop()
+            continue
+
+        # post-order: value the children first
+        pending = [child for child in node.children.values() if id(child) not in values]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+
+        if node.player not in player_index:
+            raise ValueError(f"Unknown player {node.player!r} at a decision node")
+        if node.info_set is not None:
+            if info_owner.setdefault(node.info_set, key) != key:
+                raise ValueError(
+                    f"Info set {node.info_set} contains several nodes, "
+                    "backward induction needs a perfect-information game"
+                )
+
+        i = player_index[node.player]
+        best_action, best_value = None, None
+        for action in node.actions or list(node.children):
+            value = values[id(node.children[action])]
+            if best_value is None or value[i] > best_value[i]:
+                best_action, best_value = action, value
+
+        values[key] = best_value
+        choice[key] = best_action
+        nodes[key] = node
+
+    # equilibrium path from the root
+    path = []
+    node = root
+    while not node.is_terminal():
+        action = choice[id(node)]
+        path.append((node.player, action))
+        node = node.children[action]
+
+    profiling.count("nodes visited", len(values))
+    strategy = {p: {} for p in players}
+    for key, action in choice.items():
+        node = nodes[key]
+        # the info set's name as game_index would give it, without indexing the tree
+        info_id = node.info_set if node.info_set is not None else f"auto_{node.player}_{key}"
+        strategy[node.player][info_id] = action
+
+    return {
+        "path": path,
+        "values": values[id(root)],
+        "strategy": strategy,
+        "node_strategy": {nodes[key]: action for key, action in choice.items()},
+        "node_values": {nodes[key]: value for key, value in values.items()},
+    }
+
+
+def _flat_backward_induction(tree, players):
+    """
+    Backward induction on a FlatGameTree, one level at a time from the deepest.
+    The children of a level always sit on deeper levels, and the edges of a
+    level are contiguous, so each level is two segment reductions over the CSR
+    children; the segment layout is set up once for the whole tree.
+    """
+    for p in tree.movers():
+        if p not in players:
+            raise ValueError(f"Unknown player {p!r} at a decision node")
+    decision = tree.node_info >= 0
+    sizes = np.bincount(tree.node_info[decision], minlength=len(tree.info_ids))
+    if (sizes > 1).any():
+        info_set = tree.info_ids[int(np.argmax(sizes > 1))]
+        raise ValueError(
+            f"Info set {info_set} contains several nodes, "
+            "backward induction needs a perfect-information game"
+        )
+
+    # payoffs are positional, the mover's coordinate is its place in `players`
+    mover = np.array([players.index(p) if p in players else -1 for p in tree.players], dtype=np.int64)
+    values = np.zeros((len(tree), tree.payoffs.shape[1]), dtype=tree.payoffs.dtype)
+    values[tree.terminal] = tree.payoffs[tree.payoff_row[tree.terminal]]
+    best_edge = np.full(len(tree), -1, dtype=np.int64)
+
+    # segment layout of the whole tree, computed once: the edges of decision node
+    # nodes[d] are edges[starts[d]:starts[d + 1]], scored in the coordinate column[e]
+    nodes = np.nonzero(decision)[0]
+    degree = np.diff(tree.first_child)
+    column = np.repeat(mover[tree.node_player[nodes]], degree[nodes])
+    segment = np.repeat(np.arange(len(nodes)), degree[nodes])
+    starts = tree.first_child[nodes].astype(np.int64)
+    edges = np.arange(len(tree.child))
+    by_level = np.searchsorted(nodes, tree.level_ptr).tolist()
+    nodes_list, starts_list, column_list = nodes.tolist(), starts.tolist(), column.tolist()
+    first_child, child = tree.first_child.tolist(), tree.child.tolist()
+
+    profiling.count("nodes visited", len(tree))
+    for d0, d1 in zip(by_level[-2::-1], by_level[:0:-1]):
+        if d0 == d1:
+            continue
+        lo, hi = starts_list[d0], first_child[nodes_list[d1 - 1] + 1]
+        if d1 - d0 == 1:
+            # a lone decision node (deep chains): plain Python beats array calls
+            v, col = nodes_list[d0], column_list[lo]
+            best = lo
+            for e in range(lo + 1, hi):
+                if values[child[e], col] > values[child[best], col]:
+                    best = e
+            best_edge[v] = best
+            values[v] = values[child[best]]
+        else:
+            scores = values[tree.child[lo:hi], column[lo:hi]]
+            offsets = starts[d0:d1] - lo
+            top = np.maximum.reduceat(scores, offsets)
+            # ties go to the first action, as in the tree version
+            candidate = np.where(scores == top[segment[lo:hi] - d0], edges[lo:hi], hi)
+            best = np.minimum.reduceat(candidate, offsets)
+            best_edge[nodes[d0:d1]] = best
+            values[nodes[d0:d1]] = values[tree.child[best]]
+
+    path = []
+    v = 0
+    while best_edge[v] >= 0:
+        e = best_edge[v]
+        path.append((tree.players[tree.node_player[v]], tree.actions[tree.child_action[e]]))
+        v = tree.child[e]
+
+    strategy = {p: {} for p in players}
+    for v, e in zip(nodes.tolist(), best_edge[nodes].tolist()):
+        strategy[tree.players[tree.node_player[v]]][tree.info_ids[tree.node_info[v]]] = tree.actions[tree.child_action[e]]
+
+    rows = values.tolist()
+    return {
+        "path": path,
+        "values": tuple(rows[0]),
+        "strategy": strategy,
+        "node_strategy": {v: tree.actions[tree.child_action[e]] for v, e in zip(nodes.tolist(), best_edge[nodes].tolist())},
+        "node_values": {v: tuple(row) for v, row in enumerate(rows)},
+    }
@@ -1,7 +1,11 @@
 import csv
 import os
 import math
+from collections import deque
 from textwrap import shorten
+import numpy as np
+from Models.FlatGameTree import game_index
+from Models.NormalForm import as_normal_form_game
 
 
 def print_tree(node, indent=0):
@@ -14,45 +18,183 @@ def print_tree(node, indent=0):
         print_tree(child, indent + 4)
 
 
+def _dot_string(text):
+    return '"' + str(text).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+
+
+def _number(x):
+    return f"{x:g}" if isinstance(x, float) else str(x)
+
+
+def _subtree_summaries(tree):
+    """
+    Size and payoff range below every node of a FlatGameTree: (size, low, high)
+    where size[v] counts the nodes of the subtree (shared nodes once per path)
+    and low / high are (n, N) per-player minimum and maximum terminal payoffs.
+    """
+    n = len(tree)
+    size = np.ones(n)
+    low = np.zeros((n, tree.payoffs.shape[1]), dtype=tree.payoffs.dtype)
+    terminal = tree.terminal
+    low[terminal] = tree.payoffs[tree.payoff_row[terminal]]
+    high = low.copy()
+    degree = np.diff(tree.first_child)
+
+    # children sit on deeper levels and the edges of a level are contiguous
+    levels = tree.level_ptr.tolist()
+    for start, stop in zip(levels[-2::-1], levels[:0:-1]):
+        nodes = start + np.nonzero(degree[start:stop] > 0)[0]
+        if len(nodes) == 0:
+            continue
+        base = tree.first_child[start]
+        edges = tree.child[base:tree.first_child[stop]]
+        offsets = tree.first_child[nodes] - base
+        size[nodes] += np.add.reduceat(size[edges], offsets)
+        low[nodes] = np.minimum.reduceat(low[edges], offsets)
+        high[nodes] = np.maximum.reduceat(high[edges], offsets)
+    return size, low, high
+
+
+class TreeRenderer:
+    """
+    Level-of-detail Graphviz drawing of an extensive form game.
+
+    Only the top max_depth levels (and at most max_nodes nodes) are drawn. The
+    decision nodes on the border are drawn as a collapsed box holding the size
+    and payoff range of the subtree below them, and can be opened one at a time
+    through `expanded`. The walk is iterative over the flat arrays of the game
+    index, so deep trees do not hit the recursion limit and the model nodes are
+    never modified. A node shared by several parents is drawn once.
+
+    The DOT fragment of every node (open, collapsed or terminal) is built once
+    and reused by all later renders of the same tree.
+    """
+
+    def __init__(self, root):
+        self.tree = game_index(root).tree
+        self.size, self.low, self.high = _subtree_summaries(self.tree)
+        self.depth = len(self.tree.level_ptr) - 2
+        self._fragments = {}
+
+    def node_at(self, path):
+        """Node reached from the root by a sequence of actions, None if there is none."""
+        tree = self.tree
+        v = 0
+        for action in path:
+            edges = range(tree.first_child[v], tree.first_child[v + 1])
+            v = next((int(tree.child[e]) for e in edges if tree.actions[tree.child_action[e]] == action), None)
+            if v is None:
+                return None
+        return v
+
+    def render(self, max_depth=None, expanded=(), max_nodes=None):
+        """
+        DOT source of the visible part of the tree, and the collapsed nodes as
+        {path: node} where path is the tuple of actions leading to them.
+
+        A decision node is opened when it is above max_depth and its children fit
+        in the max_nodes budget, or when it is in `expanded` (node numbers as
+        returned by node_at).
+        """
+        tree = self.tree
+        expanded = set(expanded)
+        paths = {0: ()}
+        collapsed = {}
+        body = []
+        queue = deque([(0, 0)])
+        while queue:
+            v, depth = queue.popleft()
+            if tree.payoff_row[v] >= 0:
+                body.append(self._fragment(v, "terminal"))
+                continue
+            edges = range(tree.first_child[v], tree.first_child[v + 1])
+            new = [e for e in edges if int(tree.child[e]) not in paths]
+            fits = (max_depth is None or depth < max_depth) and (max_nodes is None or len(paths) + len(new) <= max_nodes)
+            if not (fits or v in expanded):
+                body.append(self._fragment(v, "collapsed"))
+                collapsed[paths[v]] = v
+                continue
+            body.append(self._fragment(v, "open"))
+            for e in new:
+                c = int(tree.child[e])
+                if c not in paths:
+                    paths[c] = paths[v] + (tree.actions[tree.child_action[e]],)
+                    queue.append((c, depth + 1))
+
+        source = "digraph {\n\tnode [fontname=Arial fontsize=12 shape=circle]\n" + "".join(body) + "}\n"
+        return source, collapsed
+
+    def _fragment(self, v, kind):
+        key = (v, kind)
+        fragment = self._fragments.get(key)
+        if fragment is not None:
+            return fragment
+
+        tree = self.tree
+        if kind == "terminal":
+            payoffs = tuple(tree.payoffs[tree.payoff_row[v]].tolist())
+            fragment = f"\tn{v} [label={_dot_string(payoffs)} fillcolor=\"#d5f4e6\" shape=box style=filled]\n"
+        elif kind == "collapsed":
+            lines = [tree.players[tree.node_player[v]], f"+{self.size[v] - 1:,.0f} nodes"]
+            # payoffs are positional: column k is Player k+1's whoever moves first
+            for k in range(tree.payoffs.shape[1]):
+                lo, hi = self.low[v, k].item(), self.high[v, k].item()
+                lines.append(f"Player {k + 1}: {_number(lo)} .. {_number(hi)}")
+            label = _dot_string("\n".join(lines))
+            fragment = f"\tn{v} [label={label} fillcolor=\"#eeeeee\" shape=box style=\"filled,dashed\"]\n"
+        else:
+            player = tree.players[tree.node_player[v]]
+            fragment = f"\tn{v} [label={_dot_string(player)} fillcolor=\"#f9d5e5\" shape=circle style=filled]\n"
+            for e in range(tree.first_child[v], tree.first_child[v + 1]):
+                action = tree.actions[tree.child_action[e]]
+                if tree.chance_prob is not None and np.isfinite(tree.chance_prob[e]):
+                    action = f"{action} ({_number(tree.chance_prob[e].item())})"
+                fragment += f"\tn{v} -> n{tree.child[e]} [label={_dot_string(action)}]\n"
+        self._fragments[key] = fragment
+        return fragment
+
+
+def draw_extensive_form(root, max_depth=None, expanded=(), max_nodes=None):
+    """DOT source of an extensive form game, see TreeRenderer.render."""
+    return TreeRenderer(root).render(max_depth, expanded, max_nodes)[0]
+
+
 # Display Normal form
-def print_normal_form(strategies, payoff_matrix, players=["Player 1", "Player 2"]):
+def print_normal_form(strategies, payoff_matrix=None, players=["Player 1", "Player 2"]):
     """
     Display the Normal Form payoff matrix in a clean tabular format.
+    With more than two players one Player 1 x Player 2 table is printed for
+    every combination of the other players' strategies.
 
     Args:
-        strategies: A list of tuples where each tuple contains a strategy dict for each player
+        strategies: A NormalFormGame, or a list of tuples where each tuple contains a strategy dict for each player
         payoff_matrix: A list of payoff tuples corresponding to each strategy profile
         players: List of player names (default: P1 and P2)
     """
+    game = as_normal_form_game(strategies, payoff_matrix, players)
+    players = game.players
 
     print("\n=== Normal Form Representation ===")
 
-    # Extract player strategies as simple action names
-    p1_actions = sorted(set(s[0][list(s[0].keys())[0]] for s in strategies))
-    p2_actions = sorted(set(s[1][list(s[1].keys())[0]] for s in strategies))
-
-    # Create a mapping to fill the matrix
-    # Creates an empty table (will later store the payoff values)
-    table = {a1: {a2: None for a2 in p2_actions} for a1 in p1_actions}
-
-    # fill the payoff matrix
-    for (strat, payoff) in zip(strategies, payoff_matrix):
-        a1 = strat[0][list(strat[0].keys())[0]]  # Player 1 action
-        a2 = strat[1][list(strat[1].keys())[0]]  # Player 2 action
-        table[a1][a2] = payoff
-
-    # Print Player 2 header
-    print(f"\n             {players[1]}")
-    print("         " + "   ".join(f"{a2:^10}" for a2 in p2_actions))
-
-    # Print matrix rows for Player 1
-    for a1 in p1_actions:
-        row = f"{players[0][0]}: {a1:<6} "
-        for a2 in p2_actions:
-            payoff = table[a1][a2]
-            cell = f"{payoff}"
-            row += f"{cell:^12}"
-        print(row)
+    # Player strategies as simple action names, in the order of the payoff tensor
+    p1_actions, p2_actions = game.labels[0], game.labels[1]
 
-    print("\n")
+    for rest in np.ndindex(*game.shape[2:]):
+        if rest:
+            fixed = ", ".join(f"{players[k + 2]}: {game.labels[k + 2][i]}" for k, i in enumerate(rest))
+            print(f"\n  [{fixed}]")
 
+        # Print Player 2 header
+        print(f"\n             {players[1]}")
+        print("         " + "   ".join(f"{a2:^10}" for a2 in p2_actions))
+
+        # Print matrix rows for Player 1
+        for i, a1 in enumerate(p1_actions):
+            row = f"{players[0][0]}: {a1:<6} "
+            for j in range(len(p2_actions)):
+                payoff = tuple(game.payoffs[(i, j) + rest].tolist())
+                cell = f"{payoff}"
+                row += f"{cell:^12}"
+            print(row)
+
+    print("\n")